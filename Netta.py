@@ -12,6 +12,28 @@ import hashlib
 import os
 from datetime import datetime
 import json
+from netta_archive import NeetArchive
+from netta_ids import IdGenerator, make_id, id_timestamp, MAX_ID, MAX_SEQUENCE
+from netta_time import NOW_MS_SQL, TEXT_TO_MS_SQL, format_timestamp, parse_timestamp, now_ms
+from netta_ratelimit import RateLimiter
+from netta_models import (NeetView, NEET_COLUMNS, PROFILE_COLUMNS, neet_row_factory,
+                          profile_row_factory)
+from netta_cache import FeedCache
+from netta_spam import SpamDetector, create_spam_tables, VERDICT_REJECT
+from netta_media import BlobStore, create_media_tables, attach_media, MAX_ATTACHMENTS
+from netta_events import (create_event_tables, emit, USER_REGISTERED, USER_UPDATED,
+                          NEET_CREATED, NEET_LIKED, NEET_UNLIKED, VERIFICATION_REQUESTED)
+from netta_notifications import (NotificationCenter, create_notification_tables, notify,
+                                 notify_mentions, KIND_LIKE, KIND_FOLLOW, KIND_MENTION)
+from netta_console import ConsoleIO
+from netta_verification import migrate_verification_queue
+from netta_audit import create_audit_tables
+from netta_rollups import create_rollup_tables
+from netta_maintenance import create_maintenance_tables
+from netta_counters import create_counter_tables
+from netta_scheduler import create_scheduled_tables, MAX_SCHEDULE_DAYS, MAX_SCHEDULED_PER_USER
+from netta_bloom import NameFilter
+from netta_memory import resolve_db_name, is_memory, connect_db, clone_db
 
 # ═══════════════════════════════════════════════════════════════
 # 🎨 ЦВЕТА И СТИЛИ ДЛЯ КОНСОЛИ
@@ -38,102 +60,314 @@ NO_CHECK = ""                                     # Без верификаци
 # 🗄️ БАЗА ДАННЫХ
 # ═══════════════════════════════════════════════════════════════
 
+# Шаблоны таблиц ({name} — имя таблицы, чтобы пересоздавать их при миграциях).
+# created_at — целые миллисекунды от начала эпохи Unix (UTC).
+USERS_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {{name}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        display_name TEXT,
+        bio TEXT DEFAULT '',
+        avatar TEXT DEFAULT '👤',
+        location TEXT DEFAULT '',
+        website TEXT DEFAULT '',
+        verification_status INTEGER DEFAULT 0,
+        is_admin INTEGER DEFAULT 0,
+        created_at INTEGER DEFAULT {NOW_MS_SQL},
+        followers_count INTEGER DEFAULT 0,
+        following_count INTEGER DEFAULT 0
+    )
+'''
+
+NEETS_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {{name}} (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        likes_count INTEGER DEFAULT 0,
+        reneets_count INTEGER DEFAULT 0,
+        replies_count INTEGER DEFAULT 0,
+        created_at INTEGER DEFAULT {NOW_MS_SQL},
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+'''
+
+FOLLOWS_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {{name}} (
+        id INTEGER PRIMARY KEY,
+        follower_id INTEGER NOT NULL,
+        following_id INTEGER NOT NULL,
+        created_at INTEGER DEFAULT {NOW_MS_SQL},
+        FOREIGN KEY (follower_id) REFERENCES users(id),
+        FOREIGN KEY (following_id) REFERENCES users(id),
+        UNIQUE(follower_id, following_id)
+    )
+'''
+
+LIKES_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {{name}} (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        neet_id INTEGER NOT NULL,
+        created_at INTEGER DEFAULT {NOW_MS_SQL},
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (neet_id) REFERENCES neets(id),
+        UNIQUE(user_id, neet_id)
+    )
+'''
+
+VERIFICATION_REQUESTS_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {{name}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        created_at INTEGER DEFAULT {NOW_MS_SQL},
+        claimed_by INTEGER,
+        lease_expires_at INTEGER,
+        decided_by INTEGER,
+        decided_at INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+'''
+
+TABLES = {
+    'users': USERS_TABLE,
+    'neets': NEETS_TABLE,
+    'follows': FOLLOWS_TABLE,
+    'likes': LIKES_TABLE,
+    'verification_requests': VERIFICATION_REQUESTS_TABLE,
+}
+
+# created_at в мс, даже если в старой строке он записан текстом
+CREATED_AT_MS_SQL = (
+    "CASE WHEN typeof(created_at) = 'text' "
+    f"THEN {TEXT_TO_MS_SQL.format(column='created_at')} ELSE created_at END"
+)
+
 class Database:
-    def __init__(self, db_name="netta.db"):
-        self.db_name = db_name
+    def __init__(self, db_name="netta.db", archive_dir=None, node_id=0, media_dir=None,
+                 rate_limits=None):
+        # ':memory:' или URI 'file:…' — база в памяти (см. netta_memory.py)
+        self.db_name = resolve_db_name(db_name)
+        # База в памяти живет, пока открыто хотя бы одно соединение
+        self.keeper = connect_db(self.db_name) if is_memory(self.db_name) else None
+        # Генератор id постов, лайков и подписок (узел — номер процесса или шарда)
+        self.ids = IdGenerator(node_id)
+        # Первая страница ленты, общая для всех сессий процесса
+        self.feed_cache = FeedCache()
+        # Корзины ограничения частоты, тоже общие: новая сессия не получает новых токенов
+        self.limiter = RateLimiter(rate_limits)
         self.init_database()
+        # Индекс подписей недавних постов для поиска спама
+        self.spam = SpamDetector(self)
+        self.spam.load()
+        # Файлы вложений (вне базы, по хешу содержимого)
+        self.media = BlobStore(self, media_dir or "media")
+        # Архив старых постов (ATTACH помесячных файлов), если включен
+        self.archive = NeetArchive(self, archive_dir) if archive_dir else None
+        # Занятые username и email: «точно свободно» без запроса к базе
+        self.names = NameFilter(self, None if self.keeper else f"{db_name}.names")
     
     def get_connection(self):
-        return sqlite3.connect(self.db_name)
+        return connect_db(self.db_name)
+    
+    def clone(self, name=None):
+        """Копия базы в памяти (backup API): заполнить один раз, копировать на каждый тест"""
+        uri, keeper = clone_db(self.db_name, name)
+        copy = Database(uri, media_dir=self.media.media_dir, rate_limits=self.limiter.limits)
+        keeper.close()
+        return copy
+    
+    def close(self):
+        """Освободить базу в памяти (файловую базу закрывать не нужно)"""
+        if self.keeper is not None:
+            self.keeper.close()
+            self.keeper = None
     
     def init_database(self):
         """Инициализация таблиц базы данных"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Таблица пользователей
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                display_name TEXT,
-                bio TEXT DEFAULT '',
-                avatar TEXT DEFAULT '👤',
-                location TEXT DEFAULT '',
-                website TEXT DEFAULT '',
-                verification_status INTEGER DEFAULT 0,
-                is_admin INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                followers_count INTEGER DEFAULT 0,
-                following_count INTEGER DEFAULT 0
-            )
-        ''')
+        # Новая база освобождает страницы шагами (старой нужен полный VACUUM,
+        # см. netta_maintenance.py --convert)
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
+        # Пользователи, посты (neets), подписки, лайки и заявки на верификацию
+        for table, template in TABLES.items():
+            cursor.execute(template.format(name=table))
         
-        # Таблица постов (neets)
+        # Месяцы архива, в которых у пользователя есть посты
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS neets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+            CREATE TABLE IF NOT EXISTS neet_archive_months (
                 user_id INTEGER NOT NULL,
-                content TEXT NOT NULL,
-                likes_count INTEGER DEFAULT 0,
-                reneets_count INTEGER DEFAULT 0,
-                replies_count INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
+                month TEXT NOT NULL,
+                PRIMARY KEY (user_id, month)
             )
         ''')
         
-        # Таблица подписок
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS follows (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                follower_id INTEGER NOT NULL,
-                following_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (follower_id) REFERENCES users(id),
-                FOREIGN KEY (following_id) REFERENCES users(id),
-                UNIQUE(follower_id, following_id)
-            )
-        ''')
+        # Уведомления и счетчики непрочитанных
+        create_notification_tables(cursor)
         
-        # Таблица лайков
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS likes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                neet_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id),
-                FOREIGN KEY (neet_id) REFERENCES neets(id),
-                UNIQUE(user_id, neet_id)
-            )
-        ''')
+        # Подписи постов и кластеры подозрительных постов
+        create_spam_tables(cursor)
         
-        # Таблица заявок на верификацию
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS verification_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                reason TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
+        # Вложения постов и счетчики ссылок на файлы
+        create_media_tables(cursor)
+        
+        # Журнал изменений для внешних потребителей
+        create_event_tables(cursor)
+        
+        # Журнал действий администраторов
+        create_audit_tables(cursor)
+        
+        # Почасовые и дневные счетчики для графиков админ-панели
+        create_rollup_tables(cursor)
+        
+        # Журнал обслуживания базы (ANALYZE, vacuum, checkpoint)
+        create_maintenance_tables(cursor)
+        
+        # Отложенные посты (публикует netta_scheduler.py)
+        create_scheduled_tables(cursor)
+        
+        # Старые базы: переводим AUTOINCREMENT-таблицы на id по времени,
+        # а текстовые created_at — в миллисекунды
+        self.migrate_time_ordered_ids(cursor)
+        self.migrate_integer_timestamps(cursor)
+        
+        # Колонки и индексы очереди заявок на верификацию
+        migrate_verification_queue(cursor)
+        
+        # Индекс для постов пользователя (лента и архивация идут по первичному ключу)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_neets_user_id ON neets (user_id, id)')
+        
+        # Сверка денормализованных счетчиков (после миграций: индексы на likes и follows)
+        create_counter_tables(cursor)
         
         conn.commit()
         conn.close()
+    
+    def table_sql(self, cursor, table):
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone()[0].upper()
+    
+    def rebuild_table(self, cursor, table):
+        """Пересоздать таблицу по текущему шаблону, сохранив данные и счетчик AUTOINCREMENT"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        old_columns = [row[1] for row in cursor.fetchall()]
+        cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,))
+        sequence = cursor.fetchone()
+        
+        cursor.execute(TABLES[table].format(name=f'{table}_new'))
+        cursor.execute(f'PRAGMA table_info({table}_new)')
+        columns = [row[1] for row in cursor.fetchall() if row[1] in old_columns]
+        values = [CREATED_AT_MS_SQL if column == 'created_at' else column for column in columns]
+        
+        cursor.execute(f'''
+            INSERT INTO {table}_new ({', '.join(columns)})
+            SELECT {', '.join(values)} FROM {table}
+        ''')
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+        
+        if sequence:
+            cursor.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+            cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table, sequence[0]))
+    
+    def migrate_integer_timestamps(self, cursor):
+        """Перевод created_at из текста CURRENT_TIMESTAMP в миллисекунды"""
+        for table in TABLES:
+            if 'CURRENT_TIMESTAMP' in self.table_sql(cursor, table):
+                self.rebuild_table(cursor, table)
+    
+    def migrate_time_ordered_ids(self, cursor):
+        """Перенумерация neets, likes и follows в id, упорядоченные по времени"""
+        def is_legacy(table):
+            return 'AUTOINCREMENT' in self.table_sql(cursor, table)
+        
+        def renumber(rows):
+            """Новые id в порядке (created_at, старый id); rows — [(старый id, мс)]"""
+            mapping = {}
+            last_timestamp, sequence = 0, 0
+            for old_id, timestamp in rows:
+                timestamp = max(timestamp or 0, last_timestamp)
+                if timestamp == last_timestamp:
+                    sequence += 1
+                    if sequence > MAX_SEQUENCE:
+                        timestamp, sequence = timestamp + 1, 0
+                else:
+                    sequence = 0
+                last_timestamp = timestamp
+                mapping[old_id] = make_id(timestamp, self.ids.node_id, sequence)
+            return mapping
+        
+        def timestamps(table):
+            """[(id, created_at в мс)] в порядке создания"""
+            cursor.execute(f'''
+                SELECT id, {CREATED_AT_MS_SQL} AS created_ms
+                FROM {table} ORDER BY created_ms, id
+            ''')
+            rows = cursor.fetchall()
+            return renumber(rows), dict(rows)
+        
+        neet_ids = {}
+        
+        if is_legacy('neets'):
+            neet_ids, created = timestamps('neets')
+            cursor.execute(NEETS_TABLE.format(name='neets_new'))
+            cursor.execute('''
+                SELECT id, user_id, content, likes_count, reneets_count, replies_count FROM neets
+            ''')
+            cursor.executemany(
+                'INSERT INTO neets_new VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(neet_ids[row[0]],) + row[1:] + (created[row[0]],) for row in cursor.fetchall()]
+            )
+            cursor.execute('DROP TABLE neets')
+            cursor.execute('ALTER TABLE neets_new RENAME TO neets')
+        
+        if is_legacy('likes'):
+            like_ids, created = timestamps('likes')
+            cursor.execute(LIKES_TABLE.format(name='likes_new'))
+            cursor.execute('SELECT id, user_id, neet_id FROM likes')
+            cursor.executemany(
+                'INSERT INTO likes_new VALUES (?, ?, ?, ?)',
+                [(like_ids[row[0]], row[1], neet_ids.get(row[2], row[2]), created[row[0]])
+                 for row in cursor.fetchall()]
+            )
+            cursor.execute('DROP TABLE likes')
+            cursor.execute('ALTER TABLE likes_new RENAME TO likes')
+        
+        if is_legacy('follows'):
+            follow_ids, created = timestamps('follows')
+            cursor.execute(FOLLOWS_TABLE.format(name='follows_new'))
+            cursor.execute('SELECT id, follower_id, following_id FROM follows')
+            cursor.executemany(
+                'INSERT INTO follows_new VALUES (?, ?, ?, ?)',
+                [(follow_ids[row[0]], row[1], row[2], created[row[0]]) for row in cursor.fetchall()]
+            )
+            cursor.execute('DROP TABLE follows')
+            cursor.execute('ALTER TABLE follows_new RENAME TO follows')
 
 # ═══════════════════════════════════════════════════════════════
 # 👤 КЛАСС ПОЛЬЗОВАТЕЛЯ
 # ═══════════════════════════════════════════════════════════════
 
 class User:
-    def __init__(self, db):
+    def __init__(self, db, limiter=None, client_id='local'):
         self.db = db
         self.current_user = None
+        # Ограничение частоты запросов (None — без ограничений)
+        self.limiter = limiter
+        self.client_id = client_id
+    
+    def check_rate(self, operation, key):
+        """Текст ошибки, если лимит операции исчерпан, иначе None"""
+        if self.limiter is None:
+            return None
+        return self.limiter.check(operation, key)
     
     def hash_password(self, password):
         """Хеширование пароля"""
@@ -141,6 +375,10 @@ class User:
     
     def register(self, username, email, password, display_name=None):
         """Регистрация нового пользователя"""
+        throttled = self.check_rate('register', self.client_id)
+        if throttled:
+            return False, throttled
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
@@ -153,8 +391,13 @@ class User:
                 VALUES (?, ?, ?, ?)
             ''', (username, email, password_hash, display_name))
             
+            user_id = cursor.lastrowid
+            emit(cursor, USER_REGISTERED, user_id, user_id,
+                 username=username, display_name=display_name)
+            
             conn.commit()
             conn.close()
+            self.db.names.add(username, email, user_id)
             return True, "✅ Регистрация успешна! Добро пожаловать в Netta!"
         
         except sqlite3.IntegrityError as e:
@@ -165,36 +408,35 @@ class User:
                 return False, "❌ Этот email уже зарегистрирован!"
             return False, f"❌ Ошибка регистрации: {e}"
     
+    def check_available(self, username=None, email=None):
+        """Текст ошибки, если username или email уже заняты, иначе None"""
+        if username and self.db.names.username_taken(username):
+            return "❌ Это имя пользователя уже занято!"
+        if email and self.db.names.email_taken(email):
+            return "❌ Этот email уже зарегистрирован!"
+        return None
+    
     def login(self, username, password):
         """Авторизация пользователя"""
+        throttled = self.check_rate('login', username)
+        if throttled:
+            return False, throttled
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
         password_hash = self.hash_password(password)
         
-        cursor.execute('''
-            SELECT * FROM users WHERE username = ? AND password_hash = ?
+        cursor.row_factory = profile_row_factory
+        cursor.execute(f'''
+            SELECT {PROFILE_COLUMNS} FROM users WHERE username = ? AND password_hash = ?
         ''', (username, password_hash))
         
         user = cursor.fetchone()
         conn.close()
         
         if user:
-            self.current_user = {
-                'id': user[0],
-                'username': user[1],
-                'email': user[2],
-                'display_name': user[4],
-                'bio': user[5],
-                'avatar': user[6],
-                'location': user[7],
-                'website': user[8],
-                'verification_status': user[9],
-                'is_admin': user[10],
-                'created_at': user[11],
-                'followers_count': user[12],
-                'following_count': user[13]
-            }
+            self.current_user = user
             return True, f"✅ Добро пожаловать, {self.current_user['display_name']}!"
         
         return False, "❌ Неверное имя пользователя или пароль!"
@@ -223,11 +465,13 @@ class User:
         allowed_fields = ['display_name', 'bio', 'avatar', 'location', 'website']
         updates = []
         values = []
+        changes = {}
         
         for field, value in kwargs.items():
             if field in allowed_fields and value:
                 updates.append(f"{field} = ?")
                 values.append(value)
+                changes[field] = value
                 self.current_user[field] = value
         
         if updates:
@@ -235,7 +479,10 @@ class User:
             cursor.execute(f'''
                 UPDATE users SET {', '.join(updates)} WHERE id = ?
             ''', values)
+            emit(cursor, USER_UPDATED, self.current_user['id'], self.current_user['id'], **changes)
             conn.commit()
+            # Имя и аватар автора закешированы вместе с постами
+            self.db.feed_cache.invalidate()
         
         conn.close()
         return True, "✅ Профиль обновлен!"
@@ -245,10 +492,12 @@ class User:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
+        cursor.row_factory = profile_row_factory
+        
         if username:
-            cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
+            cursor.execute(f'SELECT {PROFILE_COLUMNS} FROM users WHERE username = ?', (username,))
         elif self.current_user:
-            cursor.execute('SELECT * FROM users WHERE id = ?', (self.current_user['id'],))
+            cursor.execute(f'SELECT {PROFILE_COLUMNS} FROM users WHERE id = ?', (self.current_user['id'],))
         else:
             conn.close()
             return None
@@ -256,23 +505,7 @@ class User:
         user = cursor.fetchone()
         conn.close()
         
-        if user:
-            return {
-                'id': user[0],
-                'username': user[1],
-                'email': user[2],
-                'display_name': user[4],
-                'bio': user[5],
-                'avatar': user[6],
-                'location': user[7],
-                'website': user[8],
-                'verification_status': user[9],
-                'is_admin': user[10],
-                'created_at': user[11],
-                'followers_count': user[12],
-                'following_count': user[13]
-            }
-        return None
+        return user
     
     def request_verification(self, reason):
         """Подать заявку на верификацию"""
@@ -284,8 +517,8 @@ class User:
         
         # Проверяем, нет ли уже активной заявки
         cursor.execute('''
-            SELECT * FROM verification_requests 
-            WHERE user_id = ? AND status = 'pending'
+            SELECT 1 FROM verification_requests
+            WHERE user_id = ? AND status IN ('pending', 'claimed')
         ''', (self.current_user['id'],))
         
         if cursor.fetchone():
@@ -297,6 +530,8 @@ class User:
             VALUES (?, ?)
         ''', (self.current_user['id'], reason))
         
+        emit(cursor, VERIFICATION_REQUESTED, cursor.lastrowid, self.current_user['id'])
+        
         conn.commit()
         conn.close()
         return True, "✅ Заявка на верификацию отправлена!"
@@ -309,136 +544,344 @@ class Neet:
     def __init__(self, db, user):
         self.db = db
         self.user = user
+        # Лайки текущего пользователя, уже известные сессии: {id поста: лайкнут ли}
+        self.liked_user_id = None
+        self.liked = {}
     
-    def create(self, content):
-        """Создание нового поста"""
+    def check_content(self, content):
+        """Текст ошибки, если пост нельзя опубликовать, иначе None"""
         if not self.user.current_user:
-            return False, "❌ Вы не авторизованы!"
+            return "❌ Вы не авторизованы!"
         
         if len(content) > 280:
-            return False, "❌ Пост не может быть длиннее 280 символов!"
+            return "❌ Пост не может быть длиннее 280 символов!"
         
         if not content.strip():
-            return False, "❌ Пост не может быть пустым!"
+            return "❌ Пост не может быть пустым!"
+        
+        return None
+    
+    def create(self, content, attachments=None, scheduled_id=None):
+        """Создание нового поста (attachments — пути к файлам вложений,
+        scheduled_id — публикуемый отложенный пост)"""
+        error = self.check_content(content)
+        if error:
+            return False, error
+        
+        attachments = attachments or []
+        if len(attachments) > MAX_ATTACHMENTS:
+            return False, f"❌ Не больше {MAX_ATTACHMENTS} вложений!"
+        
+        throttled = self.user.check_rate('create', self.user.current_user['id'])
+        if throttled:
+            return False, throttled
+        
+        # Почти такой же недавний пост: свой или связанного аккаунта — отказ,
+        # чужой — публикуем, но отмечаем для модерации
+        verdict, signature, match = self.db.spam.check(self.user.current_user['id'], content)
+        if verdict == VERDICT_REJECT:
+            return False, "❌ Похожий пост уже опубликован!"
+        
+        # Файлы пишутся до транзакции; одинаковые файлы хранятся один раз
+        try:
+            blobs = [self.db.media.put_file(path) for path in attachments]
+        except OSError:
+            return False, "❌ Не удалось прочитать файл вложения!"
+        except ValueError:
+            return False, "❌ Файл вложения слишком большой!"
         
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
+        neet_id = self.db.ids.next_id()
         cursor.execute('''
-            INSERT INTO neets (user_id, content) VALUES (?, ?)
-        ''', (self.user.current_user['id'], content))
+            INSERT INTO neets (id, user_id, content, created_at) VALUES (?, ?, ?, ?)
+        ''', (neet_id, self.user.current_user['id'], content, id_timestamp(neet_id)))
+        
+        # Отложенный пост отмечается опубликованным в той же транзакции —
+        # ровно один раз, даже после сбоя или при двух публикаторах
+        if scheduled_id is not None:
+            cursor.execute('''
+                UPDATE scheduled_neets SET status = 'published', neet_id = ?
+                WHERE id = ? AND status = 'scheduled'
+            ''', (neet_id, scheduled_id))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                conn.close()
+                return False, "❌ Отложенный пост уже опубликован!"
+        
+        # Уведомляем упомянутых через @username
+        notify_mentions(cursor, self.user.current_user['id'], neet_id, content)
+        
+        self.db.spam.record(cursor, neet_id, self.user.current_user['id'], verdict, signature, match)
+        attach_media(cursor, neet_id, self.user.current_user['id'], blobs)
+        emit(cursor, NEET_CREATED, neet_id, self.user.current_user['id'],
+             content=content, attachments=[digest for digest, _, _ in blobs])
         
         conn.commit()
         conn.close()
+        
+        if signature:
+            self.db.spam.add(neet_id, self.user.current_user['id'], signature)
+        
+        author = self.user.current_user
+        self.db.feed_cache.on_create(NeetView(
+            neet_id, author['id'], content, 0, 0, 0, id_timestamp(neet_id),
+            author['username'], author['display_name'], author['avatar'],
+            author['verification_status'], author['is_admin']
+        ))
         return True, "✅ Neet опубликован!"
     
-    def get_feed(self, limit=20):
-        """Получить ленту постов"""
+    def schedule(self, content, publish_at):
+        """Отложенный пост: publish_at — время публикации в мс"""
+        error = self.check_content(content)
+        if error:
+            return False, error
+        
+        if publish_at <= now_ms():
+            return False, "❌ Время публикации уже прошло!"
+        
+        if publish_at > now_ms() + MAX_SCHEDULE_DAYS * 86400000:
+            return False, f"❌ Запланировать можно не дальше чем на {MAX_SCHEDULE_DAYS} дней!"
+        
+        # Отложенный пост тратит токен create сейчас: публикатор лимит не проверяет
+        throttled = self.user.check_rate('create', self.user.current_user['id'])
+        if throttled:
+            return False, throttled
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT n.*, u.username, u.display_name, u.avatar, 
-                   u.verification_status, u.is_admin
+            SELECT COUNT(*) FROM scheduled_neets WHERE user_id = ? AND status = 'scheduled'
+        ''', (self.user.current_user['id'],))
+        if cursor.fetchone()[0] >= MAX_SCHEDULED_PER_USER:
+            conn.close()
+            return False, f"❌ Не больше {MAX_SCHEDULED_PER_USER} отложенных постов!"
+        
+        cursor.execute('''
+            INSERT INTO scheduled_neets (user_id, content, publish_at, created_at) VALUES (?, ?, ?, ?)
+        ''', (self.user.current_user['id'], content, publish_at, now_ms()))
+        
+        conn.commit()
+        conn.close()
+        return True, f"🕒 Neet будет опубликован {format_timestamp(publish_at)}"
+    
+    def get_feed(self, limit=20, before_id=None):
+        """Получить ленту постов (before_id — id последнего поста предыдущей страницы)"""
+        # Первая страница одна на всех — берем ее из кеша
+        if before_id is None:
+            return self.db.feed_cache.get(limit, lambda: self.load_feed(limit))
+        return self.load_feed(limit, before_id)
+    
+    def load_feed(self, limit=20, before_id=None):
+        """Прочитать страницу ленты из базы"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        # id растут со временем, поэтому лента листается по первичному ключу
+        cursor.row_factory = neet_row_factory
+        cursor.execute(f'''
+            SELECT {NEET_COLUMNS}
             FROM neets n
             JOIN users u ON n.user_id = u.id
-            ORDER BY n.created_at DESC
+            WHERE n.id < ?
+            ORDER BY n.id DESC
             LIMIT ?
-        ''', (limit,))
+        ''', (before_id if before_id is not None else MAX_ID, limit))
         
         neets = cursor.fetchall()
         conn.close()
         
-        return [{
-            'id': n[0],
-            'user_id': n[1],
-            'content': n[2],
-            'likes_count': n[3],
-            'reneets_count': n[4],
-            'replies_count': n[5],
-            'created_at': n[6],
-            'username': n[7],
-            'display_name': n[8],
-            'avatar': n[9],
-            'verification_status': n[10],
-            'is_admin': n[11]
-        } for n in neets]
+        return neets
     
     def like(self, neet_id):
         """Поставить лайк"""
         if not self.user.current_user:
             return False, "❌ Вы не авторизованы!"
         
+        throttled = self.user.check_rate('like', self.user.current_user['id'])
+        if throttled:
+            return False, throttled
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
         try:
+            like_id = self.db.ids.next_id()
             cursor.execute('''
-                INSERT INTO likes (user_id, neet_id) VALUES (?, ?)
-            ''', (self.user.current_user['id'], neet_id))
+                INSERT INTO likes (id, user_id, neet_id, created_at) VALUES (?, ?, ?, ?)
+            ''', (like_id, self.user.current_user['id'], neet_id, id_timestamp(like_id)))
             
             cursor.execute('''
                 UPDATE neets SET likes_count = likes_count + 1 WHERE id = ?
+                RETURNING user_id
             ''', (neet_id,))
+            author = cursor.fetchone()
+            
+            # Пост удален или уже в архиве — архивные посты только для чтения
+            if not author:
+                conn.rollback()
+                conn.close()
+                return False, "❌ Neet не найден!"
+            
+            # Лайки одного поста копятся в одном уведомлении автора
+            notify(cursor, author[0], KIND_LIKE, self.user.current_user['id'], neet_id)
+            emit(cursor, NEET_LIKED, neet_id, self.user.current_user['id'], author_id=author[0])
             
             conn.commit()
             conn.close()
+            self.db.feed_cache.on_like(neet_id)
+            self.remember_like(neet_id, True)
             return True, "❤️ Вам понравился этот Neet!"
         
         except sqlite3.IntegrityError:
             conn.close()
+            self.remember_like(neet_id, True)
             return False, "❌ Вы уже лайкнули этот Neet!"
     
-    def get_user_neets(self, user_id, limit=20):
-        """Получить посты конкретного пользователя"""
+    def unlike(self, neet_id):
+        """Убрать лайк"""
+        if not self.user.current_user:
+            return False, "❌ Вы не авторизованы!"
+        
+        throttled = self.user.check_rate('like', self.user.current_user['id'])
+        if throttled:
+            return False, throttled
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT n.*, u.username, u.display_name, u.avatar,
-                   u.verification_status, u.is_admin
+            DELETE FROM likes WHERE user_id = ? AND neet_id = ?
+        ''', (self.user.current_user['id'], neet_id))
+        
+        if cursor.rowcount == 0:
+            conn.close()
+            self.remember_like(neet_id, False)
+            return False, "❌ Вы не лайкали этот Neet!"
+        
+        # Счетчик уменьшается в той же транзакции и не уходит ниже нуля
+        cursor.execute('''
+            UPDATE neets SET likes_count = MAX(likes_count - 1, 0) WHERE id = ?
+            RETURNING user_id
+        ''', (neet_id,))
+        author = cursor.fetchone()
+        emit(cursor, NEET_UNLIKED, neet_id, self.user.current_user['id'],
+             author_id=author[0] if author else None)
+        
+        conn.commit()
+        conn.close()
+        self.db.feed_cache.on_like(neet_id, -1)
+        self.remember_like(neet_id, False)
+        return True, "💔 Лайк убран"
+    
+    def remember_like(self, neet_id, liked):
+        if self.liked_user_id == self.user.current_user['id']:
+            self.liked[neet_id] = liked
+    
+    def liked_by(self, user_id, neet_ids):
+        """Какие из постов лайкнул пользователь: один запрос на страницу.
+        
+        Ответы запоминаются на сессию; в базу уходят только неизвестные id.
+        Архивные посты (их лайки в файлах архива) считаются не лайкнутыми.
+        """
+        if user_id != self.liked_user_id:
+            self.liked_user_id = user_id
+            self.liked = {}
+        
+        unknown = [neet_id for neet_id in neet_ids if neet_id not in self.liked]
+        if unknown:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            
+            # Покрывающий индекс UNIQUE(user_id, neet_id)
+            marks = ','.join('?' * len(unknown))
+            cursor.execute(f'''
+                SELECT neet_id FROM likes WHERE user_id = ? AND neet_id IN ({marks})
+            ''', (user_id, *unknown))
+            found = {row[0] for row in cursor.fetchall()}
+            conn.close()
+            
+            for neet_id in unknown:
+                self.liked[neet_id] = neet_id in found
+        
+        return {neet_id for neet_id in neet_ids if self.liked[neet_id]}
+    
+    def get_user_neets(self, user_id, limit=20, before_id=None):
+        """Получить посты конкретного пользователя"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.row_factory = neet_row_factory
+        cursor.execute(f'''
+            SELECT {NEET_COLUMNS}
             FROM neets n
             JOIN users u ON n.user_id = u.id
-            WHERE n.user_id = ?
-            ORDER BY n.created_at DESC
+            WHERE n.user_id = ? AND n.id < ?
+            ORDER BY n.id DESC
             LIMIT ?
-        ''', (user_id, limit))
+        ''', (user_id, before_id if before_id is not None else MAX_ID, limit))
         
         neets = cursor.fetchall()
         conn.close()
         
-        return [{
-            'id': n[0],
-            'user_id': n[1],
-            'content': n[2],
-            'likes_count': n[3],
-            'reneets_count': n[4],
-            'replies_count': n[5],
-            'created_at': n[6],
-            'username': n[7],
-            'display_name': n[8],
-            'avatar': n[9],
-            'verification_status': n[10],
-            'is_admin': n[11]
-        } for n in neets]
+        # Недостающие посты добираем из архива
+        if self.db.archive and len(neets) < limit:
+            neets += self.db.archive.get_user_neets(user_id, limit - len(neets), before_id)
+        
+        return neets
+    
+    def get_media(self, neet_ids):
+        """Вложения страницы постов одним запросом: {id поста: [(имя файла, размер)]}"""
+        if not neet_ids:
+            return {}
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        marks = ','.join('?' * len(neet_ids))
+        cursor.execute(f'''
+            SELECT m.neet_id, m.filename, b.size
+            FROM neet_media m
+            JOIN media_blobs b ON m.digest = b.digest
+            WHERE m.neet_id IN ({marks})
+            ORDER BY m.neet_id, m.position
+        ''', tuple(neet_ids))
+        
+        media = {}
+        for neet_id, filename, size in cursor.fetchall():
+            media.setdefault(neet_id, []).append((filename, size))
+        conn.close()
+        
+        return media
 
 # ═══════════════════════════════════════════════════════════════
 # 🖥️ ИНТЕРФЕЙС ПРИЛОЖЕНИЯ
 # ═══════════════════════════════════════════════════════════════
 
 class NettaApp:
-    def __init__(self):
-        self.db = Database()
-        self.user = User(self.db)
+    def __init__(self, db_name="netta.db", archive_dir=None, rate_limits=None, media_dir=None,
+                 io=None, db=None):
+        # db — уже открытая база, общая для нескольких сессий одного процесса
+        # (вместе с ее ограничением частоты: лимиты задаются у базы)
+        if db is not None and rate_limits is not None:
+            raise ValueError("rate_limits общей базы задаются в Database(..., rate_limits=...)")
+        self.db = db or Database(db_name, archive_dir, media_dir=media_dir, rate_limits=rate_limits)
+        # Терминал или сценарий (ScriptedIO) для запуска без человека
+        self.io = io or ConsoleIO()
+        self.limiter = self.db.limiter
+        self.user = User(self.db, self.limiter)
         self.neet = Neet(self.db, self.user)
+        self.notifications = NotificationCenter(self.db)
     
     def clear_screen(self):
         """Очистка экрана"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.io.clear()
     
     def print_header(self):
         """Вывод заголовка"""
-        print(f"""
+        self.io.show(f"""
 {Colors.CYAN}╔═══════════════════════════════════════════════════════════════╗
 ║                                                               ║
 ║     {Colors.BLUE}███╗   ██╗{Colors.WHITE}███████╗{Colors.CYAN}████████╗{Colors.BLUE}████████╗{Colors.WHITE} █████╗ {Colors.CYAN}           ║
@@ -454,33 +897,46 @@ class NettaApp:
     
     def print_menu(self, options, title="Меню"):
         """Вывод меню"""
-        print(f"\n{Colors.YELLOW}{'═' * 50}")
-        print(f"  📋 {title}")
-        print(f"{'═' * 50}{Colors.END}")
+        self.io.show(f"\n{Colors.YELLOW}{'═' * 50}")
+        self.io.show(f"  📋 {title}")
+        self.io.show(f"{'═' * 50}{Colors.END}")
         
         for key, value in options.items():
-            print(f"  {Colors.CYAN}[{key}]{Colors.END} {value}")
+            self.io.show(f"  {Colors.CYAN}[{key}]{Colors.END} {value}")
         
-        print(f"{Colors.YELLOW}{'═' * 50}{Colors.END}")
+        self.io.show(f"{Colors.YELLOW}{'═' * 50}{Colors.END}")
+    
+    def liked_on_page(self, neet_ids):
+        """Лайкнутые текущим пользователем посты страницы (без входа — никакие)"""
+        if not self.user.current_user:
+            return set()
+        return self.neet.liked_by(self.user.current_user['id'], neet_ids)
     
-    def display_neet(self, neet):
-        """Отображение одного поста"""
+    def display_neet(self, neet, number=None, media=None, liked=False):
+        """Отображение одного поста (number — номер на странице ленты, media — вложения,
+        liked — лайкнул ли его текущий пользователь)"""
         badge = self.user.get_verification_badge(
             neet['verification_status'], 
             neet['is_admin']
         )
         
-        time_str = neet['created_at'][:16] if neet['created_at'] else 'Недавно'
+        time_str = format_timestamp(neet['created_at']) or 'Недавно'
+        number_str = f"{Colors.YELLOW}[{number}]{Colors.END} " if number else ""
+        media_str = ''
+        if media:
+            files = ', '.join(f"{filename} ({max(size // 1024, 1)} КБ)" for filename, size in media)
+            media_str = f"│ 📎 {files}\n"
+        heart = '❤️' if liked else '🤍'
         
-        print(f"""
+        self.io.show(f"""
 {Colors.WHITE}┌──────────────────────────────────────────────────────┐{Colors.END}
-│ {neet['avatar']} {Colors.BOLD}{neet['display_name']}{Colors.END} {badge} {Colors.CYAN}@{neet['username']}{Colors.END}
+│ {number_str}{neet['avatar']} {Colors.BOLD}{neet['display_name']}{Colors.END} {badge} {Colors.CYAN}@{neet['username']}{Colors.END}
 │ {Colors.WHITE}{time_str}{Colors.END}
 ├──────────────────────────────────────────────────────┤
 │ {neet['content'][:50]}
 │ {neet['content'][50:100] if len(neet['content']) > 50 else ''}
-├──────────────────────────────────────────────────────┤
-│ {Colors.RED}❤️ {neet['likes_count']}{Colors.END}  🔄 {neet['reneets_count']}  💬 {neet['replies_count']}
+{media_str}├──────────────────────────────────────────────────────┤
+│ {Colors.RED}{heart} {neet['likes_count']}{Colors.END}  🔄 {neet['reneets_count']}  💬 {neet['replies_count']}
 {Colors.WHITE}└──────────────────────────────────────────────────────┘{Colors.END}
         """)
     
@@ -497,7 +953,7 @@ class NettaApp:
         elif profile['verification_status'] == 1:
             badge_text = f"{Colors.BLUE}[Верифицирован]{Colors.END}"
         
-        print(f"""
+        self.io.show(f"""
 {Colors.CYAN}╔══════════════════════════════════════════════════════════════╗
 ║                         👤 ПРОФИЛЬ                            ║
 ╠══════════════════════════════════════════════════════════════╣{Colors.END}
@@ -512,7 +968,7 @@ class NettaApp:
 ║
 ║   {Colors.GREEN}📊 {profile['followers_count']} подписчиков{Colors.END}  •  {Colors.BLUE}{profile['following_count']} подписок{Colors.END}
 ║
-║   📅 Дата регистрации: {str(profile['created_at'])[:10]}
+║   📅 Дата регистрации: {format_timestamp(profile['created_at'], '%Y-%m-%d')}
 ║
 {Colors.CYAN}╚══════════════════════════════════════════════════════════════╝{Colors.END}
         """)
@@ -520,24 +976,33 @@ class NettaApp:
     def register_screen(self):
         """Экран регистрации"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  📝 РЕГИСТРАЦИЯ В NETTA")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show("  📝 РЕГИСТРАЦИЯ В NETTA")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
+        
+        # Занятые имя и email проверяем сразу, до остальных вопросов
+        username = self.io.ask(f"{Colors.CYAN}👤 Имя пользователя: {Colors.END}").strip()
+        taken = self.user.check_available(username=username)
+        if not taken:
+            email = self.io.ask(f"{Colors.CYAN}📧 Email: {Colors.END}").strip()
+            taken = self.user.check_available(email=email)
+        if taken:
+            self.io.show(f"\n{Colors.RED}{taken}{Colors.END}")
+            self.io.ask("\nНажмите Enter для продолжения...")
+            return
         
-        username = input(f"{Colors.CYAN}👤 Имя пользователя: {Colors.END}").strip()
-        email = input(f"{Colors.CYAN}📧 Email: {Colors.END}").strip()
-        password = input(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
-        password_confirm = input(f"{Colors.CYAN}🔒 Подтвердите пароль: {Colors.END}").strip()
-        display_name = input(f"{Colors.CYAN}📛 Отображаемое имя (Enter для пропуска): {Colors.END}").strip()
+        password = self.io.ask(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
+        password_confirm = self.io.ask(f"{Colors.CYAN}🔒 Подтвердите пароль: {Colors.END}").strip()
+        display_name = self.io.ask(f"{Colors.CYAN}📛 Отображаемое имя (Enter для пропуска): {Colors.END}").strip()
         
         if password != password_confirm:
-            print(f"\n{Colors.RED}❌ Пароли не совпадают!{Colors.END}")
-            input("\nНажмите Enter для продолжения...")
+            self.io.show(f"\n{Colors.RED}❌ Пароли не совпадают!{Colors.END}")
+            self.io.ask("\nНажмите Enter для продолжения...")
             return
         
         if len(password) < 6:
-            print(f"\n{Colors.RED}❌ Пароль должен быть не менее 6 символов!{Colors.END}")
-            input("\nНажмите Enter для продолжения...")
+            self.io.show(f"\n{Colors.RED}❌ Пароль должен быть не менее 6 символов!{Colors.END}")
+            self.io.ask("\nНажмите Enter для продолжения...")
             return
         
         success, message = self.user.register(
@@ -545,37 +1010,37 @@ class NettaApp:
             display_name if display_name else None
         )
         
-        print(f"\n{message}")
-        input("\nНажмите Enter для продолжения...")
+        self.io.show(f"\n{message}")
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def login_screen(self):
         """Экран входа"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  🔐 ВХОД В NETTA")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show("  🔐 ВХОД В NETTA")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        username = input(f"{Colors.CYAN}👤 Имя пользователя: {Colors.END}").strip()
-        password = input(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
+        username = self.io.ask(f"{Colors.CYAN}👤 Имя пользователя: {Colors.END}").strip()
+        password = self.io.ask(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
         
         success, message = self.user.login(username, password)
-        print(f"\n{message}")
-        input("\nНажмите Enter для продолжения...")
+        self.io.show(f"\n{message}")
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def edit_profile_screen(self):
         """Экран редактирования профиля"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  ✏️ РЕДАКТИРОВАНИЕ ПРОФИЛЯ")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show("  ✏️ РЕДАКТИРОВАНИЕ ПРОФИЛЯ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        print(f"{Colors.YELLOW}(Оставьте пустым, чтобы не менять){Colors.END}\n")
+        self.io.show(f"{Colors.YELLOW}(Оставьте пустым, чтобы не менять){Colors.END}\n")
         
-        display_name = input(f"{Colors.CYAN}📛 Новое имя: {Colors.END}").strip()
-        bio = input(f"{Colors.CYAN}📝 О себе: {Colors.END}").strip()
-        avatar = input(f"{Colors.CYAN}😀 Эмодзи-аватар: {Colors.END}").strip()
-        location = input(f"{Colors.CYAN}📍 Местоположение: {Colors.END}").strip()
-        website = input(f"{Colors.CYAN}🔗 Веб-сайт: {Colors.END}").strip()
+        display_name = self.io.ask(f"{Colors.CYAN}📛 Новое имя: {Colors.END}").strip()
+        bio = self.io.ask(f"{Colors.CYAN}📝 О себе: {Colors.END}").strip()
+        avatar = self.io.ask(f"{Colors.CYAN}😀 Эмодзи-аватар: {Colors.END}").strip()
+        location = self.io.ask(f"{Colors.CYAN}📍 Местоположение: {Colors.END}").strip()
+        website = self.io.ask(f"{Colors.CYAN}🔗 Веб-сайт: {Colors.END}").strip()
         
         success, message = self.user.update_profile(
             display_name=display_name,
@@ -585,53 +1050,91 @@ class NettaApp:
             website=website
         )
         
-        print(f"\n{message}")
-        input("\nНажмите Enter для продолжения...")
+        self.io.show(f"\n{message}")
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def create_neet_screen(self):
         """Экран создания поста"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  ✍️ НОВЫЙ NEET")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show("  ✍️ НОВЫЙ NEET")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        print(f"{Colors.YELLOW}Максимум 280 символов{Colors.END}\n")
+        self.io.show(f"{Colors.YELLOW}Максимум 280 символов{Colors.END}\n")
         
-        content = input(f"{Colors.CYAN}📝 Что нового? {Colors.END}").strip()
-        
-        success, message = self.neet.create(content)
-        print(f"\n{message}")
-        input("\nНажмите Enter для продолжения...")
-    
-    def feed_screen(self):
-        """Экран ленты"""
-        self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  📰 ЛЕНТА NETTA")
-        print(f"{'═' * 50}{Colors.END}")
+        content = self.io.ask(f"{Colors.CYAN}📝 Что нового? {Colors.END}").strip()
         
-        neets = self.neet.get_feed()
+        when = self.io.ask(f"{Colors.CYAN}🕒 Опубликовать позже (ГГГГ-ММ-ДД ЧЧ:ММ, Enter — сейчас): {Colors.END}").strip()
         
-        if not neets:
-            print(f"\n{Colors.YELLOW}Пока нет постов. Будьте первым!{Colors.END}")
-        else:
-            for neet in neets:
-                self.display_neet(neet)
+        if when:
+            # Отложенный пост — без вложений: файлы к моменту публикации могут пропасть
+            publish_at = parse_timestamp(when)
+            if publish_at is None:
+                success, message = False, "❌ Неверный формат времени!"
+            else:
+                success, message = self.neet.schedule(content, publish_at)
+            self.io.show(f"\n{message}")
+            self.io.ask("\nНажмите Enter для продолжения...")
+            return
         
-        print(f"\n{Colors.YELLOW}Действия:{Colors.END}")
-        print(f"  {Colors.CYAN}[L номер]{Colors.END} - Лайкнуть пост")
-        print(f"  {Colors.CYAN}[B]{Colors.END} - Назад")
+        attachments = []
+        while len(attachments) < MAX_ATTACHMENTS:
+            path = self.io.ask(f"{Colors.CYAN}📎 Путь к файлу (Enter — без вложений): {Colors.END}").strip()
+            if not path:
+                break
+            attachments.append(path)
         
-        action = input(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip().upper()
+        success, message = self.neet.create(content, attachments)
+        self.io.show(f"\n{message}")
+        self.io.ask("\nНажмите Enter для продолжения...")
+    
+    def feed_screen(self):
+        """Экран ленты"""
+        before_id = None
         
-        if action.startswith('L '):
-            try:
-                neet_id = int(action.split()[1])
-                success, message = self.neet.like(neet_id)
-                print(f"\n{message}")
-                input("\nНажмите Enter для продолжения...")
-            except:
-                pass
+        while True:
+            self.clear_screen()
+            self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+            self.io.show("  📰 ЛЕНТА NETTA")
+            self.io.show(f"{'═' * 50}{Colors.END}")
+            
+            neets = self.neet.get_feed(before_id=before_id)
+            
+            if not neets:
+                self.io.show(f"\n{Colors.YELLOW}Пока нет постов. Будьте первым!{Colors.END}")
+            else:
+                neet_ids = [neet['id'] for neet in neets]
+                media = self.neet.get_media(neet_ids)
+                liked = self.liked_on_page(neet_ids)
+                for number, neet in enumerate(neets, 1):
+                    self.display_neet(neet, number, media.get(neet['id']), neet['id'] in liked)
+            
+            self.io.show(f"\n{Colors.YELLOW}Действия:{Colors.END}")
+            self.io.show(f"  {Colors.CYAN}[L номер]{Colors.END} - Лайкнуть пост")
+            self.io.show(f"  {Colors.CYAN}[U номер]{Colors.END} - Убрать лайк")
+            if neets:
+                self.io.show(f"  {Colors.CYAN}[N]{Colors.END} - Следующая страница")
+            self.io.show(f"  {Colors.CYAN}[B]{Colors.END} - Назад")
+            
+            action = self.io.ask(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip().upper()
+            
+            # Следующая страница — посты с id меньше последнего показанного
+            if action == 'N' and neets:
+                before_id = neets[-1]['id']
+                continue
+            
+            if action.startswith(('L ', 'U ')):
+                try:
+                    # Номер поста на странице или его полный id
+                    number = int(action.split()[1])
+                    neet_id = neets[number - 1]['id'] if 0 < number <= len(neets) else number
+                    react = self.neet.like if action[0] == 'L' else self.neet.unlike
+                    success, message = react(neet_id)
+                    self.io.show(f"\n{message}")
+                    self.io.ask("\nНажмите Enter для продолжения...")
+                except:
+                    pass
+            break
     
     def profile_screen(self):
         """Экран профиля"""
@@ -642,25 +1145,28 @@ class NettaApp:
             self.display_profile(profile)
             
             # Показать посты пользователя
-            print(f"\n{Colors.GREEN}📝 Ваши Neets:{Colors.END}")
+            self.io.show(f"\n{Colors.GREEN}📝 Ваши Neets:{Colors.END}")
             neets = self.neet.get_user_neets(profile['id'])
             
             if neets:
+                neet_ids = [neet['id'] for neet in neets[:5]]
+                media = self.neet.get_media(neet_ids)
+                liked = self.liked_on_page(neet_ids)
                 for neet in neets[:5]:
-                    self.display_neet(neet)
+                    self.display_neet(neet, media=media.get(neet['id']), liked=neet['id'] in liked)
             else:
-                print(f"\n{Colors.YELLOW}У вас пока нет постов{Colors.END}")
+                self.io.show(f"\n{Colors.YELLOW}У вас пока нет постов{Colors.END}")
         
-        input("\nНажмите Enter для продолжения...")
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def verification_request_screen(self):
         """Экран подачи заявки на верификацию"""
         self.clear_screen()
-        print(f"\n{Colors.BLUE}{'═' * 50}")
-        print(f"  {BLUE_CHECK} ЗАЯВКА НА ВЕРИФИКАЦИЮ")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.BLUE}{'═' * 50}")
+        self.io.show(f"  {BLUE_CHECK} ЗАЯВКА НА ВЕРИФИКАЦИЮ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        print(f"""
+        self.io.show(f"""
 {Colors.WHITE}Верификация подтверждает подлинность вашего аккаунта.
 
 {Colors.BLUE}🔵 Синяя галочка{Colors.END} - для обычных пользователей
@@ -672,24 +1178,24 @@ class NettaApp:
 • Причина для верификации
         """)
         
-        reason = input(f"\n{Colors.CYAN}📝 Почему вы хотите получить верификацию? {Colors.END}").strip()
+        reason = self.io.ask(f"\n{Colors.CYAN}📝 Почему вы хотите получить верификацию? {Colors.END}").strip()
         
         if reason:
             success, message = self.user.request_verification(reason)
-            print(f"\n{message}")
+            self.io.show(f"\n{message}")
         else:
-            print(f"\n{Colors.RED}❌ Причина не может быть пустой!{Colors.END}")
+            self.io.show(f"\n{Colors.RED}❌ Причина не может быть пустой!{Colors.END}")
         
-        input("\nНажмите Enter для продолжения...")
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def view_user_screen(self):
         """Просмотр профиля другого пользователя"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  🔍 ПОИСК ПОЛЬЗОВАТЕЛЯ")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show("  🔍 ПОИСК ПОЛЬЗОВАТЕЛЯ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        username = input(f"{Colors.CYAN}👤 Введите @username: {Colors.END}").strip().replace('@', '')
+        username = self.io.ask(f"{Colors.CYAN}👤 Введите @username: {Colors.END}").strip().replace('@', '')
         
         profile = self.user.get_profile(username)
         
@@ -697,18 +1203,72 @@ class NettaApp:
             self.display_profile(profile)
             
             # Показать посты пользователя
-            print(f"\n{Colors.GREEN}📝 Neets пользователя:{Colors.END}")
+            self.io.show(f"\n{Colors.GREEN}📝 Neets пользователя:{Colors.END}")
             neets = self.neet.get_user_neets(profile['id'])
             
             if neets:
+                neet_ids = [neet['id'] for neet in neets[:5]]
+                media = self.neet.get_media(neet_ids)
+                liked = self.liked_on_page(neet_ids)
                 for neet in neets[:5]:
-                    self.display_neet(neet)
+                    self.display_neet(neet, media=media.get(neet['id']), liked=neet['id'] in liked)
             else:
-                print(f"\n{Colors.YELLOW}У этого пользователя пока нет постов{Colors.END}")
+                self.io.show(f"\n{Colors.YELLOW}У этого пользователя пока нет постов{Colors.END}")
         else:
-            print(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
+            self.io.show(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
         
-        input("\nНажмите Enter для продолжения...")
+        self.io.ask("\nНажмите Enter для продолжения...")
+    
+    def format_notification(self, notification):
+        """Текст уведомления"""
+        actor = notification['actor_display_name'] or 'Кто-то'
+        others = notification['count'] - 1
+        others_text = f" и ещё {others}" if others > 0 else ""
+        snippet = (notification['neet_content'] or '')[:40]
+        
+        if notification['kind'] == KIND_LIKE:
+            return f"❤️ {Colors.BOLD}{actor}{Colors.END}{others_text} оценили ваш Neet: «{snippet}»"
+        elif notification['kind'] == KIND_FOLLOW:
+            return f"👥 {Colors.BOLD}{actor}{Colors.END}{others_text} подписались на вас"
+        elif notification['kind'] == KIND_MENTION:
+            return f"💬 {Colors.BOLD}{actor}{Colors.END} упомянул(а) вас: «{snippet}»"
+        return f"{BLUE_CHECK} Ваша заявка на верификацию одобрена!"
+    
+    def notifications_screen(self):
+        """Экран уведомлений (постранично)"""
+        user_id = self.user.current_user['id']
+        before = None
+        
+        while True:
+            self.clear_screen()
+            self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+            self.io.show("  🔔 УВЕДОМЛЕНИЯ")
+            self.io.show(f"{'═' * 50}{Colors.END}\n")
+            
+            notifications = self.notifications.get_inbox(user_id, before=before)
+            
+            if not notifications:
+                self.io.show(f"{Colors.YELLOW}Уведомлений нет{Colors.END}")
+            else:
+                for notification in notifications:
+                    new_mark = f"{Colors.RED}●{Colors.END} " if not notification['is_read'] else "  "
+                    time_str = format_timestamp(notification['updated_at'])
+                    self.io.show(f"{new_mark}{Colors.WHITE}{time_str}{Colors.END}  {self.format_notification(notification)}")
+                
+                # Показанная страница считается прочитанной
+                self.notifications.mark_read(user_id, [n['id'] for n in notifications if not n['is_read']])
+            
+            self.io.show(f"\n{Colors.YELLOW}Действия:{Colors.END}")
+            if notifications:
+                self.io.show(f"  {Colors.CYAN}[N]{Colors.END} - Следующая страница")
+            self.io.show(f"  {Colors.CYAN}[B]{Colors.END} - Назад")
+            
+            action = self.io.ask(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip().upper()
+            
+            if action == 'N' and notifications:
+                before = (notifications[-1]['updated_at'], notifications[-1]['id'])
+                continue
+            break
     
     def main_menu(self):
         """Главное меню (после авторизации)"""
@@ -721,7 +1281,10 @@ class NettaApp:
                 self.user.current_user['is_admin']
             )
             
-            print(f"\n{Colors.GREEN}Вы вошли как: {Colors.BOLD}{self.user.current_user['display_name']}{Colors.END} {badge} {Colors.CYAN}@{self.user.current_user['username']}{Colors.END}")
+            self.io.show(f"\n{Colors.GREEN}Вы вошли как: {Colors.BOLD}{self.user.current_user['display_name']}{Colors.END} {badge} {Colors.CYAN}@{self.user.current_user['username']}{Colors.END}")
+            
+            unread = self.notifications.unread_count(self.user.current_user['id'])
+            unread_badge = f" {Colors.RED}({unread}){Colors.END}" if unread else ""
             
             menu = {
                 '1': '📰 Лента',
@@ -730,12 +1293,13 @@ class NettaApp:
                 '4': '✏️ Редактировать профиль',
                 '5': '🔍 Найти пользователя',
                 '6': f'{BLUE_CHECK} Подать заявку на верификацию',
+                '7': f'🔔 Уведомления{unread_badge}',
                 '0': '🚪 Выйти'
             }
             
             self.print_menu(menu, "Главное меню")
             
-            choice = input(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip()
+            choice = self.io.ask(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip()
             
             if choice == '1':
                 self.feed_screen()
@@ -749,9 +1313,11 @@ class NettaApp:
                 self.view_user_screen()
             elif choice == '6':
                 self.verification_request_screen()
+            elif choice == '7':
+                self.notifications_screen()
             elif choice == '0':
                 success, message = self.user.logout()
-                print(f"\n{message}")
+                self.io.show(f"\n{message}")
                 break
     
     def run(self):
@@ -769,7 +1335,7 @@ class NettaApp:
             
             self.print_menu(menu, "Добро пожаловать!")
             
-            choice = input(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip()
+            choice = self.io.ask(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip()
             
             if choice == '1':
                 self.login_screen()
@@ -781,7 +1347,7 @@ class NettaApp:
                 self.feed_screen()
             elif choice == '0':
                 self.clear_screen()
-                print(f"\n{Colors.CYAN}👋 Спасибо за использование Netta! До встречи!{Colors.END}\n")
+                self.io.show(f"\n{Colors.CYAN}👋 Спасибо за использование Netta! До встречи!{Colors.END}\n")
                 break
 
 
@@ -790,5 +1356,19 @@ class NettaApp:
 # ═══════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
-    app = NettaApp()
+    app = NettaApp(
+        archive_dir=os.environ.get("NETTA_ARCHIVE_DIR"),
+        media_dir=os.environ.get("NETTA_MEDIA_DIR")
+    )
+    
+    # NETTA_PROFILE=<каталог> — профилировать действия меню и методы User/Neet
+    from netta_profiling import profile_dir, enable_app_profiling
+    if profile_dir():
+        enable_app_profiling(app, profile_dir())
+    
+    # NETTA_RECORD=<файл> — записывать вызовы User/Neet для повтора
+    from netta_replay import record_path, Recorder, enable_app_recording
+    if record_path():
+        enable_app_recording(app, Recorder(record_path(), app.db.db_name))
+    
     app.run()
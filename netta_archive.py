@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🗃️ NETTA ARCHIVE - Архив старых постов            ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Старые neets и их лайки переносятся пачками из основной базы
+в помесячные файлы архива (neets_ГГГГ_ММ.db), которые подключаются
+через ATTACH только на время запроса. Лента работает только
+с «горячей» базой.
+"""
+
+import glob
+import os
+import sqlite3
+import zlib
+import time
+
+from netta_ids import make_id, MAX_ID
+from netta_models import NeetView
+
+# ═══════════════════════════════════════════════════════════════
+# 🗃️ АРХИВ NEETS
+# ═══════════════════════════════════════════════════════════════
+
+ARCHIVE_ALIAS = "archive"
+
+
+def compress_content(content):
+    """Сжатие текста поста (только если это выгодно)"""
+    if content is None:
+        return None
+    data = content.encode('utf-8')
+    packed = zlib.compress(data, 9)
+    return packed if len(packed) < len(data) else content
+
+
+def decompress_content(content):
+    """Распаковка текста поста из архива"""
+    if isinstance(content, bytes):
+        return zlib.decompress(content).decode('utf-8')
+    return content
+
+
+class NeetArchive:
+    def __init__(self, db, archive_dir="archive", max_age_days=180,
+                 batch_size=500, compress=False):
+        self.db = db
+        self.archive_dir = archive_dir
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.compress = compress
+        os.makedirs(self.archive_dir, exist_ok=True)
+    
+    def month_path(self, month):
+        """Путь к файлу архива за месяц (month = 'ГГГГ_ММ')"""
+        return os.path.join(self.archive_dir, f"neets_{month}.db")
+    
+    def archive_months(self):
+        """Список месяцев в архиве, от новых к старым"""
+        files = glob.glob(os.path.join(self.archive_dir, "neets_*.db"))
+        months = [os.path.basename(f)[len("neets_"):-len(".db")] for f in files]
+        return sorted(months, reverse=True)
+    
+    def attach(self, conn, month):
+        """Подключить файл архива к соединению"""
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_ALIAS}", (self.month_path(month),))
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_ALIAS}.neets (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                content NOT NULL,
+                likes_count INTEGER DEFAULT 0,
+                reneets_count INTEGER DEFAULT 0,
+                replies_count INTEGER DEFAULT 0,
+                created_at INTEGER
+            )
+        ''')
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_neets_user_id
+            ON neets (user_id, id)
+        ''')
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_ALIAS}.likes (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                neet_id INTEGER NOT NULL,
+                created_at INTEGER
+            )
+        ''')
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_likes_neet
+            ON likes (neet_id)
+        ''')
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_likes_user
+            ON likes (user_id)
+        ''')
+    
+    def detach(self, conn):
+        """Отключить файл архива"""
+        conn.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+    
+    def cutoff_id(self):
+        """Граница возраста: посты с меньшим id уходят в архив"""
+        border_ms = int(time.time() * 1000) - self.max_age_days * 86400000
+        return make_id(border_ms)
+    
+    # ─── Перенос в архив ───────────────────────────────────────
+    
+    def archive_batch(self):
+        """Перенести одну пачку старых постов. Возвращает число перенесенных"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, user_id, strftime('%Y_%m', created_at / 1000, 'unixepoch') FROM neets
+            WHERE id < ?
+            ORDER BY id
+            LIMIT ?
+        ''', (self.cutoff_id(), self.batch_size))
+        rows = cursor.fetchall()
+        
+        if not rows:
+            conn.close()
+            return 0
+        
+        by_month = {}
+        for neet_id, user_id, month in rows:
+            by_month.setdefault(month, []).append((neet_id, user_id))
+        
+        if self.compress:
+            conn.create_function("netta_compress", 1, compress_content, deterministic=True)
+        content_expr = "netta_compress(content)" if self.compress else "content"
+        
+        for month, items in by_month.items():
+            ids = [neet_id for neet_id, _ in items]
+            marks = ','.join('?' * len(ids))
+            
+            self.attach(conn, month)
+            try:
+                # Сначала копируем (повторный запуск после сбоя не создаст дублей),
+                # затем удаляем из горячей базы — всё в одной транзакции
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO {ARCHIVE_ALIAS}.neets
+                        (id, user_id, content, likes_count, reneets_count,
+                         replies_count, created_at)
+                    SELECT id, user_id, {content_expr}, likes_count, reneets_count,
+                           replies_count, created_at
+                    FROM main.neets WHERE id IN ({marks})
+                ''', ids)
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO {ARCHIVE_ALIAS}.likes (id, user_id, neet_id, created_at)
+                    SELECT id, user_id, neet_id, created_at
+                    FROM main.likes WHERE neet_id IN ({marks})
+                ''', ids)
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO main.neet_archive_months (user_id, month)
+                    VALUES (?, ?)
+                ''', {(user_id, month) for _, user_id in items})
+                cursor.execute(f'DELETE FROM main.likes WHERE neet_id IN ({marks})', ids)
+                cursor.execute(f'DELETE FROM main.neets WHERE id IN ({marks})', ids)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                self.detach(conn)
+                conn.close()
+                raise
+            self.detach(conn)
+        
+        conn.close()
+        return len(rows)
+    
+    def run(self, max_batches=None):
+        """Переносить пачки, пока есть старые посты"""
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.archive_batch()
+            if not count:
+                break
+            moved += count
+            batches += 1
+        return moved
+    
+    # ─── Чтение из архива ──────────────────────────────────────
+    
+    def user_months(self, conn, user_id):
+        """Месяцы, в которых у пользователя есть архивные посты"""
+        cursor = conn.execute('''
+            SELECT month FROM neet_archive_months
+            WHERE user_id = ? ORDER BY month DESC
+        ''', (user_id,))
+        return [row[0] for row in cursor.fetchall()]
+    
+    def get_user_neets(self, user_id, limit=20, before_id=None):
+        """Архивные посты пользователя, от новых к старым"""
+        conn = self.db.get_connection()
+        result = []
+        
+        for month in self.user_months(conn, user_id):
+            if len(result) >= limit:
+                break
+            if not os.path.exists(self.month_path(month)):
+                continue
+            self.attach(conn, month)
+            cursor = conn.execute(f'''
+                SELECT n.id, n.user_id, n.content, n.likes_count, n.reneets_count,
+                       n.replies_count, n.created_at, u.username, u.display_name,
+                       u.avatar, u.verification_status, u.is_admin
+                FROM {ARCHIVE_ALIAS}.neets n
+                JOIN main.users u ON n.user_id = u.id
+                WHERE n.user_id = ? AND n.id < ?
+                ORDER BY n.id DESC
+                LIMIT ?
+            ''', (user_id, before_id if before_id is not None else MAX_ID, limit - len(result)))
+            for row in cursor.fetchall():
+                result.append(NeetView(*row[:2], decompress_content(row[2]), *row[3:]))
+            self.detach(conn)
+        
+        conn.close()
+        return result
+    
+    def find_neet(self, neet_id):
+        """Найти архивный пост: (месяц, текст) или None"""
+        conn = self.db.get_connection()
+        
+        for month in self.archive_months():
+            self.attach(conn, month)
+            row = conn.execute(
+                f'SELECT content FROM {ARCHIVE_ALIAS}.neets WHERE id = ?', (neet_id,)
+            ).fetchone()
+            self.detach(conn)
+            if row:
+                conn.close()
+                return month, decompress_content(row[0])
+        
+        conn.close()
+        return None
+    
+    # ─── Удаление (для админ-панели) ───────────────────────────
+    
+    def delete_neet(self, neet_id, month=None):
+        """Удалить архивный пост и его лайки"""
+        if month is None:
+            found = self.find_neet(neet_id)
+            if not found:
+                return False
+            month = found[0]
+        
+        conn = self.db.get_connection()
+        self.attach(conn, month)
+        deleted = self.delete_attached_neet(conn.cursor(), neet_id)
+        conn.commit()
+        self.detach(conn)
+        conn.close()
+        return deleted
+    
+    def delete_attached_neet(self, cursor, neet_id):
+        """Удалить архивный пост и его лайки в транзакции вызывающего кода
+        (файл месяца уже подключен к соединению через attach)"""
+        cursor.execute(f'DELETE FROM {ARCHIVE_ALIAS}.likes WHERE neet_id = ?', (neet_id,))
+        cursor.execute(f'DELETE FROM {ARCHIVE_ALIAS}.neets WHERE id = ?', (neet_id,))
+        return cursor.rowcount > 0
+    
+    def delete_user(self, user_id):
+        """Удалить все архивные посты и лайки пользователя"""
+        conn = self.db.get_connection()
+        
+        # Лайки пользователя могут лежать в любом месяце, поэтому обходим все файлы
+        for month in self.archive_months():
+            self.attach(conn, month)
+            conn.execute(f'''
+                DELETE FROM {ARCHIVE_ALIAS}.likes WHERE neet_id IN (
+                    SELECT id FROM {ARCHIVE_ALIAS}.neets WHERE user_id = ?
+                )
+            ''', (user_id,))
+            # Сверщик счетчиков архив не проходит — счетчики правим сразу
+            conn.execute(f'''
+                UPDATE {ARCHIVE_ALIAS}.neets SET likes_count = MAX(likes_count - 1, 0)
+                WHERE id IN (SELECT neet_id FROM {ARCHIVE_ALIAS}.likes WHERE user_id = ?)
+            ''', (user_id,))
+            conn.execute(f'DELETE FROM {ARCHIVE_ALIAS}.likes WHERE user_id = ?', (user_id,))
+            conn.execute(f'DELETE FROM {ARCHIVE_ALIAS}.neets WHERE user_id = ?', (user_id,))
+            conn.commit()
+            self.detach(conn)
+        
+        conn.execute('DELETE FROM neet_archive_months WHERE user_id = ?', (user_id,))
+        conn.commit()
+        conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК АРХИВАЦИИ
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Перенос старых neets в архив")
+    parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    parser.add_argument("--dir", default="archive", help="каталог архива")
+    parser.add_argument("--days", type=int, default=180, help="возраст постов в днях")
+    parser.add_argument("--batch", type=int, default=500, help="размер пачки")
+    parser.add_argument("--compress", action="store_true", help="сжимать текст постов")
+    args = parser.parse_args()
+    
+    archive = NeetArchive(Database(args.db), args.dir, args.days, args.batch, args.compress)
+    moved = archive.run()
+    print(f"🗃️ Перенесено в архив: {moved} neets")
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              📜 NETTA AUDIT - Журнал действий администраторов  ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Каждое действие админ-панели записывается в audit_log: кто (actor_id),
+что сделал (action), с каким объектом ('user:5', 'neet:…') и состояние
+объекта до и после (JSON). Записи только добавляются.
+
+Чтобы журнал не тормозил модерацию, записи копятся в памяти и пишутся
+пачкой в одной транзакции — когда набралось batch_size записей, прошло
+max_delay секунд или панель закрывается. Время записи берется в момент
+действия, а не записи на диск. Поиск по администратору, объекту и
+периоду идет по индексам (actor_id, ts), (target, ts) и (ts).
+
+Старые записи переносятся в помесячные файлы audit_ГГГГ_ММ.db:
+    
+    python netta_audit.py archive --days 365
+    python netta_audit.py show --actor 1
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from netta_time import now_ms, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 📜 ЖУРНАЛ ДЕЙСТВИЙ
+# ═══════════════════════════════════════════════════════════════
+
+# Действия, у которых нет события в netta_events
+ADMIN_CREATED = 'admin.created'
+SPAM_CLUSTER_DELETED = 'spam.cluster_deleted'
+
+ARCHIVE_ALIAS = "audit_archive"
+
+AUDIT_COLUMNS = "id, ts, actor_id, action, target, before_state, after_state"
+
+
+def create_audit_tables(cursor, schema='main'):
+    """Журнал действий и индексы для поиска"""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.audit_log (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            actor_id INTEGER,
+            action TEXT NOT NULL,
+            target TEXT,
+            before_state TEXT,
+            after_state TEXT
+        )
+    ''')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_audit_actor ON audit_log (actor_id, ts)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_audit_target ON audit_log (target, ts)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_audit_ts ON audit_log (ts)')
+
+
+def target(kind, entity_id):
+    """Обозначение объекта действия: target('user', 5) → 'user:5'"""
+    return f"{kind}:{entity_id}"
+
+
+def dump_state(state):
+    return json.dumps(state, ensure_ascii=False) if state is not None else None
+
+
+class AuditLog:
+    def __init__(self, db, batch_size=50, max_delay=2.0, archive_dir="audit",
+                 max_age_days=365, archive_every=3600):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.archive_dir = archive_dir
+        # Скользящий архив: поток записи раз в archive_every секунд
+        # переносит одну пачку записей старше max_age_days
+        self.max_age_days = max_age_days
+        self.archive_every = archive_every
+        self.archived_at = time.monotonic()
+        self.buffer = []
+        self.lock = threading.Lock()
+        # Поток записи просыпается по таймеру или когда пачка набралась
+        self.wake = threading.Event()
+        self.closed = False
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+    
+    def record(self, actor_id, action, target=None, before=None, after=None):
+        """Добавить запись в буфер (на диск — со следующей пачкой)"""
+        with self.lock:
+            self.buffer.append((now_ms(), actor_id, action, target,
+                                dump_state(before), dump_state(after)))
+            full = len(self.buffer) >= self.batch_size
+        if full:
+            self.wake.set()
+    
+    def flush(self):
+        """Записать буфер одной транзакцией. Возвращает число записей"""
+        with self.lock:
+            batch, self.buffer = self.buffer, []
+        if not batch:
+            return 0
+        
+        conn = self.db.get_connection()
+        try:
+            conn.executemany('''
+                INSERT INTO audit_log (ts, actor_id, action, target, before_state, after_state)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', batch)
+            conn.commit()
+        except sqlite3.OperationalError:
+            # База занята: возвращаем пачку в начало буфера до следующей попытки
+            conn.rollback()
+            with self.lock:
+                self.buffer[:0] = batch
+            raise
+        finally:
+            conn.close()
+        return len(batch)
+    
+    def write_loop(self):
+        while not self.closed:
+            self.wake.wait(self.max_delay)
+            self.wake.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self.archived_at >= self.archive_every:
+                    self.archived_at = time.monotonic()
+                    self.archive_batch(self.max_age_days)
+            except sqlite3.OperationalError:
+                pass
+    
+    def close(self):
+        """Остановить поток записи и сбросить остаток буфера"""
+        if self.closed:
+            return
+        self.closed = True
+        self.wake.set()
+        self.writer.join()
+        self.flush()
+        atexit.unregister(self.close)
+    
+    # ─── Поиск ─────────────────────────────────────────────────
+    
+    def query(self, actor_id=None, target=None, since=None, until=None, before=None, limit=20):
+        """Записи от новых к старым.
+        
+        before — (ts, id) последней показанной записи для следующей страницы.
+        Возвращает [(id, ts, actor_id, username, action, target, до, после)].
+        """
+        # Свои только что сделанные действия тоже должны быть видны
+        self.flush()
+        
+        conditions, params = [], []
+        if actor_id is not None:
+            conditions.append('a.actor_id = ?')
+            params.append(actor_id)
+        if target is not None:
+            conditions.append('a.target = ?')
+            params.append(target)
+        if since is not None:
+            conditions.append('a.ts >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('a.ts < ?')
+            params.append(until)
+        if before is not None:
+            conditions.append('(a.ts, a.id) < (?, ?)')
+            params.extend(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        conn = self.db.get_connection()
+        cursor = conn.execute(f'''
+            SELECT a.id, a.ts, a.actor_id, u.username, a.action, a.target,
+                   a.before_state, a.after_state
+            FROM audit_log a
+            LEFT JOIN users u ON a.actor_id = u.id
+            {where}
+            ORDER BY a.ts DESC, a.id DESC
+            LIMIT ?
+        ''', params + [limit])
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    
+    # ─── Архив ─────────────────────────────────────────────────
+    
+    def month_path(self, month):
+        return os.path.join(self.archive_dir, f"audit_{month}.db")
+    
+    def archive_batch(self, max_age_days, batch_size=1000):
+        """Перенести пачку старых записей в помесячные файлы. Возвращает число записей"""
+        cutoff = now_ms() - max_age_days * 86400000
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, strftime('%Y_%m', ts / 1000, 'unixepoch') FROM audit_log
+            WHERE ts < ?
+            ORDER BY ts
+            LIMIT ?
+        ''', (cutoff, batch_size))
+        rows = cursor.fetchall()
+        
+        by_month = {}
+        for entry_id, month in rows:
+            by_month.setdefault(month, []).append(entry_id)
+        
+        if by_month:
+            os.makedirs(self.archive_dir, exist_ok=True)
+        
+        for month, ids in by_month.items():
+            marks = ','.join('?' * len(ids))
+            cursor.execute(f"ATTACH DATABASE ? AS {ARCHIVE_ALIAS}", (self.month_path(month),))
+            try:
+                create_audit_tables(cursor, ARCHIVE_ALIAS)
+                # Повторный перенос после сбоя не создаст дублей
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO {ARCHIVE_ALIAS}.audit_log ({AUDIT_COLUMNS})
+                    SELECT {AUDIT_COLUMNS} FROM main.audit_log WHERE id IN ({marks})
+                ''', ids)
+                cursor.execute(f'DELETE FROM main.audit_log WHERE id IN ({marks})', ids)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                cursor.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+                conn.close()
+                raise
+            cursor.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+        
+        conn.close()
+        return len(rows)
+    
+    def archive(self, max_age_days, batch_size=1000):
+        """Переносить пачки, пока в горячей базе есть старые записи"""
+        moved = 0
+        while True:
+            count = self.archive_batch(max_age_days, batch_size)
+            if not count:
+                return moved
+            moved += count
+
+
+def describe(state):
+    """Состояние объекта одной строкой для экрана"""
+    if state is None:
+        return '—'
+    return ', '.join(f"{key}={value}" for key, value in json.loads(state).items())
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Журнал действий администраторов Netta")
+    parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    archive_parser = commands.add_parser('archive', help='перенести старые записи в архив')
+    archive_parser.add_argument("--dir", default="audit", help="каталог архива")
+    archive_parser.add_argument("--days", type=int, default=365, help="возраст записей в днях")
+    
+    show_parser = commands.add_parser('show', help='последние записи')
+    show_parser.add_argument("--actor", type=int, help="id администратора")
+    show_parser.add_argument("--target", help="объект, например user:5")
+    show_parser.add_argument("--days", type=int, help="только за последние N дней")
+    show_parser.add_argument("--limit", type=int, default=50)
+    
+    args = parser.parse_args()
+    
+    audit = AuditLog(Database(args.db), archive_dir=getattr(args, 'dir', 'audit'))
+    
+    if args.command == 'archive':
+        started = time.perf_counter()
+        moved = audit.archive(args.days)
+        print(f"📜 Перенесено в архив: {moved} записей за {time.perf_counter() - started:.2f} с")
+    else:
+        since = now_ms() - args.days * 86400000 if args.days else None
+        for _, ts, actor_id, username, action, obj, before, after in audit.query(
+                args.actor, args.target, since, limit=args.limit):
+            print(f"{format_timestamp(ts, '%Y-%m-%d %H:%M:%S')}  @{username or actor_id}  "
+                  f"{action}  {obj or ''}  {describe(before)} → {describe(after)}")
+    
+    audit.close()
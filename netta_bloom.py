@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🌸 NETTA BLOOM - Свободно ли имя или email        ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Счетный фильтр Блума по всем username и email (в нижнем регистре).
+«Нет в фильтре» значит «точно свободно» — ответ без SQLite; «есть»
+значит «возможно занято» — тогда проверяем по уникальному индексу.
+Счетчики вместо битов позволяют убирать имена удаленных пользователей.
+
+Фильтр строится потоковым проходом по users и сохраняется в файл
+рядом с базой; при следующем запуске загружается файл и дочитываются
+только пользователи с id больше сохраненного. Регистрации в других
+процессах фильтр подбирает тем же дочитыванием, не чаще раза в
+refresh_interval секунд. У базы в памяти файла нет (path = None) —
+фильтр строится при каждом запуске. Процесс с отстающим фильтром не
+перезаписывает файл, сохраненный другим процессом с большим id:
+сначала дочитывает пользователей до него. Отстающий фильтр может ошибиться только в
+сторону «свободно» для только что занятого имени — окончательное
+решение все равно за ограничением UNIQUE при INSERT.
+"""
+
+import atexit
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+
+# ═══════════════════════════════════════════════════════════════
+# 🌸 СЧЕТНЫЙ ФИЛЬТР БЛУМА
+# ═══════════════════════════════════════════════════════════════
+
+MAGIC = b'NBF1'
+# magic, размер, число хешей, емкость, элементов, id последнего учтенного пользователя
+HEADER = struct.Struct('<4sQQQQQ')
+MAX_COUNTER = 255
+SCAN_BATCH = 10000
+
+
+def normalize(value):
+    return value.strip().lower()
+
+
+class CountingBloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.counters = bytearray(self.size)
+        self.count = 0
+    
+    def positions(self, item):
+        """Позиции счетчиков: двойное хеширование двух половин blake2b"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+    
+    def add(self, item):
+        for position in self.positions(item):
+            if self.counters[position] < MAX_COUNTER:
+                self.counters[position] += 1
+        self.count += 1
+    
+    def remove(self, item):
+        """Убрать элемент (только если он добавлялся: иначе появятся ложные «свободно»)"""
+        positions = self.positions(item)
+        if not all(self.counters[position] for position in positions):
+            return
+        for position in positions:
+            # Переполненный счетчик больше не точен — оставляем его навсегда
+            if self.counters[position] < MAX_COUNTER:
+                self.counters[position] -= 1
+        self.count -= 1
+    
+    def __contains__(self, item):
+        return all(self.counters[position] for position in self.positions(item))
+
+
+class NameFilter:
+    """Фильтр занятых username и email поверх таблицы users"""
+    
+    def __init__(self, db, path, error_rate=0.01, refresh_interval=1.0, clock=time.monotonic):
+        self.db = db
+        self.path = path
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        # Дочитывает один поток, остальные в это время отвечают по текущему фильтру
+        self.refreshing = threading.Lock()
+        self.filter = None
+        self.last_user_id = 0
+        self.refreshed_at = None
+        self.stats = {'definitely_free': 0, 'lookups': 0, 'false_positives': 0}
+        if not self.load():
+            self.rebuild()
+        atexit.register(self.save)
+    
+    # ─── Построение и файл ─────────────────────────────────────
+    
+    def scan(self, after_id=0):
+        """Потоковый проход по пользователям с id больше after_id"""
+        conn = self.db.get_connection()
+        cursor = conn.execute('''
+            SELECT id, username, email FROM users WHERE id > ? ORDER BY id
+        ''', (after_id,))
+        while True:
+            rows = cursor.fetchmany(SCAN_BATCH)
+            if not rows:
+                break
+            yield from rows
+        conn.close()
+    
+    def rebuild(self):
+        """Построить фильтр заново с запасом емкости вдвое"""
+        conn = self.db.get_connection()
+        users = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+        conn.close()
+        
+        bloom = CountingBloomFilter(max(2 * 2 * users, 100000), self.error_rate)
+        last_user_id = 0
+        for user_id, username, email in self.scan():
+            bloom.add(f"u:{normalize(username)}")
+            bloom.add(f"e:{normalize(email)}")
+            last_user_id = user_id
+        
+        with self.lock:
+            self.filter = bloom
+            self.last_user_id = last_user_id
+            self.refreshed_at = self.clock()
+    
+    def load(self):
+        """Загрузить сохраненный фильтр и дочитать новых пользователей"""
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, 'rb') as f:
+                magic, size, hashes, capacity, count, last_user_id = HEADER.unpack(f.read(HEADER.size))
+                counters = bytearray(f.read())
+        except (OSError, struct.error):
+            return False
+        if magic != MAGIC or len(counters) != size:
+            return False
+        
+        # Файл от другой (или пересозданной) базы
+        conn = self.db.get_connection()
+        max_id = conn.execute('SELECT MAX(id) FROM users').fetchone()[0] or 0
+        conn.close()
+        if last_user_id > max_id:
+            return False
+        
+        bloom = CountingBloomFilter.__new__(CountingBloomFilter)
+        bloom.capacity, bloom.size, bloom.hashes = capacity, size, hashes
+        bloom.counters, bloom.count = counters, count
+        self.filter = bloom
+        self.last_user_id = last_user_id
+        self.refresh(force=True)
+        return True
+    
+    def stored_last_user_id(self):
+        """id последнего пользователя в сохраненном файле (0, если файла нет)"""
+        try:
+            with open(self.path, 'rb') as f:
+                return HEADER.unpack(f.read(HEADER.size))[5]
+        except (OSError, struct.error):
+            return 0
+    
+    def save(self):
+        """Записать фильтр во временный файл и атомарно заменить старый"""
+        if self.path is None:
+            return
+        # Файл другого процесса новее — догоняем его, а не откатываем
+        stored = self.stored_last_user_id()
+        if stored > self.last_user_id:
+            self.refresh(force=True)
+            if stored > self.last_user_id:
+                return
+        with self.lock:
+            bloom = self.filter
+            header = HEADER.pack(MAGIC, bloom.size, bloom.hashes, bloom.capacity,
+                                 bloom.count, self.last_user_id)
+            counters = bytes(bloom.counters)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(counters)
+        os.replace(temp_path, self.path)
+    
+    def refresh(self, force=False):
+        """Дочитать пользователей, зарегистрированных после последнего прохода"""
+        now = self.clock()
+        if not force and self.refreshed_at is not None and now - self.refreshed_at < self.refresh_interval:
+            return
+        if not self.refreshing.acquire(blocking=False):
+            return
+        try:
+            self.refreshed_at = now
+            for user_id, username, email in self.scan(self.last_user_id):
+                self.add(username, email, user_id)
+            
+            # Фильтр переполнен — ложных «возможно занято» становится слишком много
+            if self.filter.count > self.filter.capacity:
+                self.rebuild()
+        finally:
+            self.refreshing.release()
+    
+    # ─── Изменения ─────────────────────────────────────────────
+    
+    def add(self, username, email, user_id=None):
+        with self.lock:
+            self.filter.add(f"u:{normalize(username)}")
+            self.filter.add(f"e:{normalize(email)}")
+            if user_id is not None:
+                self.last_user_id = max(self.last_user_id, user_id)
+    
+    def remove(self, username, email, user_id=None):
+        with self.lock:
+            # Пользователя, которого фильтр еще не дочитал, в счетчиках нет
+            if user_id is not None and user_id > self.last_user_id:
+                return
+            self.filter.remove(f"u:{normalize(username)}")
+            self.filter.remove(f"e:{normalize(email)}")
+    
+    # ─── Проверка ──────────────────────────────────────────────
+    
+    def is_taken(self, column, value):
+        """Занято ли значение: без базы для точно свободных, иначе по индексу"""
+        self.refresh()
+        
+        prefix = 'u' if column == 'username' else 'e'
+        with self.lock:
+            maybe_taken = f"{prefix}:{normalize(value)}" in self.filter
+        if not maybe_taken:
+            self.stats['definitely_free'] += 1
+            return False
+        
+        self.stats['lookups'] += 1
+        conn = self.db.get_connection()
+        taken = conn.execute(
+            f'SELECT 1 FROM users WHERE {column} = ?', (value,)
+        ).fetchone() is not None
+        conn.close()
+        if not taken:
+            self.stats['false_positives'] += 1
+        return taken
+    
+    def username_taken(self, username):
+        return self.is_taken('username', username)
+    
+    def email_taken(self, email):
+        return self.is_taken('email', email)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              ⚡ NETTA CACHE - Кеш первой страницы ленты        ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Первая страница ленты одинакова для гостей и вошедших пользователей,
+поэтому она хранится в памяти процесса. Новые посты и лайки обновляют
+кеш на месте, удаление сбрасывает его. Строки в кеше не изменяются:
+у каждой страницы своя копия нового поста, а лайк заменяет строку
+обновленной копией — строки, уже отданные вызывающим, не меняются.
+Если кеш пуст, запрос к базе выполняет только один поток, остальные
+ждут его результат.
+Изменения из других процессов (админ-панель) видны не позже, чем
+через ttl секунд.
+"""
+
+import copy
+import threading
+import time
+
+# ═══════════════════════════════════════════════════════════════
+# ⚡ КЕШ ЛЕНТЫ
+# ═══════════════════════════════════════════════════════════════
+
+class CacheEntry:
+    __slots__ = ('neets', 'loaded_at')
+    
+    def __init__(self, neets, loaded_at):
+        self.neets = neets
+        self.loaded_at = loaded_at
+
+
+class Flight:
+    """Загрузка, которую ждут все одновременные запросы того же ключа"""
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FeedCache:
+    def __init__(self, ttl=5.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = {}                 # limit → CacheEntry
+        self.flights = {}                 # limit → Flight
+        # Растет при каждом сбросе: загрузка, начатая до сброса, не попадает в кеш
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0                # запросы, дождавшиеся чужой загрузки
+        self.lock = threading.Lock()
+    
+    def get(self, limit, loader):
+        """Первая страница ленты размера limit; loader() читает ее из базы"""
+        with self.lock:
+            entry = self.entries.get(limit)
+            if entry and self.clock() - entry.loaded_at < self.ttl:
+                self.hits += 1
+                return list(entry.neets)
+            
+            flight = self.flights.get(limit)
+            leader = flight is None
+            if not leader:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                flight = Flight()
+                self.flights[limit] = flight
+                generation = self.generation
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return list(flight.result)
+        
+        try:
+            flight.result = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[limit]
+                if flight.error is None and generation == self.generation:
+                    self.entries[limit] = CacheEntry(flight.result, self.clock())
+            flight.done.set()
+        
+        return list(flight.result)
+    
+    def invalidate(self):
+        """Сбросить кеш (удаление постов или пользователей)"""
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+    
+    def on_create(self, neet):
+        """Новый пост попадает на каждую закешированную страницу (по убыванию id:
+        одновременные посты могут прийти сюда не по порядку)"""
+        with self.lock:
+            self.generation += 1
+            for limit, entry in self.entries.items():
+                neets = entry.neets + [copy.copy(neet)]
+                neets.sort(key=lambda row: row['id'], reverse=True)
+                entry.neets = neets[:limit]
+    
+    def on_like(self, neet_id, delta=1):
+        """Обновить счетчик лайков поста, если он есть в кеше"""
+        with self.lock:
+            self.generation += 1
+            for entry in self.entries.values():
+                for index, neet in enumerate(entry.neets):
+                    if neet['id'] == neet_id:
+                        updated = copy.copy(neet)
+                        updated['likes_count'] += delta
+                        entry.neets = entry.neets[:index] + [updated] + entry.neets[index + 1:]
+                        break
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'pages': len(self.entries),
+            }
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              ⌨️ NETTA CONSOLE - Ввод и вывод интерфейса        ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+NettaApp и AdminDashboard спрашивают, печатают и очищают экран через
+объект io. По умолчанию это терминал; ScriptedIO подставляет ответы
+из списка и отбрасывает вывод — так сценарии пользователей можно
+прогонять без человека (нагрузочный тест, проверки).
+"""
+
+import os
+import select
+import sys
+import time
+
+# ═══════════════════════════════════════════════════════════════
+# ⌨️ ВВОД И ВЫВОД
+# ═══════════════════════════════════════════════════════════════
+
+class ConsoleIO:
+    """Обычный терминал"""
+    
+    def ask(self, prompt=''):
+        return input(prompt)
+    
+    def show(self, *args, **kwargs):
+        print(*args, **kwargs)
+    
+    def clear(self):
+        os.system('cls' if os.name == 'nt' else 'clear')
+    
+    def home(self):
+        """Курсор в начало экрана и очистка ниже — перерисовка без мигания"""
+        print('\033[H\033[J', end='', flush=True)
+    
+    def wait_line(self, timeout):
+        """Строка, если ее ввели за timeout секунд, иначе None"""
+        if os.name == 'nt':
+            import msvcrt
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    return input()
+                time.sleep(0.05)
+            return None
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        return sys.stdin.readline().rstrip('\n') if ready else None
+
+
+class ScriptEnd(EOFError):
+    """Ответы сценария закончились"""
+
+
+class ScriptedIO:
+    """Ответы из списка вместо клавиатуры.
+    
+    Ответ может быть парой (метка, ответ): тогда время от ответа до
+    следующего вопроса интерфейса записывается в timings как время
+    этого действия.
+    """
+    
+    def __init__(self, answers, echo=False, clock=time.perf_counter):
+        self.answers = iter(answers)
+        self.echo = echo
+        self.clock = clock
+        self.timings = []             # [(метка, секунды)]
+        self.pending = None           # (метка, начало) действия, которое сейчас выполняется
+    
+    def ask(self, prompt=''):
+        self.finish_action()
+        
+        try:
+            answer = next(self.answers)
+        except StopIteration:
+            raise ScriptEnd(prompt) from None
+        
+        label = None
+        if isinstance(answer, tuple):
+            label, answer = answer
+        
+        if self.echo:
+            print(f"{prompt}{answer}")
+        if label:
+            self.pending = (label, self.clock())
+        return answer
+    
+    def finish_action(self):
+        if self.pending:
+            label, started = self.pending
+            self.timings.append((label, self.clock() - started))
+            self.pending = None
+    
+    def show(self, *args, **kwargs):
+        if self.echo:
+            print(*args, **kwargs)
+    
+    def clear(self):
+        pass
+    
+    def home(self):
+        pass
+    
+    def wait_line(self, timeout):
+        """Живой экран сразу получает следующий ответ сценария"""
+        return self.ask()
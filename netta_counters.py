@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🧮 NETTA COUNTERS - Сверка счетчиков              ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+neets.likes_count, users.followers_count и users.following_count
+хранятся рядом со строкой, чтобы лента не считала лайки и подписки
+на каждый показ. Если где-то счетчик забыли поправить, он расходится
+с likes и follows. Сверщик проходит таблицу кусками по chunk_size
+строк по первичному ключу и пересчитывает каждый счетчик запросом
+COUNT(*) по индексу (likes.neet_id, follows.following_id,
+follows.follower_id).
+
+Чтение куска идет без блокировки записи; расхождения исправляются
+отдельной короткой транзакцией, которая пересчитывает счетчик еще раз
+уже под блокировкой — лайк, пришедший между чтением и исправлением,
+не потеряется. Между кусками — пауза, поэтому полный проход большой
+базы растягивается, но не мешает пользователям. Позиция прохода и
+итоги каждого завершенного прохода хранятся в базе.
+
+Архивные посты и шарды не сверяются: их лайки лежат в других файлах.
+    
+    python netta_counters.py --db netta.db --once
+    python netta_counters.py --db netta.db --report
+"""
+
+import sqlite3
+import threading
+import time
+
+from netta_time import now_ms, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 🧮 СВЕРКА СЧЕТЧИКОВ
+# ═══════════════════════════════════════════════════════════════
+
+# (счетчик, таблица, колонка, истинное значение для строки t)
+COUNTERS = (
+    ('likes', 'neets', 'likes_count', 'SELECT COUNT(*) FROM likes WHERE neet_id = t.id'),
+    ('followers', 'users', 'followers_count', 'SELECT COUNT(*) FROM follows WHERE following_id = t.id'),
+    ('following', 'users', 'following_count', 'SELECT COUNT(*) FROM follows WHERE follower_id = t.id'),
+)
+
+COUNTER_TITLES = {
+    'likes': '❤️ Лайки постов',
+    'followers': '👥 Подписчики',
+    'following': '➡️ Подписки',
+}
+
+
+def create_counter_tables(cursor):
+    """Позиция текущего прохода и итоги завершенных проходов"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS counter_audit (
+            counter TEXT PRIMARY KEY,
+            position INTEGER NOT NULL DEFAULT 0,
+            started_at INTEGER NOT NULL,
+            checked INTEGER NOT NULL DEFAULT 0,
+            drifted INTEGER NOT NULL DEFAULT 0,
+            drift_total INTEGER NOT NULL DEFAULT 0,
+            drift_max INTEGER NOT NULL DEFAULT 0,
+            repaired INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS counter_audit_passes (
+            id INTEGER PRIMARY KEY,
+            counter TEXT NOT NULL,
+            started_at INTEGER NOT NULL,
+            finished_at INTEGER NOT NULL,
+            checked INTEGER NOT NULL,
+            drifted INTEGER NOT NULL,
+            drift_total INTEGER NOT NULL,
+            drift_max INTEGER NOT NULL,
+            repaired INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_counter_audit_passes ON counter_audit_passes (counter, id)
+    ''')
+    # Индексы для пересчета (уникальные ключи покрывают только likes.user_id и follows.follower_id)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_likes_neet_id ON likes (neet_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_follows_following_id ON follows (following_id)')
+
+
+class CounterAuditor:
+    def __init__(self, db, chunk_size=500, pause=0.1, interval=600):
+        self.db = db
+        self.chunk_size = chunk_size
+        # Пауза между кусками — чтобы проход не занимал базу подряд
+        self.pause = pause
+        # Пауза после полного прохода всех счетчиков
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+    
+    def progress(self, cursor, counter):
+        cursor.execute('''
+            SELECT position, started_at, checked, drifted, drift_total, drift_max, repaired
+            FROM counter_audit WHERE counter = ?
+        ''', (counter,))
+        row = cursor.fetchone()
+        return row or (0, now_ms(), 0, 0, 0, 0, 0)
+    
+    def audit_chunk(self, counter, table, column, actual):
+        """Сверить и исправить один кусок. Возвращает True, если проход счетчика завершен"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        position, started_at, checked, drifted, drift_total, drift_max, repaired = self.progress(cursor, counter)
+        
+        # Чтение — без блокировки записи
+        cursor.execute(f'''
+            SELECT t.id, t.{column}, ({actual}) FROM {table} t
+            WHERE t.id > ? ORDER BY t.id LIMIT ?
+        ''', (position, self.chunk_size))
+        rows = cursor.fetchall()
+        
+        drift = [(row_id, abs((stored or 0) - count)) for row_id, stored, count in rows if stored != count]
+        
+        # Исправление — пересчет под блокировкой записи: счетчик, изменившийся
+        # после чтения, получит значение на момент исправления
+        fixed = 0
+        if drift:
+            ids = [row_id for row_id, _ in drift]
+            placeholders = ','.join('?' * len(ids))
+            cursor.execute(f'''
+                UPDATE {table} AS t SET {column} = ({actual})
+                WHERE t.id IN ({placeholders}) AND t.{column} IS NOT ({actual})
+            ''', ids)
+            fixed = cursor.rowcount
+        
+        finished = len(rows) < self.chunk_size
+        checked += len(rows)
+        drifted += len(drift)
+        drift_total += sum(amount for _, amount in drift)
+        drift_max = max([drift_max] + [amount for _, amount in drift])
+        repaired += fixed
+        
+        if finished:
+            cursor.execute('''
+                INSERT INTO counter_audit_passes
+                    (counter, started_at, finished_at, checked, drifted, drift_total, drift_max, repaired)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (counter, started_at, now_ms(), checked, drifted, drift_total, drift_max, repaired))
+            state = (0, now_ms(), 0, 0, 0, 0, 0)
+        else:
+            state = (rows[-1][0], started_at, checked, drifted, drift_total, drift_max, repaired)
+        
+        cursor.execute('''
+            INSERT INTO counter_audit
+                (counter, position, started_at, checked, drifted, drift_total, drift_max, repaired)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (counter) DO UPDATE SET
+                position = excluded.position, started_at = excluded.started_at,
+                checked = excluded.checked, drifted = excluded.drifted,
+                drift_total = excluded.drift_total, drift_max = excluded.drift_max,
+                repaired = excluded.repaired
+        ''', (counter, *state))
+        conn.commit()
+        conn.close()
+        return finished
+    
+    def run_pass(self, counters=COUNTERS):
+        """Довести текущий проход каждого счетчика до конца"""
+        for counter, *source in counters:
+            while not self.stopped.is_set():
+                if self.audit_chunk(counter, *source):
+                    break
+                self.stopped.wait(self.pause)
+    
+    # ─── Отчет ─────────────────────────────────────────────────
+    
+    def report(self):
+        """{счетчик: {'current': текущий проход, 'last': последний завершенный или None}}"""
+        fields = ('started_at', 'checked', 'drifted', 'drift_total', 'drift_max', 'repaired')
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        report = {}
+        for counter, *_ in COUNTERS:
+            current = self.progress(cursor, counter)
+            cursor.execute(f'''
+                SELECT {', '.join(fields)}, finished_at FROM counter_audit_passes
+                WHERE counter = ? ORDER BY id DESC LIMIT 1
+            ''', (counter,))
+            last = cursor.fetchone()
+            report[counter] = {
+                'current': dict(zip(fields, current[1:]), position=current[0]),
+                'last': dict(zip(fields + ('finished_at',), last)) if last else None,
+            }
+        conn.close()
+        return report
+    
+    # ─── Фоновый поток ─────────────────────────────────────────
+    
+    def loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.run_pass()
+            except sqlite3.OperationalError:
+                # База занята — позиция не сдвинулась, продолжим позже
+                pass
+            self.stopped.wait(self.interval)
+    
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.loop, daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+
+
+def print_report(report):
+    for counter, passes in report.items():
+        current, last = passes['current'], passes['last']
+        print(f"{COUNTER_TITLES[counter]}")
+        print(f"   текущий проход: проверено {current['checked']}, расхождений {current['drifted']}, "
+              f"исправлено {current['repaired']}")
+        if last:
+            print(f"   последний проход ({format_timestamp(last['finished_at'], '%Y-%m-%d %H:%M')}): "
+                  f"проверено {last['checked']}, расхождений {last['drifted']} "
+                  f"(всего {last['drift_total']}, макс. {last['drift_max']}), исправлено {last['repaired']}")
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК СВЕРЩИКА
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Сверка счетчиков лайков и подписок Netta")
+    parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    parser.add_argument("--chunk", type=int, default=500, help="строк в куске")
+    parser.add_argument("--pause", type=float, default=0.1, help="пауза между кусками, с")
+    parser.add_argument("--interval", type=int, default=600, help="пауза между проходами, с")
+    parser.add_argument("--once", action="store_true", help="один проход и выход")
+    parser.add_argument("--report", action="store_true", help="только показать итоги")
+    args = parser.parse_args()
+    
+    auditor = CounterAuditor(Database(args.db), args.chunk, args.pause, args.interval)
+    while not args.report:
+        started = time.perf_counter()
+        auditor.run_pass()
+        print(f"🧮 {format_timestamp(now_ms(), '%H:%M:%S')} проход за {time.perf_counter() - started:.1f} с")
+        if args.once:
+            break
+        time.sleep(args.interval)
+    print_report(auditor.report())
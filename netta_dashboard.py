@@ -11,6 +11,24 @@ import sqlite3
 import hashlib
 import os
 from datetime import datetime
+from netta_archive import NeetArchive
+from netta_time import format_timestamp, now_ms
+from netta_notifications import (notify, delete_user_notifications, delete_neet_notifications,
+                                 KIND_VERIFICATION)
+from netta_models import PROFILE_COLUMNS, profile_row_factory
+from netta_spam import SpamDetector, delete_neet_spam, delete_user_spam
+from netta_media import BlobStore, release_neet_media, release_user_media
+from netta_events import (emit, USER_REGISTERED, USER_ADMIN_GRANTED, USER_DELETED, NEET_DELETED,
+                          VERIFICATION_APPROVED, VERIFICATION_REJECTED, VERIFICATION_REVOKED)
+from netta_console import ConsoleIO
+from netta_verification import VerificationQueue, LIVE_SIGNAL
+from netta_rollups import RollupAggregator, METRIC_TITLES, sparkline
+from netta_maintenance import MaintenanceScheduler
+from netta_counters import CounterAuditor, COUNTER_TITLES
+from netta_live import LiveView
+from netta_bloom import NameFilter
+from netta_memory import resolve_db_name, is_memory, connect_db
+from netta_audit import AuditLog, describe, target, ADMIN_CREATED, SPAM_CLUSTER_DELETED
 
 # ═══════════════════════════════════════════════════════════════
 # 🎨 ЦВЕТА И СТИЛИ
@@ -36,22 +54,57 @@ RED_CHECK = f"{Colors.RED}✓{Colors.END}"
 # ═══════════════════════════════════════════════════════════════
 
 class AdminDashboard:
-    def __init__(self, db_name="netta.db"):
-        self.db_name = db_name
+    def __init__(self, db_name="netta.db", archive_dir=None, feed_cache=None, media_dir=None,
+                 io=None, live_refresh=2.0):
+        # Базу приложения в памяти панель открывает по ее URI (Database.db_name)
+        self.db_name = resolve_db_name(db_name)
+        self.keeper = connect_db(self.db_name) if is_memory(self.db_name) else None
+        # Терминал или сценарий (ScriptedIO) для запуска без человека
+        self.io = io or ConsoleIO()
         self.admin_logged_in = False
         self.admin_user = None
+        # Архив старых постов: удаление должно затрагивать и его
+        self.archive = NeetArchive(self, archive_dir) if archive_dir else None
+        # Кеш ленты приложения, если панель запущена в том же процессе
+        # (иначе кеш приложения устареет не дольше, чем на его ttl)
+        self.feed_cache = feed_cache
+        # Кластеры похожих постов (индекс подписей панели не нужен)
+        self.spam = SpamDetector(self)
+        # Файлы вложений: удаляются вместе с последним ссылающимся постом
+        self.media = BlobStore(self, media_dir or "media")
+        # Очередь заявок: пачки в аренду, чтобы администраторы не мешали друг другу
+        self.verification = VerificationQueue(self)
+        self.claim_batch = 10
+        # Журнал действий: пишется пачками в фоне, сбрасывается при выходе
+        self.audit = AuditLog(self)
+        # Почасовые и дневные счетчики: фоновый агрегатор, пока панель открыта
+        self.rollups = RollupAggregator(self)
+        # Обслуживание базы: пороги проверяются в фоне, пока панель открыта
+        self.maintenance = MaintenanceScheduler(self)
+        # Сверка likes_count и счетчиков подписок: кусками в фоне
+        self.counters = CounterAuditor(self)
+        # Живой режим статистики и заявок: перерисовка после изменений в базе,
+        # не чаще раза в live_refresh секунд
+        self.live = LiveView(self, self.io, refresh_floor=live_refresh)
+        # Фильтр занятых имен приложения: удаленные пользователи освобождают имя и email
+        self.names = NameFilter(self, None if self.keeper else f"{db_name}.names")
     
     def get_connection(self):
-        return sqlite3.connect(self.db_name)
+        return connect_db(self.db_name)
+    
+    def invalidate_feed(self):
+        """Сбросить кеш ленты после удаления постов"""
+        if self.feed_cache:
+            self.feed_cache.invalidate()
     
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.io.clear()
     
     def hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
     
     def print_header(self):
-        print(f"""
+        self.io.show(f"""
 {Colors.RED}╔═══════════════════════════════════════════════════════════════╗
 ║                                                               ║
 ║     ██████╗  █████╗ ███████╗██╗  ██╗██████╗  ██████╗  █████╗ ██████╗ ██████╗  ║
@@ -66,14 +119,14 @@ class AdminDashboard:
         """)
     
     def print_menu(self, options, title="Меню"):
-        print(f"\n{Colors.RED}{'═' * 60}")
-        print(f"  🛡️ {title}")
-        print(f"{'═' * 60}{Colors.END}")
+        self.io.show(f"\n{Colors.RED}{'═' * 60}")
+        self.io.show(f"  🛡️ {title}")
+        self.io.show(f"{'═' * 60}{Colors.END}")
         
         for key, value in options.items():
-            print(f"  {Colors.YELLOW}[{key}]{Colors.END} {value}")
+            self.io.show(f"  {Colors.YELLOW}[{key}]{Colors.END} {value}")
         
-        print(f"{Colors.RED}{'═' * 60}{Colors.END}")
+        self.io.show(f"{Colors.RED}{'═' * 60}{Colors.END}")
     
     def create_first_admin(self):
         """Создание первого администратора"""
@@ -85,12 +138,12 @@ class AdminDashboard:
         admin_count = cursor.fetchone()[0]
         
         if admin_count == 0:
-            print(f"\n{Colors.YELLOW}⚠️ Администраторы не найдены. Создайте первого админа.{Colors.END}\n")
+            self.io.show(f"\n{Colors.YELLOW}⚠️ Администраторы не найдены. Создайте первого админа.{Colors.END}\n")
             
-            username = input(f"{Colors.CYAN}👤 Имя пользователя: {Colors.END}").strip()
-            email = input(f"{Colors.CYAN}📧 Email: {Colors.END}").strip()
-            password = input(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
-            display_name = input(f"{Colors.CYAN}📛 Отображаемое имя: {Colors.END}").strip() or username
+            username = self.io.ask(f"{Colors.CYAN}👤 Имя пользователя: {Colors.END}").strip()
+            email = self.io.ask(f"{Colors.CYAN}📧 Email: {Colors.END}").strip()
+            password = self.io.ask(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
+            display_name = self.io.ask(f"{Colors.CYAN}📛 Отображаемое имя: {Colors.END}").strip() or username
             
             password_hash = self.hash_password(password)
             
@@ -101,10 +154,16 @@ class AdminDashboard:
                     VALUES (?, ?, ?, ?, 1, 1)
                 ''', (username, email, password_hash, display_name))
                 
+                admin_id = cursor.lastrowid
+                emit(cursor, USER_REGISTERED, admin_id, None,
+                     username=username, display_name=display_name, is_admin=1)
+                
                 conn.commit()
-                print(f"\n{Colors.GREEN}✅ Администратор {username} успешно создан!{Colors.END}")
+                self.audit.record(None, ADMIN_CREATED, target('user', admin_id),
+                                  after={'username': username, 'email': email, 'is_admin': 1})
+                self.io.show(f"\n{Colors.GREEN}✅ Администратор {username} успешно создан!{Colors.END}")
             except sqlite3.IntegrityError as e:
-                print(f"\n{Colors.RED}❌ Ошибка: {e}{Colors.END}")
+                self.io.show(f"\n{Colors.RED}❌ Ошибка: {e}{Colors.END}")
         
         conn.close()
     
@@ -113,20 +172,22 @@ class AdminDashboard:
         self.clear_screen()
         self.print_header()
         
-        print(f"\n{Colors.RED}{'═' * 50}")
-        print("  🔐 ВХОД В АДМИН-ПАНЕЛЬ")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.RED}{'═' * 50}")
+        self.io.show("  🔐 ВХОД В АДМИН-ПАНЕЛЬ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        username = input(f"{Colors.CYAN}👤 Логин администратора: {Colors.END}").strip()
-        password = input(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
+        username = self.io.ask(f"{Colors.CYAN}👤 Логин администратора: {Colors.END}").strip()
+        password = self.io.ask(f"{Colors.CYAN}🔒 Пароль: {Colors.END}").strip()
         
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = profile_row_factory
         
         password_hash = self.hash_password(password)
         
-        cursor.execute('''
-            SELECT * FROM users WHERE username = ? AND password_hash = ? AND is_admin = 1
+        cursor.execute(f'''
+            SELECT {PROFILE_COLUMNS} FROM users
+            WHERE username = ? AND password_hash = ? AND is_admin = 1
         ''', (username, password_hash))
         
         admin = cursor.fetchone()
@@ -134,333 +195,613 @@ class AdminDashboard:
         
         if admin:
             self.admin_logged_in = True
-            self.admin_user = {
-                'id': admin[0],
-                'username': admin[1],
-                'display_name': admin[4]
-            }
-            print(f"\n{Colors.GREEN}✅ Добро пожаловать, {admin[4]}!{Colors.END}")
-            input("\nНажмите Enter...")
+            self.admin_user = admin
+            self.io.show(f"\n{Colors.GREEN}✅ Добро пожаловать, {admin.display_name}!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return True
         else:
-            print(f"\n{Colors.RED}❌ Неверные данные или недостаточно прав!{Colors.END}")
-            input("\nНажмите Enter...")
+            self.io.show(f"\n{Colors.RED}❌ Неверные данные или недостаточно прав!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return False
     
     def view_all_users(self):
         """Просмотр всех пользователей"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 80}")
-        print("  👥 СПИСОК ПОЛЬЗОВАТЕЛЕЙ")
-        print(f"{'═' * 80}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 80}")
+        self.io.show("  👥 СПИСОК ПОЛЬЗОВАТЕЛЕЙ")
+        self.io.show(f"{'═' * 80}{Colors.END}\n")
         
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = profile_row_factory
         
-        cursor.execute('''
-            SELECT id, username, display_name, email, verification_status, 
-                   is_admin, created_at, followers_count
-            FROM users ORDER BY id DESC
-        ''')
+        cursor.execute(f'SELECT {PROFILE_COLUMNS} FROM users ORDER BY id DESC')
         
         users = cursor.fetchall()
         conn.close()
         
-        print(f"{Colors.CYAN}{'ID':<5} {'Username':<15} {'Имя':<20} {'Статус':<20} {'Подписчики':<10}{Colors.END}")
-        print("─" * 80)
+        self.io.show(f"{Colors.CYAN}{'ID':<5} {'Username':<15} {'Имя':<20} {'Статус':<20} {'Подписчики':<10}{Colors.END}")
+        self.io.show("─" * 80)
         
         for user in users:
             status = ""
-            if user[5] == 1:
+            if user.is_admin == 1:
                 status = f"{Colors.RED}🔴 Админ{Colors.END}"
-            elif user[4] == 1:
+            elif user.verification_status == 1:
                 status = f"{Colors.BLUE}🔵 Верифицирован{Colors.END}"
             else:
                 status = "⚪ Обычный"
             
-            print(f"{user[0]:<5} {user[1]:<15} {user[2]:<20} {status:<30} {user[7]:<10}")
+            self.io.show(f"{user.id:<5} {user.username:<15} {user.display_name:<20} {status:<30} {user.followers_count:<10}")
         
-        print("─" * 80)
-        print(f"Всего пользователей: {len(users)}")
+        self.io.show("─" * 80)
+        self.io.show(f"Всего пользователей: {len(users)}")
         
-        input("\nНажмите Enter для продолжения...")
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def view_verification_requests(self):
-        """Просмотр заявок на верификацию"""
-        self.clear_screen()
-        print(f"\n{Colors.BLUE}{'═' * 80}")
-        print(f"  {BLUE_CHECK} ЗАЯВКИ НА ВЕРИФИКАЦИЮ")
-        print(f"{'═' * 80}{Colors.END}\n")
+        """Просмотр открытых заявок на верификацию (по 10 на странице, L — живой режим)"""
+        after_id = 0
+        live = False
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        while True:
+            if live:
+                action, requests = self.live.run(lambda: self.render_verification_page(after_id),
+                                                 "[N] — следующая страница, Enter — назад",
+                                                 LIVE_SIGNAL)
+            else:
+                self.clear_screen()
+                requests = self.render_verification_page(after_id)
+                pages = "[N] — следующая страница, " if len(requests) == 10 else ""
+                action = self.io.ask(f"\n{Colors.CYAN}{pages}[L] — следить за изменениями, "
+                                     f"Enter — назад: {Colors.END}")
+            
+            action = action.strip().upper()
+            if action == 'L':
+                live = True
+                continue
+            # Следующая страница — заявки с id больше последнего показанного
+            if action != 'N' or len(requests) < 10:
+                return
+            after_id = requests[-1][0]
+    
+    def render_verification_page(self, after_id):
+        """Вывести страницу заявок после after_id. Возвращает показанные заявки"""
+        self.io.show(f"\n{Colors.BLUE}{'═' * 80}")
+        self.io.show(f"  {BLUE_CHECK} ЗАЯВКИ НА ВЕРИФИКАЦИЮ")
+        self.io.show(f"{'═' * 80}{Colors.END}\n")
         
-        cursor.execute('''
-            SELECT vr.id, u.username, u.display_name, vr.reason, vr.status, vr.created_at
-            FROM verification_requests vr
-            JOIN users u ON vr.user_id = u.id
-            WHERE vr.status = 'pending'
-            ORDER BY vr.created_at DESC
-        ''')
-        
-        requests = cursor.fetchall()
-        conn.close()
+        stats = self.verification.stats()
+        self.io.show(f"{Colors.CYAN}Свободных: {stats['pending']}, в работе: {stats['claimed']} "
+                     f"(аренда истекла: {stats['expired']}){Colors.END}")
+        
+        requests = self.verification.page(after_id)
         
         if not requests:
-            print(f"{Colors.YELLOW}Нет активных заявок на верификацию{Colors.END}")
+            self.io.show(f"\n{Colors.YELLOW}Нет активных заявок на верификацию{Colors.END}")
         else:
             for req in requests:
-                print(f"""
+                status = req[4]
+                if status == 'claimed':
+                    status = f"в работе у #{req[6]} до {format_timestamp(req[7], '%H:%M:%S')}"
+                self.io.show(f"""
 {Colors.WHITE}┌────────────────────────────────────────────────────────────────┐
 │ {Colors.CYAN}ID заявки: {req[0]}{Colors.WHITE}
 │ {Colors.CYAN}Пользователь:{Colors.END} @{req[1]} ({req[2]})
 │ {Colors.CYAN}Причина:{Colors.END} {req[3]}
-│ {Colors.CYAN}Дата подачи:{Colors.END} {req[5]}
-│ {Colors.CYAN}Статус:{Colors.END} {Colors.YELLOW}{req[4]}{Colors.END}
+│ {Colors.CYAN}Дата подачи:{Colors.END} {format_timestamp(req[5])}
+│ {Colors.CYAN}Статус:{Colors.END} {Colors.YELLOW}{status}{Colors.END}
 {Colors.WHITE}└────────────────────────────────────────────────────────────────┘{Colors.END}
                 """)
+        return requests
+    
+    def review_queue(self):
+        """Своя пачка заявок: взять в работу, одобрить, отклонить, вернуть"""
+        while True:
+            self.clear_screen()
+            self.io.show(f"\n{Colors.BLUE}{'═' * 80}")
+            self.io.show("  🗂️ МОЯ ОЧЕРЕДЬ ЗАЯВОК")
+            self.io.show(f"{'═' * 80}{Colors.END}\n")
+            
+            claims = self.verification.claims(self.admin_user['id'])
+            
+            if not claims:
+                self.io.show(f"{Colors.YELLOW}У вас нет заявок в работе{Colors.END}")
+            for request_id, _, username, display_name, reason, created_at, lease in claims:
+                self.io.show(f"{Colors.YELLOW}[{request_id}]{Colors.END} @{username} ({display_name}), "
+                             f"{format_timestamp(created_at)}, аренда до {format_timestamp(lease, '%H:%M:%S')}")
+                self.io.show(f"    {reason[:100]}")
+            
+            self.io.show(f"\n{Colors.YELLOW}Действия:{Colors.END}")
+            self.io.show(f"  {Colors.CYAN}[C]{Colors.END} - Взять {self.claim_batch} заявок")
+            self.io.show(f"  {Colors.CYAN}[A ID]{Colors.END} - Одобрить  {Colors.CYAN}[R ID]{Colors.END} - Отклонить")
+            self.io.show(f"  {Colors.CYAN}[X]{Colors.END} - Вернуть все заявки в очередь")
+            self.io.show(f"  {Colors.CYAN}[B]{Colors.END} - Назад")
+            
+            action = self.io.ask(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip().upper()
+            
+            if action == 'C':
+                claimed = self.verification.claim(self.admin_user['id'], self.claim_batch)
+                message = f"✅ Взято заявок: {len(claimed)}" if claimed else "📭 Очередь пуста"
+            elif action == 'X':
+                message = f"↩️ Возвращено заявок: {self.verification.release(self.admin_user['id'])}"
+            elif action[:2] in ('A ', 'R '):
+                try:
+                    request_id = int(action[2:])
+                except ValueError:
+                    continue
+                _, message = self.decide_verification(request_id, action[0] == 'A')
+            else:
+                return
+            
+            self.io.show(f"\n{message}")
+            self.io.ask("\nНажмите Enter...")
+    
+    def decide_verification(self, request_id, approve):
+        """Решение по заявке; пользователь, уведомление и событие — в той же транзакции"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        status = 'approved' if approve else 'rejected'
+        user_id = self.verification.decide(cursor, request_id, self.admin_user['id'], status)
+        
+        if user_id is None:
+            conn.close()
+            return False, "❌ Заявка не найдена, уже решена или в работе у другого администратора!"
+        
+        if approve:
+            # Обновляем верификацию пользователя
+            cursor.execute('''
+                UPDATE users SET verification_status = 1 WHERE id = ?
+            ''', (user_id,))
+            
+            # Сообщаем пользователю об одобрении
+            notify(cursor, user_id, KIND_VERIFICATION, self.admin_user['id'])
+            emit(cursor, VERIFICATION_APPROVED, request_id, self.admin_user['id'], user_id=user_id)
+        else:
+            emit(cursor, VERIFICATION_REJECTED, request_id, self.admin_user['id'], user_id=user_id)
+        
+        conn.commit()
+        conn.close()
+        
+        self.audit.record(self.admin_user['id'], VERIFICATION_APPROVED if approve else VERIFICATION_REJECTED,
+                          target('request', request_id), after={'status': status, 'user_id': user_id})
         
-        input("\nНажмите Enter для продолжения...")
+        if approve:
+            return True, f"✅ Верификация одобрена! Пользователь получил синюю галочку {BLUE_CHECK}"
+        return True, "❌ Заявка отклонена!"
     
     def approve_verification(self):
         """Одобрить заявку на верификацию"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print(f"  ✅ ОДОБРИТЬ ВЕРИФИКАЦИЮ")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show(f"  ✅ ОДОБРИТЬ ВЕРИФИКАЦИЮ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        request_id = input(f"{Colors.CYAN}ID заявки: {Colors.END}").strip()
+        request_id = self.io.ask(f"{Colors.CYAN}ID заявки: {Colors.END}").strip()
         
         try:
             request_id = int(request_id)
         except:
-            print(f"\n{Colors.RED}❌ Неверный ID!{Colors.END}")
-            input("\nНажмите Enter...")
+            self.io.show(f"\n{Colors.RED}❌ Неверный ID!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        success, message = self.decide_verification(request_id, approve=True)
+        self.io.show(f"\n{Colors.GREEN if success else Colors.RED}{message}{Colors.END}")
+        self.io.ask("\nНажмите Enter...")
+    
+    def reject_verification(self):
+        """Отклонить заявку на верификацию"""
+        self.clear_screen()
+        self.io.show(f"\n{Colors.RED}{'═' * 50}")
+        self.io.show("  ❌ ОТКЛОНИТЬ ВЕРИФИКАЦИЮ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        # Получаем user_id из заявки
-        cursor.execute('SELECT user_id FROM verification_requests WHERE id = ?', (request_id,))
-        result = cursor.fetchone()
+        request_id = self.io.ask(f"{Colors.CYAN}ID заявки: {Colors.END}").strip()
         
-        if not result:
-            print(f"\n{Colors.RED}❌ Заявка не найдена!{Colors.END}")
-            conn.close()
-            input("\nНажмите Enter...")
+        try:
+            request_id = int(request_id)
+        except:
+            self.io.show(f"\n{Colors.RED}❌ Неверный ID!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
+            return
+        
+        success, message = self.decide_verification(request_id, approve=False)
+        self.io.show(f"\n{Colors.YELLOW if success else Colors.RED}{message}{Colors.END}")
+        self.io.ask("\nНажмите Enter...")
+    
+    def grant_admin(self):
+        """Выдать права администратора"""
+        self.clear_screen()
+        self.io.show(f"\n{Colors.RED}{'═' * 50}")
+        self.io.show(f"  {RED_CHECK} НАЗНАЧИТЬ АДМИНИСТРАТОРА")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
+        
+        username = self.io.ask(f"{Colors.CYAN}@username пользователя: {Colors.END}").strip().replace('@', '')
+        
+        user = self.find_user(username)
+        
+        if not user:
+            self.io.show(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return
         
-        user_id = result[0]
+        confirm = self.io.ask(f"\n{Colors.YELLOW}Вы уверены, что хотите сделать {user[1]} администратором? (да/нет): {Colors.END}")
         
-        # Обновляем статус заявки
-        cursor.execute('''
-            UPDATE verification_requests SET status = 'approved' WHERE id = ?
-        ''', (request_id,))
+        if confirm.lower() == 'да':
+            success, message = self.set_admin(user[0])
+            self.io.show(f"\n{Colors.GREEN if success else Colors.RED}{message}{Colors.END}")
+        else:
+            self.io.show(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
         
-        # Обновляем верификацию пользователя
-        cursor.execute('''
-            UPDATE users SET verification_status = 1 WHERE id = ?
-        ''', (user_id,))
+        self.io.ask("\nНажмите Enter...")
+    
+    def revoke_verification(self):
+        """Отозвать верификацию"""
+        self.clear_screen()
+        self.io.show(f"\n{Colors.YELLOW}{'═' * 50}")
+        self.io.show("  ⚠️ ОТОЗВАТЬ ВЕРИФИКАЦИЮ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        conn.commit()
-        conn.close()
+        username = self.io.ask(f"{Colors.CYAN}@username пользователя: {Colors.END}").strip().replace('@', '')
+        
+        user = self.find_user(username)
         
-        print(f"\n{Colors.GREEN}✅ Верификация одобрена! Пользователь получил синюю галочку {BLUE_CHECK}{Colors.END}")
-        input("\nНажмите Enter...")
+        if not user:
+            self.io.show(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
+            return
+        
+        success, message = self.revoke_user_verification(user[0])
+        self.io.show(f"\n{Colors.YELLOW if success else Colors.RED}{message}{Colors.END}")
+        self.io.ask("\nНажмите Enter...")
     
-    def reject_verification(self):
-        """Отклонить заявку на верификацию"""
+    def delete_user(self):
+        """Удалить пользователя"""
         self.clear_screen()
-        print(f"\n{Colors.RED}{'═' * 50}")
-        print("  ❌ ОТКЛОНИТЬ ВЕРИФИКАЦИЮ")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.RED}{'═' * 50}")
+        self.io.show("  🗑️ УДАЛИТЬ ПОЛЬЗОВАТЕЛЯ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        request_id = input(f"{Colors.CYAN}ID заявки: {Colors.END}").strip()
+        username = self.io.ask(f"{Colors.CYAN}@username пользователя: {Colors.END}").strip().replace('@', '')
         
-        try:
-            request_id = int(request_id)
-        except:
-            print(f"\n{Colors.RED}❌ Неверный ID!{Colors.END}")
-            input("\nНажмите Enter...")
+        user = self.find_user(username)
+        
+        if not user:
+            self.io.show(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        if user[2] == 1:
+            self.io.show(f"\n{Colors.RED}❌ Нельзя удалить администратора!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
+            return
         
-        cursor.execute('''
-            UPDATE verification_requests SET status = 'rejected' WHERE id = ?
-        ''', (request_id,))
+        confirm = self.io.ask(f"\n{Colors.RED}⚠️ ВНИМАНИЕ! Удалить пользователя {user[1]} и все его данные? (да/нет): {Colors.END}")
         
-        conn.commit()
-        conn.close()
+        if confirm.lower() == 'да':
+            success, message = self.remove_user(user[0])
+            self.io.show(f"\n{Colors.GREEN if success else Colors.RED}{message}{Colors.END}")
+        else:
+            self.io.show(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
         
-        print(f"\n{Colors.YELLOW}❌ Заявка отклонена!{Colors.END}")
-        input("\nНажмите Enter...")
+        self.io.ask("\nНажмите Enter...")
     
-    def grant_admin(self):
-        """Выдать права администратора"""
+    def delete_neet(self):
+        """Удалить пост"""
         self.clear_screen()
-        print(f"\n{Colors.RED}{'═' * 50}")
-        print(f"  {RED_CHECK} НАЗНАЧИТЬ АДМИНИСТРАТОРА")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.RED}{'═' * 50}")
+        self.io.show("  🗑️ УДАЛИТЬ NEET")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        username = input(f"{Colors.CYAN}@username пользователя: {Colors.END}").strip().replace('@', '')
+        neet_id = self.io.ask(f"{Colors.CYAN}ID поста: {Colors.END}").strip()
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        try:
+            neet_id = int(neet_id)
+        except:
+            self.io.show(f"\n{Colors.RED}❌ Неверный ID!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
+            return
         
-        cursor.execute('SELECT id, display_name FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
+        neet = self.find_neet(neet_id)
         
-        if not user:
-            print(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
-            conn.close()
-            input("\nНажмите Enter...")
+        if not neet:
+            self.io.show(f"\n{Colors.RED}❌ Пост не найден!{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return
         
-        confirm = input(f"\n{Colors.YELLOW}Вы уверены, что хотите сделать {user[1]} администратором? (да/нет): {Colors.END}")
+        self.io.show(f"\n{Colors.YELLOW}Содержание поста: {neet[0][:100]}...{Colors.END}")
+        confirm = self.io.ask(f"\n{Colors.RED}Удалить этот пост? (да/нет): {Colors.END}")
         
         if confirm.lower() == 'да':
-            cursor.execute('''
-                UPDATE users SET is_admin = 1, verification_status = 1 WHERE id = ?
-            ''', (user[0],))
-            conn.commit()
-            print(f"\n{Colors.GREEN}✅ {user[1]} теперь администратор! {RED_CHECK}{Colors.END}")
+            success, message = self.remove_neet(neet_id)
+            self.io.show(f"\n{Colors.GREEN if success else Colors.RED}{message}{Colors.END}")
         else:
-            print(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
+            self.io.show(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
         
+        self.io.ask("\nНажмите Enter...")
+    
+    # ─── Изменения без интерфейса (их же выполняет процесс записи) ───
+    
+    def find_user(self, username):
+        """(id, display_name, is_admin, email, verification_status) или None"""
+        conn = self.get_connection()
+        user = conn.execute('''
+            SELECT id, display_name, is_admin, email, verification_status FROM users WHERE username = ?
+        ''', (username,)).fetchone()
         conn.close()
-        input("\nНажмите Enter...")
+        return user
     
-    def revoke_verification(self):
-        """Отозвать верификацию"""
-        self.clear_screen()
-        print(f"\n{Colors.YELLOW}{'═' * 50}")
-        print("  ⚠️ ОТОЗВАТЬ ВЕРИФИКАЦИЮ")
-        print(f"{'═' * 50}{Colors.END}\n")
+    def find_neet(self, neet_id):
+        """(текст, id автора, месяц архива или None) или None"""
+        conn = self.get_connection()
+        neet = conn.execute('SELECT content, user_id FROM neets WHERE id = ?', (neet_id,)).fetchone()
+        conn.close()
+        if neet:
+            return neet[0], neet[1], None
+        
+        # Если поста нет в основной базе, ищем его в архиве
+        archived = self.archive.find_neet(neet_id) if self.archive else None
+        if archived:
+            return archived[1], None, archived[0]
+        return None
+    
+    def set_admin(self, user_id):
+        """Сделать пользователя администратором (с синей галочкой)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
         
-        username = input(f"{Colors.CYAN}@username пользователя: {Colors.END}").strip().replace('@', '')
+        cursor.execute('''
+            SELECT display_name, is_admin, verification_status FROM users WHERE id = ?
+        ''', (user_id,))
+        user = cursor.fetchone()
         
+        if not user:
+            conn.close()
+            return False, "❌ Пользователь не найден!"
+        
+        cursor.execute('''
+            UPDATE users SET is_admin = 1, verification_status = 1 WHERE id = ?
+        ''', (user_id,))
+        emit(cursor, USER_ADMIN_GRANTED, user_id, self.admin_user['id'])
+        conn.commit()
+        conn.close()
+        
+        self.audit.record(self.admin_user['id'], USER_ADMIN_GRANTED, target('user', user_id),
+                          before={'is_admin': user[1], 'verification_status': user[2]},
+                          after={'is_admin': 1, 'verification_status': 1})
+        return True, f"✅ {user[0]} теперь администратор! {RED_CHECK}"
+    
+    def revoke_user_verification(self, user_id):
+        """Снять галочку верификации"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT id, display_name FROM users WHERE username = ?', (username,))
+        cursor.execute('SELECT display_name, verification_status FROM users WHERE id = ?', (user_id,))
         user = cursor.fetchone()
         
         if not user:
-            print(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
             conn.close()
-            input("\nНажмите Enter...")
-            return
+            return False, "❌ Пользователь не найден!"
         
         cursor.execute('''
             UPDATE users SET verification_status = 0 WHERE id = ?
-        ''', (user[0],))
+        ''', (user_id,))
+        
+        emit(cursor, VERIFICATION_REVOKED, user_id, self.admin_user['id'])
         
         conn.commit()
         conn.close()
         
-        print(f"\n{Colors.YELLOW}⚠️ Верификация пользователя {user[1]} отозвана!{Colors.END}")
-        input("\nНажмите Enter...")
+        self.audit.record(self.admin_user['id'], VERIFICATION_REVOKED, target('user', user_id),
+                          before={'verification_status': user[1]}, after={'verification_status': 0})
+        return True, f"⚠️ Верификация пользователя {user[0]} отозвана!"
     
-    def delete_user(self):
-        """Удалить пользователя"""
-        self.clear_screen()
-        print(f"\n{Colors.RED}{'═' * 50}")
-        print("  🗑️ УДАЛИТЬ ПОЛЬЗОВАТЕЛЯ")
-        print(f"{'═' * 50}{Colors.END}\n")
-        
-        username = input(f"{Colors.CYAN}@username пользователя: {Colors.END}").strip().replace('@', '')
-        
+    def remove_user(self, user_id):
+        """Удалить пользователя и все его данные (администраторов удалять нельзя)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT id, display_name, is_admin FROM users WHERE username = ?', (username,))
+        cursor.execute('''
+            SELECT username, display_name, is_admin, email, verification_status FROM users WHERE id = ?
+        ''', (user_id,))
         user = cursor.fetchone()
         
         if not user:
-            print(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
             conn.close()
-            input("\nНажмите Enter...")
-            return
+            return False, "❌ Пользователь не найден!"
         
         if user[2] == 1:
-            print(f"\n{Colors.RED}❌ Нельзя удалить администратора!{Colors.END}")
             conn.close()
-            input("\nНажмите Enter...")
-            return
+            return False, "❌ Нельзя удалить администратора!"
         
-        confirm = input(f"\n{Colors.RED}⚠️ ВНИМАНИЕ! Удалить пользователя {user[1]} и все его данные? (да/нет): {Colors.END}")
+        # Фильтр имен панели мог отстать: дочитываем, пока пользователь еще в базе
+        self.names.refresh(force=True)
+        # Удаляем посты
+        cursor.execute('DELETE FROM neets WHERE user_id = ?', (user_id,))
+        # Удаляем лайки (и снимаем их со счетчиков постов)
+        cursor.execute('''
+            UPDATE neets SET likes_count = MAX(likes_count - 1, 0)
+            WHERE id IN (SELECT neet_id FROM likes WHERE user_id = ?)
+        ''', (user_id,))
+        cursor.execute('DELETE FROM likes WHERE user_id = ?', (user_id,))
+        # Удаляем подписки (и снимаем их со счетчиков подписчиков и подписок)
+        cursor.execute('''
+            UPDATE users SET followers_count = MAX(followers_count - 1, 0)
+            WHERE id IN (SELECT following_id FROM follows WHERE follower_id = ?)
+        ''', (user_id,))
+        cursor.execute('''
+            UPDATE users SET following_count = MAX(following_count - 1, 0)
+            WHERE id IN (SELECT follower_id FROM follows WHERE following_id = ?)
+        ''', (user_id,))
+        cursor.execute('DELETE FROM follows WHERE follower_id = ? OR following_id = ?', (user_id, user_id))
+        # Удаляем заявки на верификацию и отложенные посты
+        cursor.execute('DELETE FROM verification_requests WHERE user_id = ?', (user_id,))
+        cursor.execute('DELETE FROM scheduled_neets WHERE user_id = ?', (user_id,))
+        # Удаляем подписи постов и отметки о спаме
+        delete_user_spam(cursor, user_id)
+        # Удаляем его уведомления и уведомления о его действиях
+        delete_user_notifications(cursor, user_id)
+        # Отвязываем вложения (включая вложения архивных постов)
+        unused_media = release_user_media(cursor, user_id)
+        emit(cursor, USER_DELETED, user_id, self.admin_user['id'])
+        # Удаляем пользователя
+        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
         
-        if confirm.lower() == 'да':
-            # Удаляем посты
-            cursor.execute('DELETE FROM neets WHERE user_id = ?', (user[0],))
-            # Удаляем лайки
-            cursor.execute('DELETE FROM likes WHERE user_id = ?', (user[0],))
-            # Удаляем подписки
-            cursor.execute('DELETE FROM follows WHERE follower_id = ? OR following_id = ?', (user[0], user[0]))
-            # Удаляем заявки на верификацию
-            cursor.execute('DELETE FROM verification_requests WHERE user_id = ?', (user[0],))
-            # Удаляем пользователя
-            cursor.execute('DELETE FROM users WHERE id = ?', (user[0],))
-            
+        conn.commit()
+        conn.close()
+        
+        # Удаляем архивные посты и лайки
+        if self.archive:
+            self.archive.delete_user(user_id)
+        
+        self.media.collect(unused_media)
+        self.invalidate_feed()
+        self.names.remove(user[0], user[3], user_id)
+        self.names.save()
+        self.audit.record(self.admin_user['id'], USER_DELETED, target('user', user_id),
+                          before={'username': user[0], 'display_name': user[1], 'email': user[3],
+                                  'verification_status': user[4]})
+        return True, f"✅ Пользователь {user[1]} удален!"
+    
+    def remove_neet(self, neet_id):
+        """Удалить пост (из основной базы или из архива)"""
+        neet = self.find_neet(neet_id)
+        
+        if not neet:
+            return False, "❌ Пост не найден!"
+        
+        content, author_id, month = neet
+        
+        conn = self.get_connection()
+        # Архивный пост удаляется в той же транзакции, что событие и вложения;
+        # ATTACH возможен только вне транзакции — до первой записи
+        if month:
+            self.archive.attach(conn, month)
+        cursor = conn.cursor()
+        
+        # Вложения лежат в основной базе и для архивных постов
+        unused_media = release_neet_media(cursor, neet_id)
+        delete_neet_notifications(cursor, neet_id)
+        emit(cursor, NEET_DELETED, neet_id, self.admin_user['id'], archived=bool(month))
+        if month:
+            self.archive.delete_attached_neet(cursor, neet_id)
             conn.commit()
-            print(f"\n{Colors.GREEN}✅ Пользователь {user[1]} удален!{Colors.END}")
+            self.archive.detach(conn)
         else:
-            print(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
-        
+            cursor.execute('DELETE FROM likes WHERE neet_id = ?', (neet_id,))
+            cursor.execute('DELETE FROM neets WHERE id = ?', (neet_id,))
+            delete_neet_spam(cursor, neet_id)
+            conn.commit()
+            self.invalidate_feed()
         conn.close()
-        input("\nНажмите Enter...")
+        
+        self.media.collect(unused_media)
+        self.audit.record(self.admin_user['id'], NEET_DELETED, target('neet', neet_id),
+                          before={'content': content, 'user_id': author_id, 'archived': bool(month)})
+        return True, "✅ Пост удален!"
     
-    def delete_neet(self):
-        """Удалить пост"""
+    def spam_clusters(self):
+        """Кластеры почти одинаковых постов с массовым удалением"""
         self.clear_screen()
-        print(f"\n{Colors.RED}{'═' * 50}")
-        print("  🗑️ УДАЛИТЬ NEET")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.io.show(f"\n{Colors.RED}{'═' * 50}")
+        self.io.show("  🚫 ПОДОЗРЕНИЕ НА СПАМ")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
-        neet_id = input(f"{Colors.CYAN}ID поста: {Colors.END}").strip()
+        clusters = self.spam.clusters()
         
-        try:
-            neet_id = int(neet_id)
-        except:
-            print(f"\n{Colors.RED}❌ Неверный ID!{Colors.END}")
-            input("\nНажмите Enter...")
+        if not clusters:
+            self.io.show(f"{Colors.GREEN}✅ Похожих постов не найдено{Colors.END}")
+            self.io.ask("\nНажмите Enter...")
             return
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        for number, (cluster_id, neets, accounts, content) in enumerate(clusters, 1):
+            self.io.show(f"{Colors.YELLOW}[{number}]{Colors.END} Постов: {neets}, аккаунтов: {accounts}")
+            self.io.show(f"    {(content or '(первый пост удален)')[:100]}")
+            self.io.show(f"    {Colors.CYAN}Кластер: {cluster_id}{Colors.END}\n")
         
-        cursor.execute('SELECT content FROM neets WHERE id = ?', (neet_id,))
-        neet = cursor.fetchone()
+        choice = self.io.ask(f"{Colors.CYAN}Номер кластера для удаления (Enter — назад): {Colors.END}").strip()
         
-        if not neet:
-            print(f"\n{Colors.RED}❌ Пост не найден!{Colors.END}")
-            conn.close()
-            input("\nНажмите Enter...")
+        try:
+            cluster_id = clusters[int(choice) - 1][0]
+        except (ValueError, IndexError):
             return
         
-        print(f"\n{Colors.YELLOW}Содержание поста: {neet[0][:100]}...{Colors.END}")
-        confirm = input(f"\n{Colors.RED}Удалить этот пост? (да/нет): {Colors.END}")
+        confirm = self.io.ask(f"\n{Colors.RED}Удалить все посты кластера? (да/нет): {Colors.END}")
         
         if confirm.lower() == 'да':
-            cursor.execute('DELETE FROM likes WHERE neet_id = ?', (neet_id,))
-            cursor.execute('DELETE FROM neets WHERE id = ?', (neet_id,))
-            conn.commit()
-            print(f"\n{Colors.GREEN}✅ Пост удален!{Colors.END}")
+            deleted = self.spam.delete_cluster(cluster_id, self.media, self.admin_user['id'])
+            self.invalidate_feed()
+            self.audit.record(self.admin_user['id'], SPAM_CLUSTER_DELETED, target('cluster', cluster_id),
+                              after={'deleted': deleted})
+            self.io.show(f"\n{Colors.GREEN}✅ Удалено постов: {deleted}{Colors.END}")
         else:
-            print(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
+            self.io.show(f"\n{Colors.YELLOW}Операция отменена{Colors.END}")
         
-        conn.close()
-        input("\nНажмите Enter...")
+        self.io.ask("\nНажмите Enter...")
+    
+    def audit_log(self):
+        """Журнал действий администраторов (по 20 записей на странице)"""
+        self.clear_screen()
+        self.io.show(f"\n{Colors.BLUE}{'═' * 80}")
+        self.io.show("  📜 ЖУРНАЛ ДЕЙСТВИЙ")
+        self.io.show(f"{'═' * 80}{Colors.END}\n")
+        
+        self.io.show(f"{Colors.CYAN}Фильтр: @username — действия администратора, "
+                     f"user:ID / neet:ID / request:ID — объект, Enter — все{Colors.END}")
+        query = self.io.ask(f"{Colors.CYAN}Фильтр: {Colors.END}").strip()
+        days = self.io.ask(f"{Colors.CYAN}За последние N дней (Enter — за все время): {Colors.END}").strip()
+        
+        actor_id = obj = since = None
+        if query.startswith('@'):
+            conn = self.get_connection()
+            actor = conn.execute('SELECT id FROM users WHERE username = ?', (query[1:],)).fetchone()
+            conn.close()
+            if not actor:
+                self.io.show(f"\n{Colors.RED}❌ Пользователь не найден!{Colors.END}")
+                self.io.ask("\nНажмите Enter...")
+                return
+            actor_id = actor[0]
+        elif query:
+            obj = query
+        if days.isdigit():
+            since = now_ms() - int(days) * 86400000
+        
+        before = None
+        while True:
+            entries = self.audit.query(actor_id, obj, since, before=before)
+            
+            if not entries and before is None:
+                self.io.show(f"\n{Colors.YELLOW}Записей не найдено{Colors.END}")
+            for entry_id, ts, actor, username, action, entry_target, state_before, state_after in entries:
+                self.io.show(f"{Colors.YELLOW}{format_timestamp(ts, '%Y-%m-%d %H:%M:%S')}{Colors.END} "
+                             f"@{username or actor or '—'} {Colors.CYAN}{action}{Colors.END} {entry_target or ''}")
+                self.io.show(f"    {describe(state_before)} → {describe(state_after)}"[:160])
+            
+            if len(entries) < 20:
+                self.io.ask("\nНажмите Enter для продолжения...")
+                return
+            
+            action = self.io.ask(f"\n{Colors.CYAN}[N] — следующая страница, Enter — назад: {Colors.END}")
+            if action.strip().upper() != 'N':
+                return
+            before = (entries[-1][1], entries[-1][0])
     
     def view_statistics(self):
-        """Просмотр статистики"""
+        """Просмотр статистики (L — живой режим)"""
         self.clear_screen()
-        print(f"\n{Colors.GREEN}{'═' * 50}")
-        print("  📊 СТАТИСТИКА NETTA")
-        print(f"{'═' * 50}{Colors.END}\n")
+        self.render_statistics()
+        
+        action = self.io.ask(f"\n{Colors.CYAN}[L] — следить за изменениями, Enter — назад: {Colors.END}")
+        if action.strip().upper() == 'L':
+            self.live.run(self.render_statistics)
+    
+    def render_statistics(self):
+        """Вывести счетчики пользователей, постов, лайков и заявок"""
+        self.io.show(f"\n{Colors.GREEN}{'═' * 50}")
+        self.io.show("  📊 СТАТИСТИКА NETTA")
+        self.io.show(f"{'═' * 50}{Colors.END}\n")
         
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -480,12 +821,12 @@ class AdminDashboard:
         cursor.execute('SELECT COUNT(*) FROM likes')
         likes_count = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM verification_requests WHERE status = 'pending'")
+        cursor.execute("SELECT COUNT(*) FROM verification_requests WHERE status IN ('pending', 'claimed')")
         pending_requests = cursor.fetchone()[0]
         
         conn.close()
         
-        print(f"""
+        self.io.show(f"""
 {Colors.CYAN}┌────────────────────────────────────────────────────┐
 │                   📊 СТАТИСТИКА                    │
 ├────────────────────────────────────────────────────┤
@@ -501,8 +842,51 @@ class AdminDashboard:
 │                                                    │
 └────────────────────────────────────────────────────┘{Colors.END}
         """)
+    
+    def activity_charts(self):
+        """Графики активности: 48 часов и 90 дней (только из таблиц счетчиков)"""
+        self.clear_screen()
+        self.io.show(f"\n{Colors.GREEN}{'═' * 100}")
+        self.io.show("  📈 АКТИВНОСТЬ")
+        self.io.show(f"{'═' * 100}{Colors.END}\n")
         
-        input("\nНажмите Enter для продолжения...")
+        updated_at = self.rollups.updated_at()
+        if updated_at is None:
+            self.io.show(f"{Colors.YELLOW}Агрегатор еще не запускался{Colors.END}")
+        else:
+            self.io.show(f"{Colors.CYAN}Данные на {format_timestamp(updated_at, '%Y-%m-%d %H:%M:%S')}{Colors.END}\n")
+        
+        for metric, title in METRIC_TITLES.items():
+            hourly = self.rollups.series(metric, 'hour', 48)
+            daily = self.rollups.series(metric, 'day', 90)
+            self.io.show(f"{Colors.YELLOW}{title}{Colors.END}")
+            self.io.show(f"  48 ч  |{sparkline(hourly)}| всего {sum(hourly)}, макс. {max(hourly)}/ч")
+            self.io.show(f"  90 дн |{sparkline(daily)}| всего {sum(daily)}, макс. {max(daily)}/день\n")
+        
+        self.io.ask("\nНажмите Enter для продолжения...")
+    
+    def counter_audit(self):
+        """Расхождения счетчиков лайков и подписок с таблицами likes и follows"""
+        self.clear_screen()
+        self.io.show(f"\n{Colors.GREEN}{'═' * 100}")
+        self.io.show("  🧮 СВЕРКА СЧЕТЧИКОВ")
+        self.io.show(f"{'═' * 100}{Colors.END}\n")
+        
+        for counter, passes in self.counters.report().items():
+            current, last = passes['current'], passes['last']
+            self.io.show(f"{Colors.YELLOW}{COUNTER_TITLES[counter]}{Colors.END}")
+            self.io.show(f"  Текущий проход: проверено {current['checked']}, "
+                         f"расхождений {current['drifted']}, исправлено {current['repaired']}")
+            if last:
+                self.io.show(f"  Последний проход ({format_timestamp(last['finished_at'], '%Y-%m-%d %H:%M')}): "
+                             f"проверено {last['checked']}, расхождений {last['drifted']} "
+                             f"(всего {last['drift_total']}, макс. {last['drift_max']}), "
+                             f"исправлено {last['repaired']}")
+            else:
+                self.io.show(f"  {Colors.CYAN}Полного прохода еще не было{Colors.END}")
+            self.io.show("")
+        
+        self.io.ask("\nНажмите Enter для продолжения...")
     
     def main_menu(self):
         """Главное меню админ-панели"""
@@ -510,11 +894,12 @@ class AdminDashboard:
             self.clear_screen()
             self.print_header()
             
-            print(f"\n{Colors.RED}Администратор: {Colors.BOLD}{self.admin_user['display_name']}{Colors.END} {RED_CHECK}")
+            self.io.show(f"\n{Colors.RED}Администратор: {Colors.BOLD}{self.admin_user['display_name']}{Colors.END} {RED_CHECK}")
             
             menu = {
                 '1': '👥 Все пользователи',
                 '2': '📋 Заявки на верификацию',
+                'Q': '🗂️ Моя очередь заявок',
                 '3': f'✅ Одобрить верификацию {BLUE_CHECK}',
                 '4': '❌ Отклонить верификацию',
                 '5': f'🔴 Назначить администратора {RED_CHECK}',
@@ -522,17 +907,23 @@ class AdminDashboard:
                 '7': '🗑️ Удалить пользователя',
                 '8': '🗑️ Удалить Neet',
                 '9': '📊 Статистика',
+                'S': '🚫 Подозрение на спам',
+                'L': '📜 Журнал действий',
+                'G': '📈 Графики активности',
+                'C': '🧮 Сверка счетчиков',
                 '0': '🚪 Выход'
             }
             
             self.print_menu(menu, "Админ-панель")
             
-            choice = input(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip()
+            choice = self.io.ask(f"\n{Colors.CYAN}Ваш выбор: {Colors.END}").strip()
             
             if choice == '1':
                 self.view_all_users()
             elif choice == '2':
                 self.view_verification_requests()
+            elif choice.upper() == 'Q':
+                self.review_queue()
             elif choice == '3':
                 self.approve_verification()
             elif choice == '4':
@@ -547,9 +938,17 @@ class AdminDashboard:
                 self.delete_neet()
             elif choice == '9':
                 self.view_statistics()
+            elif choice.upper() == 'S':
+                self.spam_clusters()
+            elif choice.upper() == 'L':
+                self.audit_log()
+            elif choice.upper() == 'G':
+                self.activity_charts()
+            elif choice.upper() == 'C':
+                self.counter_audit()
             elif choice == '0':
                 self.admin_logged_in = False
-                print(f"\n{Colors.YELLOW}👋 До свидания!{Colors.END}")
+                self.io.show(f"\n{Colors.YELLOW}👋 До свидания!{Colors.END}")
                 break
     
     def run(self):
@@ -560,14 +959,26 @@ class AdminDashboard:
         # Проверяем/создаем первого админа
         self.create_first_admin()
         
+        self.rollups.start()
+        self.maintenance.start()
+        self.counters.start()
+        
         while True:
             if self.admin_login():
                 self.main_menu()
                 break
             else:
-                retry = input(f"\n{Colors.CYAN}Попробовать снова? (да/нет): {Colors.END}")
+                retry = self.io.ask(f"\n{Colors.CYAN}Попробовать снова? (да/нет): {Colors.END}")
                 if retry.lower() != 'да':
                     break
+        
+        # Оставшиеся в буфере записи журнала
+        self.audit.close()
+        self.rollups.stop()
+        self.maintenance.stop()
+        self.counters.stop()
+        # Файлы без ссылок, которые collect оставил как слишком свежие
+        self.media.sweep()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -575,5 +986,20 @@ class AdminDashboard:
 # ═══════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
-    dashboard = AdminDashboard()
+    dashboard = AdminDashboard(
+        archive_dir=os.environ.get("NETTA_ARCHIVE_DIR"),
+        media_dir=os.environ.get("NETTA_MEDIA_DIR"),
+        live_refresh=float(os.environ.get("NETTA_LIVE_REFRESH", 2.0))
+    )
+    
+    # NETTA_PROFILE=<каталог> — профилировать действия меню
+    from netta_profiling import profile_dir, enable_dashboard_profiling
+    if profile_dir():
+        enable_dashboard_profiling(dashboard, profile_dir())
+    
+    # NETTA_RECORD=<файл> — записывать изменяющие вызовы панели для повтора
+    from netta_replay import record_path, Recorder, enable_dashboard_recording
+    if record_path():
+        enable_dashboard_recording(dashboard, Recorder(record_path(), dashboard.db_name))
+    
     dashboard.run()
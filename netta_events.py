@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              📡 NETTA EVENTS - Журнал изменений                ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Каждая запись в базу (регистрация, профиль, посты, лайки, действия
+админ-панели) добавляет событие в таблицу events в той же транзакции.
+Смещение события — его AUTOINCREMENT-ключ: оно только растет и не
+переиспользуется даже после сжатия журнала.
+
+Потребители (поиск, аналитика) читают журнал с последнего
+подтвержденного смещения и платят только за новые изменения:
+    
+    python netta_events.py tail --consumer search
+    python netta_events.py compact
+"""
+
+import json
+
+from netta_time import NOW_MS_SQL, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 📡 СОБЫТИЯ
+# ═══════════════════════════════════════════════════════════════
+
+USER_REGISTERED = 'user.registered'
+USER_UPDATED = 'user.updated'
+USER_ADMIN_GRANTED = 'user.admin_granted'
+USER_DELETED = 'user.deleted'
+NEET_CREATED = 'neet.created'
+NEET_LIKED = 'neet.liked'
+NEET_UNLIKED = 'neet.unliked'
+NEET_DELETED = 'neet.deleted'
+VERIFICATION_REQUESTED = 'verification.requested'
+VERIFICATION_APPROVED = 'verification.approved'
+VERIFICATION_REJECTED = 'verification.rejected'
+VERIFICATION_REVOKED = 'verification.revoked'
+
+
+def create_event_tables(cursor):
+    """Журнал событий и смещения потребителей"""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS events (
+            offset INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            entity_id INTEGER,
+            actor_id INTEGER,
+            payload TEXT,
+            created_at INTEGER DEFAULT {NOW_MS_SQL}
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS event_consumers (
+            consumer TEXT PRIMARY KEY,
+            acked_offset INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER DEFAULT {NOW_MS_SQL}
+        )
+    ''')
+
+
+def emit(cursor, kind, entity_id=None, actor_id=None, **payload):
+    """Добавить событие (в транзакции вызывающего кода)"""
+    cursor.execute('''
+        INSERT INTO events (kind, entity_id, actor_id, payload) VALUES (?, ?, ?, ?)
+    ''', (kind, entity_id, actor_id, json.dumps(payload, ensure_ascii=False) if payload else None))
+
+
+class EventLog:
+    def __init__(self, db):
+        self.db = db
+    
+    def head(self):
+        """Смещение последнего события (после сжатия журнала — тоже, по sqlite_sequence)"""
+        conn = self.db.get_connection()
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+        conn.close()
+        return row[0] if row else 0
+    
+    def tail(self, since_offset=0, batch_size=100):
+        """События после since_offset по порядку; читает пачками по первичному ключу"""
+        while True:
+            conn = self.db.get_connection()
+            rows = conn.execute('''
+                SELECT offset, kind, entity_id, actor_id, payload, created_at
+                FROM events WHERE offset > ?
+                ORDER BY offset
+                LIMIT ?
+            ''', (since_offset, batch_size)).fetchall()
+            conn.close()
+            
+            for offset, kind, entity_id, actor_id, payload, created_at in rows:
+                yield {
+                    'offset': offset,
+                    'kind': kind,
+                    'entity_id': entity_id,
+                    'actor_id': actor_id,
+                    'payload': json.loads(payload) if payload else {},
+                    'created_at': created_at
+                }
+            
+            if len(rows) < batch_size:
+                return
+            since_offset = rows[-1][0]
+    
+    def checkpoint(self, consumer):
+        """Последнее подтвержденное потребителем смещение"""
+        conn = self.db.get_connection()
+        row = conn.execute(
+            'SELECT acked_offset FROM event_consumers WHERE consumer = ?', (consumer,)
+        ).fetchone()
+        conn.close()
+        return row[0] if row else 0
+    
+    def ack(self, consumer, offset):
+        """Подтвердить обработку событий до offset включительно (смещение не уменьшается)"""
+        conn = self.db.get_connection()
+        conn.execute(f'''
+            INSERT INTO event_consumers (consumer, acked_offset) VALUES (?, ?)
+            ON CONFLICT (consumer) DO UPDATE SET
+                acked_offset = MAX(acked_offset, excluded.acked_offset),
+                updated_at = {NOW_MS_SQL}
+        ''', (consumer, offset))
+        conn.commit()
+        conn.close()
+    
+    def consume(self, consumer, batch_size=100):
+        """Новые для потребителя события; подтверждает каждую полную пачку.
+        
+        Событие, на котором обработчик упал, будет выдано снова
+        (доставка «хотя бы один раз»).
+        """
+        offset = self.checkpoint(consumer)
+        processed = 0
+        for event in self.tail(offset, batch_size):
+            yield event
+            offset = event['offset']
+            processed += 1
+            if processed % batch_size == 0:
+                self.ack(consumer, offset)
+        if processed % batch_size:
+            self.ack(consumer, offset)
+    
+    def compact(self):
+        """Удалить события, подтвержденные всеми потребителями. Возвращает число удаленных"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT MIN(acked_offset) FROM event_consumers')
+        # Пока нет ни одного потребителя, ничего не подтверждено
+        acked = cursor.fetchone()[0] or 0
+        cursor.execute('DELETE FROM events WHERE offset <= ?', (acked,))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+    
+    def consumers(self):
+        """[(потребитель, подтвержденное смещение, отставание)]"""
+        head = self.head()
+        conn = self.db.get_connection()
+        rows = conn.execute('''
+            SELECT consumer, acked_offset FROM event_consumers ORDER BY consumer
+        ''').fetchall()
+        conn.close()
+        return [(consumer, acked, head - acked) for consumer, acked in rows]
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Журнал событий Netta")
+    parser.add_argument('--db', default='netta.db', help='файл базы данных')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    tail_parser = commands.add_parser('tail', help='вывести новые события')
+    tail_parser.add_argument('--since', type=int, default=0, help='смещение, после которого читать')
+    tail_parser.add_argument('--consumer', help='читать с сохраненного смещения и подтвердить')
+    tail_parser.add_argument('--batch-size', type=int, default=100)
+    
+    commands.add_parser('compact', help='удалить события, подтвержденные всеми потребителями')
+    commands.add_parser('consumers', help='смещения и отставание потребителей')
+    
+    args = parser.parse_args()
+    log = EventLog(Database(args.db))
+    
+    if args.command == 'tail':
+        if args.consumer:
+            events = log.consume(args.consumer, args.batch_size)
+        else:
+            events = log.tail(args.since, args.batch_size)
+        for event in events:
+            print(f"{event['offset']:>8}  {format_timestamp(event['created_at'])}  "
+                  f"{event['kind']:<24} {event['entity_id']}  {event['payload']}")
+    elif args.command == 'compact':
+        print(f"✅ Удалено событий: {log.compact()}")
+    else:
+        for consumer, acked, lag in log.consumers():
+            print(f"{consumer:<20} смещение {acked:>8}, отставание {lag}")
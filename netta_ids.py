@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🆔 NETTA IDS - Генератор id по времени            ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+"""
+
+import threading
+import time
+
+# ═══════════════════════════════════════════════════════════════
+# 🆔 ГЕНЕРАТОР ID
+# ═══════════════════════════════════════════════════════════════
+
+# 64-битный id: 41 бит — миллисекунды от NETTA_EPOCH, 10 бит — узел, 12 бит — счетчик.
+# Сортировка по id совпадает с сортировкой по времени создания.
+NETTA_EPOCH_MS = 1577836800000                    # 2020-01-01 00:00:00 UTC
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = NODE_BITS + SEQUENCE_BITS
+MAX_ID = (1 << 63) - 1
+
+
+def make_id(timestamp_ms, node_id=0, sequence=0):
+    """Собрать id из времени (мс), номера узла и счетчика"""
+    elapsed = max(timestamp_ms - NETTA_EPOCH_MS, 0)
+    return (elapsed << TIMESTAMP_SHIFT) | (node_id << SEQUENCE_BITS) | sequence
+
+
+def id_timestamp(object_id):
+    """Время создания (мс от начала эпохи Unix), закодированное в id"""
+    return (object_id >> TIMESTAMP_SHIFT) + NETTA_EPOCH_MS
+
+
+def id_node(object_id):
+    """Номер узла, выдавшего id"""
+    return (object_id >> SEQUENCE_BITS) & MAX_NODE
+
+
+class IdGenerator:
+    def __init__(self, node_id=0):
+        if not 0 <= node_id <= MAX_NODE:
+            raise ValueError(f"node_id должен быть от 0 до {MAX_NODE}")
+        self.node_id = node_id
+        self.last_timestamp = 0
+        self.sequence = 0
+        self.lock = threading.Lock()
+    
+    def next_id(self):
+        """Следующий уникальный id (потокобезопасно)"""
+        with self.lock:
+            # Если часы отстали, продолжаем от последнего выданного времени
+            timestamp = max(int(time.time() * 1000), self.last_timestamp)
+            
+            if timestamp == self.last_timestamp:
+                self.sequence += 1
+                if self.sequence > MAX_SEQUENCE:
+                    timestamp += 1
+                    self.sequence = 0
+            else:
+                self.sequence = 0
+            
+            self.last_timestamp = timestamp
+            return make_id(timestamp, self.node_id, self.sequence)
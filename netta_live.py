@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🔴 NETTA LIVE - Экраны, обновляемые сами          ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Живой режим экрана админ-панели: экран перерисовывается на месте,
+когда база изменилась, и ждет Enter без повторных запросов.
+
+Изменения замечает PRAGMA data_version на отдельном постоянном
+соединении: число меняется, когда любое другое соединение (приложение,
+процесс записи, фоновые потоки панели) зафиксировало транзакцию.
+Фоновые потоки самой панели (сверка счетчиков, агрегаты, журнал)
+фиксируют служебные записи постоянно, поэтому после смены
+data_version проверяется еще сигнал экрана — по умолчанию последнее
+смещение журнала событий, которое двигают только действия
+пользователей и администраторов. Опрос стоит одного обращения к уже
+открытому соединению (и одного чтения по ключу после чужих записей) —
+запросы экрана выполняются только после изменений и не чаще раза в
+refresh_floor секунд.
+"""
+
+import time
+
+from netta_time import now_ms, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 🔴 ЖИВОЙ РЕЖИМ
+# ═══════════════════════════════════════════════════════════════
+
+# Последнее смещение журнала событий (строка sqlite_sequence, без просмотра журнала)
+EVENTS_SIGNAL = "SELECT seq FROM sqlite_sequence WHERE name = 'events'"
+
+
+class ChangeWatcher:
+    """Изменилась ли база с прошлой проверки: data_version, затем сигнал экрана"""
+    
+    def __init__(self, db, signal=EVENTS_SIGNAL):
+        self.db = db
+        self.signal = signal
+        self.conn = None
+        self.version = None
+        self.state = None
+    
+    def changed(self):
+        # data_version сравнимо только в пределах одного соединения
+        if self.conn is None:
+            self.conn = self.db.get_connection()
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version == self.version:
+            return False
+        self.version = version
+        # Служебные записи панели сигнал не двигают
+        state = self.conn.execute(self.signal).fetchall()
+        changed = state != self.state
+        self.state = state
+        return changed
+    
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            self.version = None
+            self.state = None
+
+
+class LiveView:
+    def __init__(self, db, io, poll_interval=0.5, refresh_floor=2.0, clock=time.monotonic):
+        self.io = io
+        self.watcher = ChangeWatcher(db)
+        # Как часто смотреть на data_version и клавиатуру
+        self.poll_interval = poll_interval
+        # Не чаще одной перерисовки за refresh_floor секунд, даже если база меняется непрерывно
+        self.refresh_floor = refresh_floor
+        self.clock = clock
+        self.redraws = 0
+    
+    def run(self, render, prompt="Enter — выход из живого режима", signal=EVENTS_SIGNAL):
+        """Показывать render() до ввода строки. Возвращает (введенная строка, результат render)"""
+        self.watcher.close()
+        self.watcher.signal = signal
+        self.io.clear()
+        drawn_at = None
+        pending = True
+        result = None
+        
+        try:
+            while True:
+                if self.watcher.changed():
+                    pending = True
+                now = self.clock()
+                if pending and (drawn_at is None or now - drawn_at >= self.refresh_floor):
+                    if drawn_at is not None:
+                        self.io.home()
+                    result = render()
+                    self.io.show(f"\n🔴 Обновлено {format_timestamp(now_ms(), '%H:%M:%S')}. {prompt}")
+                    drawn_at = now
+                    pending = False
+                    self.redraws += 1
+                
+                line = self.io.wait_line(self.poll_interval)
+                if line is not None:
+                    return line, result
+        finally:
+            self.watcher.close()
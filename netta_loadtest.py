@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🏋️ NETTA LOADTEST - Нагрузочный тест              ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Прогоняет сотни сессий через настоящий интерфейс NettaApp (меню,
+экраны) со сценарием регистрация → вход → пост → лента → лайк.
+Сессии идут параллельно в потоках или процессах на одной базе;
+в конце печатаются пропускная способность, перцентили задержек
+по действиям и доля ошибок «database is locked».
+    
+    python netta_loadtest.py --db load.db --sessions 500 --workers 32
+    python netta_loadtest.py --db load.db --sessions 500 --workers 8 --processes
+    python netta_loadtest.py --db :memory: --sessions 500 --workers 32
+    python netta_loadtest.py --db load.db --sessions 100 --record load.jsonl
+"""
+
+import multiprocessing
+import random
+import sqlite3
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from Netta import Database, NettaApp
+from netta_console import ScriptedIO, ScriptEnd
+from netta_ids import MAX_NODE
+from netta_memory import is_memory
+from netta_ratelimit import UNLIMITED
+from netta_replay import Recorder, enable_app_recording
+
+# ═══════════════════════════════════════════════════════════════
+# 📜 СЦЕНАРИЙ СЕССИИ
+# ═══════════════════════════════════════════════════════════════
+
+WORDS = ('кот', 'погода', 'кофе', 'город', 'музыка', 'код', 'море', 'книга',
+         'утро', 'поезд', 'дождь', 'друзья', 'работа', 'выходные', 'фильм')
+
+
+def session_script(username, password):
+    """Ответы на вопросы интерфейса.
+    
+    Пара (метка, ответ) стоит на ответе, после которого экран выполняет
+    действие: замеряется время до следующего вопроса.
+    """
+    content = ' '.join(random.choice(WORDS) for _ in range(12))
+    return [
+        # Регистрация
+        '2', username, f'{username}@load.test', password, password, ('register', ''), '',
+        # Вход
+        '1', username, ('login', password), '',
+        # Пост сейчас и без вложений
+        '2', content, '', ('post', ''), '',
+        # Лента и лайк первого поста на странице
+        ('feed', '1'), ('like', 'L 1'), '',
+        # Выход
+        ('logout', '0'), '0',
+    ]
+
+
+def run_session(db, recorder=None):
+    """Одна сессия. Возвращает (замеры [(метка, секунды)], ошибка или None)"""
+    username = f"load_{uuid.uuid4().hex[:12]}"
+    io = ScriptedIO(session_script(username, 'load-password'))
+    app = NettaApp(db=db, io=io)
+    if recorder:
+        enable_app_recording(app, recorder)
+    
+    error = None
+    try:
+        app.run()
+    except ScriptEnd:
+        error = 'script out of sync'
+    except sqlite3.OperationalError as e:
+        error = 'database is locked' if 'locked' in str(e) else f'sqlite: {e}'
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    
+    io.finish_action()
+    return io.timings, error
+
+# ═══════════════════════════════════════════════════════════════
+# 🧵 ПОТОКИ И ПРОЦЕССЫ
+# ═══════════════════════════════════════════════════════════════
+
+def run_threads(db_name, sessions, workers, rate_limits, record=None):
+    # Одна база (кеш ленты, индекс спама, генератор id, лимиты) на все потоки
+    db = Database(db_name, rate_limits=rate_limits)
+    recorder = Recorder(record, db.db_name) if record else None
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda _: run_session(db, recorder), range(sessions)))
+    if recorder:
+        recorder.close()
+    return results
+
+
+worker_db = None
+
+
+def init_worker(db_name, counter, rate_limits):
+    """Своя база и свой номер узла генератора id в каждом процессе"""
+    global worker_db
+    with counter.get_lock():
+        counter.value += 1
+        node_id = counter.value % (MAX_NODE + 1)
+    worker_db = Database(db_name, node_id=node_id, rate_limits=rate_limits)
+
+
+def process_session(_):
+    return run_session(worker_db)
+
+
+def run_processes(db_name, sessions, workers, rate_limits):
+    Database(db_name)                 # таблицы создаются один раз до старта процессов
+    counter = multiprocessing.Value('i', 0)
+    with multiprocessing.Pool(workers, init_worker, (db_name, counter, rate_limits)) as pool:
+        return pool.map(process_session, range(sessions), chunksize=1)
+
+# ═══════════════════════════════════════════════════════════════
+# 📊 ОТЧЕТ
+# ═══════════════════════════════════════════════════════════════
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(results, elapsed):
+    """Сводка по результатам сессий"""
+    latencies = defaultdict(list)
+    errors = Counter()
+    for timings, error in results:
+        for label, seconds in timings:
+            latencies[label].append(seconds)
+        if error:
+            errors[error] += 1
+    
+    actions = sum(len(values) for values in latencies.values())
+    return {
+        'sessions': len(results),
+        'failed': sum(errors.values()),
+        'elapsed': elapsed,
+        'sessions_per_sec': len(results) / elapsed if elapsed else 0.0,
+        'actions_per_sec': actions / elapsed if elapsed else 0.0,
+        'locked_rate': errors['database is locked'] / len(results) if results else 0.0,
+        'errors': dict(errors),
+        'latency': {
+            label: {
+                'count': len(values),
+                'p50': percentile(values, 0.50),
+                'p90': percentile(values, 0.90),
+                'p99': percentile(values, 0.99),
+                'max': values[-1],
+            }
+            for label, values in ((label, sorted(values)) for label, values in latencies.items())
+        },
+    }
+
+
+def print_report(report):
+    print(f"🏋️ Сессий: {report['sessions']} (с ошибкой: {report['failed']}) "
+          f"за {report['elapsed']:.2f} с")
+    print(f"   {report['sessions_per_sec']:.1f} сессий/с, {report['actions_per_sec']:.1f} действий/с")
+    print(f"   database is locked: {report['locked_rate']:.2%} сессий")
+    for error, count in sorted(report['errors'].items(), key=lambda e: -e[1]):
+        print(f"   ❌ {error}: {count}")
+    
+    print(f"\n   {'действие':<10}{'кол-во':>8}{'p50, мс':>10}{'p90, мс':>10}{'p99, мс':>10}{'max, мс':>10}")
+    for label, stats in report['latency'].items():
+        print(f"   {label:<10}{stats['count']:>8}"
+              f"{stats['p50'] * 1000:>10.1f}{stats['p90'] * 1000:>10.1f}"
+              f"{stats['p99'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}")
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сценариев Netta")
+    parser.add_argument("--db", default="netta_load.db", help="файл базы данных или :memory:")
+    parser.add_argument("--sessions", type=int, default=200, help="число сессий")
+    parser.add_argument("--workers", type=int, default=16, help="параллельных потоков или процессов")
+    parser.add_argument("--processes", action="store_true", help="процессы вместо потоков")
+    parser.add_argument("--rate-limits", action="store_true", help="оставить ограничение частоты")
+    parser.add_argument("--record", help="записать вызовы в трассу для netta_replay.py")
+    args = parser.parse_args()
+    if args.processes and is_memory(args.db):
+        parser.error("база в памяти видна только одному процессу — уберите --processes")
+    if args.processes and args.record:
+        parser.error("запись поддерживается только для потоков — уберите --processes")
+    
+    rate_limits = None if args.rate_limits else UNLIMITED
+    
+    started = time.perf_counter()
+    if args.processes:
+        results = run_processes(args.db, args.sessions, args.workers, rate_limits)
+    else:
+        results = run_threads(args.db, args.sessions, args.workers, rate_limits, args.record)
+    print_report(summarize(results, time.perf_counter() - started))
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🧹 NETTA MAINTENANCE - Обслуживание базы          ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Фоновый планировщик обслуживания SQLite. Каждый проход смотрит на
+размер базы, число свободных страниц и размер WAL и выполняет только
+то, для чего превышен порог:
+
+• PRAGMA optimize — раз в optimize_every секунд (с analysis_limit);
+• ANALYZE — если статистики нет или база выросла/сжалась на
+  analyze_change от размера при прошлом ANALYZE;
+• PRAGMA incremental_vacuum — шагами по vacuum_step страниц, пока
+  свободных страниц больше vacuum_min_pages (нужен auto_vacuum =
+  INCREMENTAL; старую базу переводит флаг --convert, это полный VACUUM);
+• PRAGMA wal_checkpoint — PASSIVE, когда WAL больше wal_passive_bytes,
+  и TRUNCATE, когда больше wal_truncate_bytes;
+• удаление файлов вложений без ссылок (BlobStore.sweep) — раз в
+  sweep_every секунд.
+
+Перед каждым шагом планировщик замеряет пробный запрос; если он дольше
+latency_limit, шаги откладываются до следующего прохода. Каждый шаг
+записывается в maintenance_log вместе с длительностью.
+    
+    python netta_maintenance.py --db netta.db --interval 300
+    python netta_maintenance.py --db netta.db --log
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from netta_time import now_ms, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 🧹 ПЛАНИРОВЩИК ОБСЛУЖИВАНИЯ
+# ═══════════════════════════════════════════════════════════════
+
+# Режимы PRAGMA auto_vacuum
+AUTO_VACUUM_INCREMENTAL = 2
+
+TASK_TITLES = {
+    'optimize': '⚙️ PRAGMA optimize',
+    'analyze': '📊 ANALYZE',
+    'vacuum': '🧽 incremental_vacuum',
+    'checkpoint': '💾 wal_checkpoint',
+    'sweep': '🗑️ файлы без ссылок',
+}
+
+
+def create_maintenance_tables(cursor):
+    """Журнал шагов обслуживания"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            task TEXT NOT NULL,
+            pages INTEGER NOT NULL,
+            detail TEXT,
+            duration_ms REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_maintenance_task ON maintenance_log (task, id)')
+
+
+class MaintenanceScheduler:
+    def __init__(self, db, interval=300, optimize_every=3600, analyze_change=0.25,
+                 vacuum_min_pages=1000, vacuum_step=200, vacuum_budget=1.0,
+                 wal_passive_bytes=4 * 1024 * 1024, wal_truncate_bytes=64 * 1024 * 1024,
+                 latency_limit=0.05, sweep_every=3600):
+        self.db = db
+        self.interval = interval
+        self.optimize_every = optimize_every
+        self.analyze_change = analyze_change
+        self.vacuum_min_pages = vacuum_min_pages
+        self.vacuum_step = vacuum_step
+        # Не дольше vacuum_budget секунд освобождения страниц за проход
+        self.vacuum_budget = vacuum_budget
+        self.wal_passive_bytes = wal_passive_bytes
+        self.wal_truncate_bytes = wal_truncate_bytes
+        self.latency_limit = latency_limit
+        self.sweep_every = sweep_every
+        self.paused = 0
+        self.last_latency = None
+        self.stopped = threading.Event()
+        self.thread = None
+    
+    # ─── Состояние базы ────────────────────────────────────────
+    
+    def state(self):
+        """Страниц, свободных страниц, режим auto_vacuum, режим журнала, байт в WAL"""
+        conn = self.db.get_connection()
+        pages = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        conn.close()
+        try:
+            wal_bytes = os.path.getsize(f"{self.db.db_name}-wal")
+        except OSError:
+            wal_bytes = 0
+        return {'pages': pages, 'freelist': freelist, 'auto_vacuum': auto_vacuum,
+                'journal_mode': journal_mode, 'wal_bytes': wal_bytes}
+    
+    def last_run(self, task):
+        """(время, страниц в базе) последнего шага task или None"""
+        conn = self.db.get_connection()
+        row = conn.execute('''
+            SELECT ts, pages FROM maintenance_log WHERE task = ? ORDER BY id DESC LIMIT 1
+        ''', (task,)).fetchone()
+        conn.close()
+        return row
+    
+    def log(self, task, pages, detail, started):
+        duration_ms = (time.perf_counter() - started) * 1000
+        conn = self.db.get_connection()
+        conn.execute('''
+            INSERT INTO maintenance_log (ts, task, pages, detail, duration_ms)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (now_ms(), task, pages, detail, duration_ms))
+        conn.commit()
+        conn.close()
+        return task, detail, duration_ms
+    
+    # ─── Нагрузка ──────────────────────────────────────────────
+    
+    def probe(self):
+        """Длительность короткого запроса по индексу — как сейчас отвечает база"""
+        started = time.perf_counter()
+        conn = self.db.get_connection()
+        conn.execute('SELECT id FROM users ORDER BY id DESC LIMIT 1').fetchone()
+        conn.close()
+        self.last_latency = time.perf_counter() - started
+        return self.last_latency
+    
+    def busy(self):
+        """База отвечает медленно — обслуживание подождет"""
+        try:
+            slow = self.probe() > self.latency_limit
+        except sqlite3.OperationalError:
+            slow = True
+        if slow:
+            self.paused += 1
+        return slow
+    
+    # ─── Шаги ──────────────────────────────────────────────────
+    
+    def optimize(self, state):
+        last = self.last_run('optimize')
+        if last and now_ms() - last[0] < self.optimize_every * 1000:
+            return None
+        started = time.perf_counter()
+        conn = self.db.get_connection()
+        # Ограничиваем выборку, чтобы optimize не читал большие таблицы целиком
+        conn.execute('PRAGMA analysis_limit = 1000')
+        conn.execute('PRAGMA optimize')
+        conn.close()
+        return self.log('optimize', state['pages'], None, started)
+    
+    def analyze(self, state):
+        last = self.last_run('analyze')
+        if last and abs(state['pages'] - last[1]) < self.analyze_change * last[1]:
+            return None
+        started = time.perf_counter()
+        conn = self.db.get_connection()
+        conn.execute('ANALYZE')
+        conn.commit()
+        conn.close()
+        return self.log('analyze', state['pages'], None, started)
+    
+    def vacuum(self, state):
+        if state['auto_vacuum'] != AUTO_VACUUM_INCREMENTAL or state['freelist'] < self.vacuum_min_pages:
+            return None
+        started = time.perf_counter()
+        freelist = state['freelist']
+        conn = self.db.get_connection()
+        while freelist >= self.vacuum_min_pages and time.perf_counter() - started < self.vacuum_budget:
+            # execute() делает один шаг прагмы и освобождает одну страницу —
+            # executescript выполняет ее до конца
+            conn.executescript(f'PRAGMA incremental_vacuum({int(self.vacuum_step)})')
+            freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if self.busy():
+                break
+        conn.close()
+        return self.log('vacuum', state['pages'],
+                        f"свободных страниц {state['freelist']} → {freelist}", started)
+    
+    def checkpoint(self, state):
+        if state['journal_mode'] != 'wal' or state['wal_bytes'] < self.wal_passive_bytes:
+            return None
+        mode = 'TRUNCATE' if state['wal_bytes'] >= self.wal_truncate_bytes else 'PASSIVE'
+        started = time.perf_counter()
+        conn = self.db.get_connection()
+        busy, log_pages, done = conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        conn.close()
+        # Файл WAL не уменьшается после PASSIVE: если записей в нем мало,
+        # а велик только файл, шаг не считаем (файл обрежет TRUNCATE)
+        if not busy and log_pages * page_size < self.wal_passive_bytes:
+            return None
+        detail = f"{mode}: WAL {state['wal_bytes'] // 1024} КБ, перенесено {done} из {log_pages} страниц"
+        if busy:
+            detail += " (мешают читатели)"
+        return self.log('checkpoint', state['pages'], detail, started)
+    
+    def sweep(self, state):
+        """Файлы вложений, которые collect оставил как слишком свежие, и остатки сбоев"""
+        last = self.last_run('sweep')
+        if last and now_ms() - last[0] < self.sweep_every * 1000:
+            return None
+        started = time.perf_counter()
+        removed = self.db.media.sweep()
+        return self.log('sweep', state['pages'], f"удалено файлов: {removed}", started)
+    
+    def run_once(self):
+        """Один проход: выполнить шаги, для которых превышен порог. Возвращает [(шаг, детали, мс)]"""
+        done = []
+        for step in (self.checkpoint, self.vacuum, self.analyze, self.optimize, self.sweep):
+            if self.busy():
+                break
+            result = step(self.state())
+            if result:
+                done.append(result)
+        return done
+    
+    def history(self, limit=20):
+        """Последние шаги: (время, шаг, страниц, детали, мс)"""
+        conn = self.db.get_connection()
+        rows = conn.execute('''
+            SELECT ts, task, pages, detail, duration_ms FROM maintenance_log
+            ORDER BY id DESC LIMIT ?
+        ''', (limit,)).fetchall()
+        conn.close()
+        return rows
+    
+    # ─── Фоновый поток ─────────────────────────────────────────
+    
+    def loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.run_once()
+            except sqlite3.OperationalError:
+                # База занята — повторим на следующем проходе
+                pass
+            self.stopped.wait(self.interval)
+    
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.loop, daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+
+
+def enable_incremental_vacuum(db):
+    """Перевести существующую базу на auto_vacuum = INCREMENTAL (полный VACUUM)"""
+    conn = db.get_connection()
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    conn.close()
+    return mode == AUTO_VACUUM_INCREMENTAL
+
+
+def print_steps(steps):
+    for task, detail, duration_ms in steps:
+        print(f"   {TASK_TITLES[task]:<24} {duration_ms:>9.1f} мс  {detail or ''}")
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК ПЛАНИРОВЩИКА
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Обслуживание базы Netta")
+    parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    parser.add_argument("--interval", type=int, default=300, help="пауза между проходами, с")
+    parser.add_argument("--once", action="store_true", help="один проход и выход")
+    parser.add_argument("--convert", action="store_true",
+                        help="включить incremental_vacuum на старой базе (полный VACUUM)")
+    parser.add_argument("--log", action="store_true", help="показать последние шаги")
+    args = parser.parse_args()
+    
+    db = Database(args.db, media_dir=os.environ.get("NETTA_MEDIA_DIR"))
+    scheduler = MaintenanceScheduler(db, args.interval)
+    
+    if args.log:
+        for ts, task, pages, detail, duration_ms in scheduler.history():
+            print(f"{format_timestamp(ts, '%d.%m %H:%M:%S')}  {TASK_TITLES[task]:<24} "
+                  f"{duration_ms:>9.1f} мс  {pages} стр.  {detail or ''}")
+    else:
+        if args.convert:
+            started = time.perf_counter()
+            converted = enable_incremental_vacuum(db)
+            print(f"{'✅' if converted else '❌'} auto_vacuum = INCREMENTAL "
+                  f"({time.perf_counter() - started:.1f} с)")
+        while True:
+            state = scheduler.state()
+            print(f"🧹 {format_timestamp(now_ms(), '%H:%M:%S')} страниц: {state['pages']}, "
+                  f"свободных: {state['freelist']}, WAL: {state['wal_bytes'] // 1024} КБ")
+            print_steps(scheduler.run_once())
+            if scheduler.paused:
+                print(f"   ⏸️ отложено из-за нагрузки: {scheduler.paused} раз "
+                      f"(пробный запрос {scheduler.last_latency * 1000:.1f} мс)")
+                scheduler.paused = 0
+            if args.once:
+                break
+            time.sleep(args.interval)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              📎 NETTA MEDIA - Вложения к постам                ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Файлы вложений лежат вне базы, в каталоге media/, под именем
+SHA-256 своего содержимого: одинаковые файлы хранятся один раз.
+В базе только ссылки поста на файлы (neet_media) и число ссылок
+на каждый файл (media_blobs). Когда исчезает последняя ссылка,
+файл удаляется.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from netta_time import NOW_MS_SQL
+
+# ═══════════════════════════════════════════════════════════════
+# 🗄️ ТАБЛИЦЫ
+# ═══════════════════════════════════════════════════════════════
+
+MAX_ATTACHMENTS = 4
+MAX_ATTACHMENT_SIZE = 16 * 1024 * 1024
+
+
+def create_media_tables(cursor):
+    """Файлы вложений и их связь с постами"""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS media_blobs (
+            digest TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at INTEGER DEFAULT {NOW_MS_SQL}
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS neet_media (
+            neet_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            filename TEXT,
+            PRIMARY KEY (neet_id, position)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_neet_media_user ON neet_media (user_id)')
+
+
+def attach_media(cursor, neet_id, user_id, blobs):
+    """Привязать сохраненные файлы к посту (в транзакции публикации).
+    
+    blobs — список (digest, size, filename) из BlobStore.put_file.
+    """
+    for position, (digest, size, filename) in enumerate(blobs):
+        cursor.execute('''
+            INSERT INTO media_blobs (digest, size, refcount) VALUES (?, ?, 1)
+            ON CONFLICT (digest) DO UPDATE SET refcount = refcount + 1
+        ''', (digest, size))
+        cursor.execute('''
+            INSERT INTO neet_media (neet_id, position, digest, user_id, filename)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (neet_id, position, digest, user_id, filename))
+
+
+def release_media(cursor, where, params):
+    """Отвязать вложения постов (условие на neet_media) и уменьшить счетчики.
+    
+    Возвращает хеши файлов, на которые больше никто не ссылается;
+    удалить их с диска нужно после commit (BlobStore.collect).
+    """
+    cursor.execute(f'''
+        SELECT digest, COUNT(*) FROM neet_media WHERE {where} GROUP BY digest
+    ''', params)
+    released = cursor.fetchall()
+    if not released:
+        return []
+    
+    cursor.execute(f'DELETE FROM neet_media WHERE {where}', params)
+    cursor.executemany('''
+        UPDATE media_blobs SET refcount = refcount - ? WHERE digest = ?
+    ''', [(count, digest) for digest, count in released])
+    
+    marks = ','.join('?' * len(released))
+    cursor.execute(f'''
+        DELETE FROM media_blobs WHERE refcount <= 0 AND digest IN ({marks})
+        RETURNING digest
+    ''', [digest for digest, _ in released])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def release_neet_media(cursor, neet_id):
+    return release_media(cursor, 'neet_id = ?', (neet_id,))
+
+
+def release_user_media(cursor, user_id):
+    return release_media(cursor, 'user_id = ?', (user_id,))
+
+# ═══════════════════════════════════════════════════════════════
+# 📦 ХРАНИЛИЩЕ ФАЙЛОВ
+# ═══════════════════════════════════════════════════════════════
+
+class BlobStore:
+    def __init__(self, db, media_dir="media", chunk_size=64 * 1024):
+        self.db = db
+        self.media_dir = media_dir
+        self.chunk_size = chunk_size
+    
+    def blob_path(self, digest):
+        """media/ab/cd/abcd… — не больше пары сотен файлов в одном каталоге"""
+        return os.path.join(self.media_dir, digest[:2], digest[2:4], digest)
+    
+    def put_stream(self, stream, max_size=MAX_ATTACHMENT_SIZE):
+        """Записать поток по частям, считая хеш на ходу. Возвращает (digest, size)"""
+        os.makedirs(self.media_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.media_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(self.chunk_size), b''):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise ValueError("file too large")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            
+            digest = digest.hexdigest()
+            path = self.blob_path(digest)
+            # Такой же файл, если он уже есть, заменяется атомарно тем же
+            # содержимым: копия одна. Файл получает свежий mtime, и collect
+            # не удалит его, пока новый пост еще не сохранил ссылку
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        return digest, size
+    
+    def put_file(self, file_path):
+        """Сохранить файл с диска. Возвращает (digest, size, имя файла)"""
+        with open(file_path, 'rb') as f:
+            digest, size = self.put_stream(f)
+        return digest, size, os.path.basename(file_path)
+    
+    @contextmanager
+    def open_blob(self, digest):
+        """memoryview содержимого файла без копирования (через mmap)"""
+        with open(self.blob_path(digest), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b'')
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+    
+    def collect(self, digests, grace=300):
+        """Удалить с диска файлы, на которые больше нет ссылок.
+        
+        Файлы моложе grace секунд остаются sweep: их мог только что заново
+        записать put_file для поста, который еще не сохранен.
+        """
+        if not digests:
+            return 0
+        
+        cutoff = time.time() - grace
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        removed = 0
+        for digest in digests:
+            # Файл мог снова понадобиться новому посту, пока шло удаление
+            cursor.execute('SELECT 1 FROM media_blobs WHERE digest = ?', (digest,))
+            if cursor.fetchone():
+                continue
+            path = self.blob_path(digest)
+            # Сначала убираем файл из-под имени: put_stream, записавший его
+            # после проверки mtime, иначе потерял бы файл вместе со старым
+            tombstone = f"{path}.{os.getpid()}-{threading.get_ident()}.del"
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                os.replace(path, tombstone)
+            except FileNotFoundError:
+                continue
+            cursor.execute('SELECT 1 FROM media_blobs WHERE digest = ?', (digest,))
+            if os.path.getmtime(tombstone) >= cutoff or cursor.fetchone():
+                # Файл успели записать заново — возвращаем (содержимое то же)
+                os.replace(tombstone, path)
+                continue
+            os.remove(tombstone)
+            removed += 1
+        conn.close()
+        return removed
+    
+    def sweep(self, min_age=3600):
+        """Удалить файлы без строки в media_blobs (например, после сбоя публикации).
+        
+        Свежие файлы не трогаем: их пост может быть еще не сохранен.
+        """
+        if not os.path.isdir(self.media_dir):
+            return 0
+        
+        cutoff = time.time() - min_age
+        
+        conn = self.db.get_connection()
+        known = {row[0] for row in conn.execute('SELECT digest FROM media_blobs')}
+        conn.close()
+        
+        orphans = []
+        for directory, _, files in os.walk(self.media_dir):
+            for name in files:
+                path = os.path.join(directory, name)
+                if (name.endswith('.tmp') or name not in known) and os.path.getmtime(path) < cutoff:
+                    orphans.append(path)
+        
+        for path in orphans:
+            os.remove(path)
+        return len(orphans)
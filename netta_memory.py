@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🧠 NETTA MEMORY - База в оперативной памяти       ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Database и AdminDashboard принимают вместо имени файла:
+
+• ':memory:' — новая пустая база в памяти со своим именем;
+• URI 'file:…' — например, memory_uri('seed') или общий кеш
+  'file:seed?mode=memory&cache=shared'. По одному имени к базе
+  подключаются и приложение, и панель в том же процессе.
+
+Обычный ':memory:' у каждого соединения свой, а наши методы
+открывают соединение на каждую операцию, поэтому ':memory:' заменяется
+на именованную базу memdb (SQLite 3.36+): ее видят все соединения
+процесса, и, в отличие от общего кеша, занятая база ждет timeout, а не
+сразу падает с «database table is locked». База живет, пока открыто
+хотя бы одно соединение — его держит объект базы (keeper).
+
+Снимки для тестов: база заполняется один раз, а каждый тест получает
+копию через backup API (clone_db, Database.clone) — без диска и без
+повторного заполнения.
+"""
+
+import sqlite3
+import uuid
+
+# ═══════════════════════════════════════════════════════════════
+# 🧠 БАЗА В ПАМЯТИ
+# ═══════════════════════════════════════════════════════════════
+
+MEMORY = ':memory:'
+
+
+def is_uri(db_name):
+    return db_name.startswith('file:')
+
+
+def is_memory(db_name):
+    return db_name == MEMORY or is_uri(db_name) and ('mode=memory' in db_name or 'vfs=memdb' in db_name)
+
+
+def memory_uri(name=None):
+    """URI именованной базы в памяти, общей для соединений процесса"""
+    if sqlite3.sqlite_version_info < (3, 36, 0):
+        return f"file:{name or 'netta-' + uuid.uuid4().hex}?mode=memory&cache=shared"
+    return f"file:/{name or 'netta-' + uuid.uuid4().hex}?vfs=memdb"
+
+
+def resolve_db_name(db_name):
+    """':memory:' → своя именованная база в памяти, остальное без изменений"""
+    return memory_uri() if db_name == MEMORY else db_name
+
+
+def connect_db(db_name, **kwargs):
+    return sqlite3.connect(db_name, uri=is_uri(db_name), **kwargs)
+
+
+def clone_db(source, name=None):
+    """Копия базы source (файл или память) в новую базу в памяти.
+    Возвращает (URI копии, соединение, которое держит ее открытой)"""
+    target = memory_uri(name)
+    keeper = connect_db(target)
+    conn = connect_db(source)
+    conn.backup(keeper)
+    conn.close()
+    return target, keeper
+
+
+def save_db(source, path):
+    """Записать базу (например, заполненную в памяти) в файл"""
+    target = sqlite3.connect(path)
+    conn = connect_db(source)
+    conn.backup(target)
+    conn.close()
+    target.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              📦 NETTA MODELS - Модели данных                   ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Компактные объекты строк (__slots__ вместо словаря на каждую строку)
+и фабрики строк курсора, которые создают их сразу из результата
+запроса. Доступ как к словарю (neet['content']) продолжает работать.
+"""
+
+# ═══════════════════════════════════════════════════════════════
+# 📦 МОДЕЛИ
+# ═══════════════════════════════════════════════════════════════
+
+class Model:
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in self.__slots__
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def __len__(self):
+        return len(self.__slots__)
+    
+    def __eq__(self, other):
+        if isinstance(other, (Model, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+    
+    def keys(self):
+        return self.__slots__
+    
+    def values(self):
+        return [getattr(self, key) for key in self.__slots__]
+    
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.__slots__]
+    
+    def to_dict(self):
+        return dict(self.items())
+
+
+class NeetView(Model):
+    """Пост вместе с данными автора — строка ленты"""
+    __slots__ = ('id', 'user_id', 'content', 'likes_count', 'reneets_count',
+                 'replies_count', 'created_at', 'username', 'display_name',
+                 'avatar', 'verification_status', 'is_admin')
+    
+    def __init__(self, id, user_id, content, likes_count, reneets_count,
+                 replies_count, created_at, username, display_name, avatar,
+                 verification_status, is_admin):
+        self.id = id
+        self.user_id = user_id
+        self.content = content
+        self.likes_count = likes_count
+        self.reneets_count = reneets_count
+        self.replies_count = replies_count
+        self.created_at = created_at
+        self.username = username
+        self.display_name = display_name
+        self.avatar = avatar
+        self.verification_status = verification_status
+        self.is_admin = is_admin
+
+
+class Profile(Model):
+    """Профиль пользователя (без хеша пароля)"""
+    __slots__ = ('id', 'username', 'email', 'display_name', 'bio', 'avatar',
+                 'location', 'website', 'verification_status', 'is_admin',
+                 'created_at', 'followers_count', 'following_count')
+    
+    def __init__(self, id, username, email, display_name, bio, avatar, location,
+                 website, verification_status, is_admin, created_at,
+                 followers_count, following_count):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.display_name = display_name
+        self.bio = bio
+        self.avatar = avatar
+        self.location = location
+        self.website = website
+        self.verification_status = verification_status
+        self.is_admin = is_admin
+        self.created_at = created_at
+        self.followers_count = followers_count
+        self.following_count = following_count
+
+# ═══════════════════════════════════════════════════════════════
+# 🏭 ФАБРИКИ СТРОК
+# ═══════════════════════════════════════════════════════════════
+
+# Колонки в порядке полей моделей (n — neets, u — users)
+NEET_COLUMNS = '''
+    n.id, n.user_id, n.content, n.likes_count, n.reneets_count,
+    n.replies_count, n.created_at, u.username, u.display_name, u.avatar,
+    u.verification_status, u.is_admin
+'''
+
+PROFILE_COLUMNS = '''
+    id, username, email, display_name, bio, avatar, location, website,
+    verification_status, is_admin, created_at, followers_count, following_count
+'''
+
+
+def neet_row_factory(cursor, row):
+    return NeetView(*row)
+
+
+def profile_row_factory(cursor, row):
+    return Profile(*row)
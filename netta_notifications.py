@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🔔 NETTA NOTIFICATIONS - Уведомления              ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Уведомления пишутся в той же транзакции, что и действие (лайк,
+упоминание, одобрение верификации). Пока уведомление не прочитано,
+повторные события той же группы (например, 500 лайков одного поста)
+увеличивают его счетчик, а не добавляют новые строки. Число
+непрочитанных хранится отдельно и читается одним запросом по ключу.
+"""
+
+import re
+
+from netta_time import NOW_MS_SQL, now_ms
+
+# ═══════════════════════════════════════════════════════════════
+# 🔔 УВЕДОМЛЕНИЯ
+# ═══════════════════════════════════════════════════════════════
+
+KIND_LIKE = 'like'
+KIND_FOLLOW = 'follow'
+KIND_MENTION = 'mention'
+KIND_VERIFICATION = 'verification'
+
+MENTION_PATTERN = re.compile(r'@(\w+)')
+
+
+def create_notification_tables(cursor):
+    """Таблицы уведомлений и счетчиков непрочитанных"""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            neet_id INTEGER,
+            actor_id INTEGER,
+            count INTEGER DEFAULT 1,
+            is_read INTEGER DEFAULT 0,
+            created_at INTEGER DEFAULT {NOW_MS_SQL},
+            updated_at INTEGER DEFAULT {NOW_MS_SQL}
+        )
+    ''')
+    # Не больше одного непрочитанного уведомления на группу (пользователь, вид, пост)
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_group
+        ON notifications (user_id, kind, IFNULL(neet_id, 0)) WHERE is_read = 0
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_notifications_inbox
+        ON notifications (user_id, updated_at, id)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            user_id INTEGER PRIMARY KEY,
+            unread INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+
+def notify(cursor, user_id, kind, actor_id=None, neet_id=None):
+    """Добавить событие в уведомления (в транзакции вызывающего кода)"""
+    if actor_id is not None and actor_id == user_id:
+        return
+    
+    timestamp = now_ms()
+    cursor.execute('''
+        UPDATE notifications SET count = count + 1, actor_id = ?, updated_at = ?
+        WHERE user_id = ? AND kind = ? AND IFNULL(neet_id, 0) = ? AND is_read = 0
+    ''', (actor_id, timestamp, user_id, kind, neet_id or 0))
+    
+    if cursor.rowcount == 0:
+        cursor.execute('''
+            INSERT INTO notifications (user_id, kind, neet_id, actor_id, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (user_id, kind, neet_id, actor_id, timestamp, timestamp))
+        cursor.execute('''
+            INSERT INTO notification_counters (user_id, unread) VALUES (?, 1)
+            ON CONFLICT (user_id) DO UPDATE SET unread = unread + 1
+        ''', (user_id,))
+
+
+def notify_mentions(cursor, actor_id, neet_id, content):
+    """Уведомить всех упомянутых через @username в тексте поста"""
+    usernames = set(MENTION_PATTERN.findall(content))
+    if not usernames:
+        return
+    
+    marks = ','.join('?' * len(usernames))
+    cursor.execute(f'SELECT id FROM users WHERE username IN ({marks})', tuple(usernames))
+    for (user_id,) in cursor.fetchall():
+        notify(cursor, user_id, KIND_MENTION, actor_id, neet_id)
+
+
+def delete_notifications(cursor, where, params):
+    """Удалить уведомления (условие на notifications) и пересчитать число
+    непрочитанных у их получателей (в транзакции вызывающего кода)"""
+    cursor.execute(f'DELETE FROM notifications WHERE {where} RETURNING user_id', params)
+    recipients = {row[0] for row in cursor.fetchall()}
+    cursor.executemany('''
+        UPDATE notification_counters SET unread = (
+            SELECT COUNT(*) FROM notifications WHERE user_id = ? AND is_read = 0
+        )
+        WHERE user_id = ?
+    ''', [(user_id, user_id) for user_id in recipients])
+
+
+def delete_user_notifications(cursor, user_id):
+    """Уведомления удаляемого пользователя и о его действиях"""
+    delete_notifications(cursor, 'user_id = ? OR actor_id = ?', (user_id, user_id))
+    cursor.execute('DELETE FROM notification_counters WHERE user_id = ?', (user_id,))
+
+
+def delete_neet_notifications(cursor, neet_id):
+    delete_notifications(cursor, 'neet_id = ?', (neet_id,))
+
+
+class NotificationCenter:
+    def __init__(self, db):
+        self.db = db
+    
+    def unread_count(self, user_id):
+        """Число непрочитанных уведомлений (один запрос по первичному ключу)"""
+        conn = self.db.get_connection()
+        row = conn.execute(
+            'SELECT unread FROM notification_counters WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        conn.close()
+        return row[0] if row else 0
+    
+    def get_inbox(self, user_id, limit=10, before=None):
+        """Страница уведомлений, от новых к старым.
+        
+        before — (updated_at, id) последнего уведомления предыдущей страницы.
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        if before is None:
+            before = (now_ms() + 1, 0)
+        
+        cursor.execute('''
+            SELECT n.id, n.kind, n.neet_id, n.count, n.is_read, n.updated_at,
+                   a.username, a.display_name, ne.content
+            FROM notifications n
+            LEFT JOIN users a ON n.actor_id = a.id
+            LEFT JOIN neets ne ON n.neet_id = ne.id
+            WHERE n.user_id = ? AND (n.updated_at, n.id) < (?, ?)
+            ORDER BY n.updated_at DESC, n.id DESC
+            LIMIT ?
+        ''', (user_id, before[0], before[1], limit))
+        
+        notifications = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'id': n[0],
+            'kind': n[1],
+            'neet_id': n[2],
+            'count': n[3],
+            'is_read': n[4],
+            'updated_at': n[5],
+            'actor_username': n[6],
+            'actor_display_name': n[7],
+            'neet_content': n[8]
+        } for n in notifications]
+    
+    def mark_read(self, user_id, notification_ids):
+        """Отметить уведомления прочитанными и уменьшить счетчик"""
+        if not notification_ids:
+            return 0
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        marks = ','.join('?' * len(notification_ids))
+        cursor.execute(f'''
+            UPDATE notifications SET is_read = 1
+            WHERE user_id = ? AND is_read = 0 AND id IN ({marks})
+        ''', (user_id, *notification_ids))
+        marked = cursor.rowcount
+        
+        if marked:
+            cursor.execute('''
+                UPDATE notification_counters SET unread = MAX(unread - ?, 0)
+                WHERE user_id = ?
+            ''', (marked, user_id))
+        
+        conn.commit()
+        conn.close()
+        return marked
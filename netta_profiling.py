@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🔬 NETTA PROFILING - Профилирование действий      ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Включается переменной NETTA_PROFILE=<каталог> или флагом:
+    
+    python netta_profiling.py run app --out profiles
+    python netta_profiling.py run dashboard --out profiles
+    python netta_profiling.py summary profiles -o netta.folded
+
+Каждое действие меню и каждый метод User/Neet выполняется под
+cProfile; память отслеживает tracemalloc. Для каждого действия в
+каталог пишется .prof и текстовый отчет (самые дорогие функции,
+выделения памяти, доля времени в SQLite). Команда summary сливает
+все запуски в файл свернутых стеков для flamegraph.pl/speedscope.
+
+Когда профилирование выключено, методы не оборачиваются вовсе.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from functools import wraps
+
+PROFILE_ENV = 'NETTA_PROFILE'
+
+# Действия меню (каждое — отдельный отчет)
+APP_ACTIONS = (
+    'register_screen', 'login_screen', 'edit_profile_screen', 'create_neet_screen',
+    'feed_screen', 'profile_screen', 'verification_request_screen', 'view_user_screen',
+    'notifications_screen',
+)
+DASHBOARD_ACTIONS = (
+    'view_all_users', 'view_verification_requests', 'review_queue', 'approve_verification',
+    'reject_verification', 'grant_admin', 'revoke_verification', 'delete_user',
+    'delete_neet', 'view_statistics', 'spam_clusters', 'audit_log',
+    'activity_charts', 'counter_audit',
+)
+USER_METHODS = (
+    'register', 'check_available', 'login', 'logout', 'update_profile', 'get_profile',
+    'request_verification',
+)
+NEET_METHODS = (
+    'create', 'schedule', 'get_feed', 'like', 'unlike', 'liked_by', 'get_user_neets', 'get_media',
+)
+
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 10
+MAX_STACK_DEPTH = 64
+
+# ═══════════════════════════════════════════════════════════════
+# 🔬 ПРОФИЛИРОВЩИК
+# ═══════════════════════════════════════════════════════════════
+
+def is_sql(func):
+    """Встроенные методы модуля sqlite3 (execute, fetchall, commit, connect…)"""
+    filename, _, name = func
+    return filename == '~' and 'sqlite3' in name
+
+
+def is_input(func):
+    """Ожидание ответа пользователя (io.ask) — не работа приложения"""
+    filename, _, name = func
+    return name == 'ask' and os.path.basename(filename) == 'netta_console.py'
+
+
+class Profiler:
+    def __init__(self, out_dir, snapshot_every=10):
+        self.out_dir = out_dir
+        # Полный снимок tracemalloc дорог — берем его для каждого N-го действия
+        self.snapshot_every = snapshot_every
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        os.makedirs(out_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+    
+    def wrap(self, label, func):
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            # cProfile не вкладывается: внутренние вызовы видны в отчете внешнего
+            if getattr(self.local, 'active', False):
+                return func(*args, **kwargs)
+            self.local.active = True
+            try:
+                return self.run(label, func, args, kwargs)
+            finally:
+                self.local.active = False
+        return profiled
+    
+    def run(self, label, func, args, kwargs):
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+        
+        snapshot = tracemalloc.take_snapshot() if sequence % self.snapshot_every == 1 else None
+        memory_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            allocations = None
+            if snapshot:
+                allocations = tracemalloc.take_snapshot().compare_to(snapshot, 'lineno')
+            self.report(sequence, label, profile, elapsed,
+                        memory_after - memory_before, memory_peak - memory_before, allocations)
+    
+    def report(self, sequence, label, profile, elapsed, memory_delta, memory_peak, allocations):
+        """Записать .prof, текстовый отчет и строку в actions.jsonl"""
+        name = f"{os.getpid()}_{sequence:06d}_{label}"
+        profile.dump_stats(os.path.join(self.out_dir, f"{name}.prof"))
+        
+        stats = pstats.Stats(profile)
+        sql_time = sum(row[2] for func, row in stats.stats.items() if is_sql(func))
+        input_time = sum(row[3] for func, row in stats.stats.items() if is_input(func))
+        active = max(stats.total_tt - input_time, 1e-9)
+        
+        text = io.StringIO()
+        text.write(f"Действие: {label}\n")
+        text.write(f"Время: {elapsed * 1000:.1f} мс (ожидание ввода {input_time * 1000:.1f} мс)\n")
+        text.write(f"SQLite: {sql_time * 1000:.1f} мс, {sql_time / active:.0%} активного времени\n")
+        text.write(f"Память: {memory_delta / 1024:+.1f} КБ, пик {memory_peak / 1024:.1f} КБ\n\n")
+        pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        if allocations:
+            text.write("Выделения памяти:\n")
+            for stat in allocations[:TOP_ALLOCATIONS]:
+                text.write(f"  {stat}\n")
+        
+        with open(os.path.join(self.out_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+        
+        record = {
+            'file': f"{name}.prof",
+            'label': label,
+            'ms': round(elapsed * 1000, 3),
+            'active_ms': round(active * 1000, 3),
+            'sql_share': round(sql_time / active, 4),
+            'memory_kb': round(memory_delta / 1024, 1),
+            'peak_kb': round(memory_peak / 1024, 1),
+        }
+        with self.lock, open(os.path.join(self.out_dir, 'actions.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def instrument(obj, names, profiler, prefix):
+    """Заменить методы объекта профилирующими обертками (только на этом объекте)"""
+    for name in names:
+        method = getattr(obj, name, None)
+        if method is not None:
+            setattr(obj, name, profiler.wrap(f"{prefix}.{name}", method))
+
+
+def enable_app_profiling(app, out_dir):
+    profiler = Profiler(out_dir)
+    instrument(app, APP_ACTIONS, profiler, 'app')
+    instrument(app.user, USER_METHODS, profiler, 'User')
+    instrument(app.neet, NEET_METHODS, profiler, 'Neet')
+    return profiler
+
+
+def enable_dashboard_profiling(dashboard, out_dir):
+    profiler = Profiler(out_dir)
+    instrument(dashboard, DASHBOARD_ACTIONS, profiler, 'dashboard')
+    return profiler
+
+
+def profile_dir():
+    """Каталог отчетов из NETTA_PROFILE или None (профилирование выключено)"""
+    return os.environ.get(PROFILE_ENV) or None
+
+# ═══════════════════════════════════════════════════════════════
+# 🔥 СВЕРНУТЫЕ СТЕКИ
+# ═══════════════════════════════════════════════════════════════
+
+def frame_name(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapse(stats):
+    """Свернутые стеки из графа вызовов pstats: {'a;b;c': микросекунды}.
+    
+    cProfile хранит только пары вызывающий → вызываемый, поэтому время
+    вызываемой функции делится между путями пропорционально времени,
+    полученному по каждому ребру.
+    """
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge
+    
+    stacks = Counter()
+    
+    def walk(func, path, names, scale):
+        _, _, tottime, cumtime, _ = stats[func]
+        stack = ';'.join(names)
+        stacks[stack] += tottime * scale
+        if len(names) >= MAX_STACK_DEPTH:
+            return
+        for child, edge in callees[func].items():
+            child_cumtime = stats[child][3]
+            # Рекурсию не разворачиваем
+            if child in path or child_cumtime <= 0:
+                continue
+            walk(child, path | {child}, names + [frame_name(child)],
+                 scale * edge[3] / child_cumtime)
+    
+    for func, (_, _, _, _, callers) in stats.items():
+        # Корни графа — обернутые действия (кроме самого profile.disable())
+        if not callers and '_lsprof' not in func[2]:
+            walk(func, {func}, [frame_name(func)], 1.0)
+    
+    return {stack: round(seconds * 1_000_000) for stack, seconds in stacks.items()
+            if seconds * 1_000_000 >= 1}
+
+
+def summary(out_dir, folded_path=None):
+    """Слить все .prof каталога в свернутые стеки и вывести сводку по действиям"""
+    profiles = sorted(f for f in os.listdir(out_dir) if f.endswith('.prof'))
+    if not profiles:
+        print(f"❌ В {out_dir} нет профилей")
+        return
+    
+    folded_path = folded_path or os.path.join(out_dir, 'netta.folded')
+    merged = pstats.Stats(*(os.path.join(out_dir, f) for f in profiles))
+    with open(folded_path, 'w', encoding='utf-8') as f:
+        for stack, micros in sorted(collapse(merged.stats).items()):
+            f.write(f"{stack} {micros}\n")
+    
+    actions = defaultdict(list)
+    actions_path = os.path.join(out_dir, 'actions.jsonl')
+    if os.path.exists(actions_path):
+        with open(actions_path, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                actions[record['label']].append(record)
+    
+    print(f"🔥 Профилей: {len(profiles)} → {folded_path}\n")
+    print(f"   {'действие':<36}{'раз':>6}{'всего, мс':>12}{'сред., мс':>11}{'SQL':>6}{'пик, КБ':>10}")
+    by_total = sorted(actions.items(), key=lambda a: -sum(r['active_ms'] for r in a[1]))
+    for label, records in by_total:
+        total = sum(r['active_ms'] for r in records)
+        sql_share = sum(r['sql_share'] * r['active_ms'] for r in records) / total if total else 0
+        peak = max(r['peak_kb'] for r in records)
+        print(f"   {label:<36}{len(records):>6}{total:>12.1f}{total / len(records):>11.1f}"
+              f"{sql_share:>6.0%}{peak:>10.1f}")
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Профилирование Netta")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = commands.add_parser('run', help='запустить приложение или админ-панель с профилированием')
+    run_parser.add_argument('target', choices=('app', 'dashboard'))
+    run_parser.add_argument('--out', default='profiles', help='каталог отчетов')
+    run_parser.add_argument('--db', default='netta.db', help='файл базы данных')
+    
+    summary_parser = commands.add_parser('summary', help='свернутые стеки и сводка по действиям')
+    summary_parser.add_argument('dir', help='каталог отчетов')
+    summary_parser.add_argument('-o', '--output', help='файл свернутых стеков')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'summary':
+        summary(args.dir, args.output)
+    elif args.target == 'app':
+        from Netta import NettaApp
+        app = NettaApp(args.db, archive_dir=os.environ.get("NETTA_ARCHIVE_DIR"),
+                       media_dir=os.environ.get("NETTA_MEDIA_DIR"))
+        enable_app_profiling(app, args.out)
+        app.run()
+    else:
+        from netta_dashboard import AdminDashboard
+        dashboard = AdminDashboard(args.db, archive_dir=os.environ.get("NETTA_ARCHIVE_DIR"),
+                                   media_dir=os.environ.get("NETTA_MEDIA_DIR"))
+        enable_dashboard_profiling(dashboard, args.out)
+        dashboard.run()
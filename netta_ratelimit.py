@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              ⏳ NETTA RATE LIMIT - Ограничение частоты         ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Корзины токенов в памяти на каждую пару (операция, ключ). Решение
+принимается за O(1) без обращения к базе; давно не использованные
+корзины вытесняются.
+"""
+
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# ═══════════════════════════════════════════════════════════════
+# ⏳ ОГРАНИЧЕНИЕ ЧАСТОТЫ ЗАПРОСОВ
+# ═══════════════════════════════════════════════════════════════
+
+# операция: (емкость корзины, пополнение токенов в секунду)
+DEFAULT_LIMITS = {
+    'register': (3, 3 / 3600),      # 3 регистрации в час с одного клиента
+    'login': (5, 5 / 60),           # 5 попыток входа в минуту на имя пользователя
+    'create': (10, 10 / 60),        # 10 постов в минуту
+    'like': (60, 1.0),              # 60 лайков подряд, затем 1 в секунду
+}
+
+# Без ограничения частоты (нагрузочные тесты: все сессии процесса — один «клиент»)
+UNLIMITED = {operation: (10 ** 9, 10 ** 9) for operation in DEFAULT_LIMITS}
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+    
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    def __init__(self, limits=None, idle_timeout=600, max_buckets=100000, clock=time.monotonic):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.idle_timeout = idle_timeout
+        self.max_buckets = max_buckets
+        self.clock = clock
+        # Порядок — от давно использованных к недавним
+        self.buckets = OrderedDict()
+        self.allowed = Counter()
+        self.throttled = Counter()
+        self.lock = threading.Lock()
+    
+    def acquire(self, operation, key):
+        """Взять токен. Возвращает (разрешено, через сколько секунд повторить)"""
+        if operation not in self.limits:
+            return True, 0.0
+        
+        capacity, rate = self.limits[operation]
+        now = self.clock()
+        bucket_key = (operation, key)
+        
+        with self.lock:
+            bucket = self.buckets.get(bucket_key)
+            if bucket is None:
+                bucket = TokenBucket(capacity, now)
+                self.buckets[bucket_key] = bucket
+            else:
+                bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+                self.buckets.move_to_end(bucket_key)
+            
+            self.evict(now)
+            
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                self.allowed[operation] += 1
+                return True, 0.0
+            
+            self.throttled[operation] += 1
+            return False, (1 - bucket.tokens) / rate
+    
+    def evict(self, now):
+        """Вытеснить простаивающие корзины (вызывается под блокировкой)"""
+        # Проверяем не больше пары самых старых корзин — амортизированно O(1)
+        for _ in range(2):
+            if not self.buckets:
+                return
+            oldest_key = next(iter(self.buckets))
+            oldest = self.buckets[oldest_key]
+            capacity, rate = self.limits[oldest_key[0]]
+            idle = now - oldest.updated
+            # Корзину можно забыть без потерь, только когда она уже снова полная
+            refilled = oldest.tokens + idle * rate >= capacity
+            if (idle >= self.idle_timeout and refilled) or len(self.buckets) > self.max_buckets:
+                del self.buckets[oldest_key]
+            else:
+                return
+    
+    def check(self, operation, key):
+        """None, если операция разрешена, иначе текст ошибки для (success, message)"""
+        allowed, retry_after = self.acquire(operation, key)
+        if allowed:
+            return None
+        return f"⏳ Слишком много запросов! Повторите через {math.ceil(retry_after)} сек."
+    
+    def stats(self):
+        """Счетчики разрешенных и отклоненных запросов по операциям"""
+        with self.lock:
+            return {
+                'allowed': dict(self.allowed),
+                'throttled': dict(self.throttled),
+                'buckets': len(self.buckets),
+            }
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🎞️ NETTA REPLAY - Запись и повтор нагрузки         ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Запись включается переменной NETTA_RECORD=<файл> (приложение и
+админ-панель) или флагом --record у нагрузочного теста. Методы User,
+Neet и изменяющие методы AdminDashboard оборачиваются на объекте
+сессии; каждый вызов пишется строкой JSONL: сессия, смещение от
+начала записи, аргументы по именам, время выполнения и итог. Пароли
+заменяются на '***'. Перед первым вызовом рядом с трассой
+сохраняется снимок базы (<трасса>.db) — повтор начинается с того же
+состояния.
+
+Повтор выполняет трассу на копии снимка: каждая сессия — в своем
+потоке и в записанном порядке, вызовы стартуют по записанным
+смещениям в 1x, 10x или без пауз (--speed 0). id постов, пользователей
+и заявок, созданных во время записи, сопоставляются с новыми id копии.
+Пароли всех пользователей копии заменяются одним паролем повтора.
+Ограничение частоты при повторе выключено. Порядок между сессиями
+держат только смещения: без пауз лайк может опередить пост другой
+сессии — вызовы с другим итогом отчет показывает отдельно.
+    
+    NETTA_RECORD=trace.jsonl python Netta.py
+    python netta_replay.py replay trace.jsonl --speed 10 --out build_a.json
+    python netta_replay.py compare build_a.json build_b.json
+    python netta_replay.py compare trace.jsonl build_b.json
+
+Когда запись выключена, методы не оборачиваются вовсе.
+"""
+
+import atexit
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from netta_memory import clone_db, save_db
+from netta_models import PROFILE_COLUMNS, profile_row_factory
+from netta_profiling import USER_METHODS, NEET_METHODS
+from netta_time import now_ms
+
+RECORD_ENV = 'NETTA_RECORD'
+
+# Изменяющие методы панели (экраны панели — только их обертки над вводом)
+ADMIN_METHODS = (
+    'decide_verification', 'set_admin', 'revoke_user_verification', 'remove_user',
+    'remove_neet', 'find_user', 'find_neet',
+)
+
+REDACTED = '***'
+REPLAY_PASSWORD = 'netta-replay'
+
+# Аргументы с id и пространство id, к которому они относятся
+ID_ARGUMENTS = {'neet_id': 'neet', 'neet_ids': 'neet', 'user_id': 'user', 'request_id': 'request'}
+
+# Вызов, создающий запись: (пространство id, запрос нового id по аргументам и автору)
+CREATED_IDS = {
+    'User.register': ('user', 'SELECT id FROM users WHERE username = :username'),
+    'User.request_verification': (
+        'request', 'SELECT MAX(id) FROM verification_requests WHERE user_id = :actor'),
+    'Neet.create': ('neet', 'SELECT MAX(id) FROM neets WHERE user_id = :actor'),
+}
+
+# ═══════════════════════════════════════════════════════════════
+# ⏺️ ЗАПИСЬ
+# ═══════════════════════════════════════════════════════════════
+
+def redact(arguments):
+    """Аргументы по именам (с раскрытыми **kwargs) без паролей"""
+    flat = {}
+    for name, value in arguments.items():
+        if name == 'kwargs' and isinstance(value, dict):
+            flat.update(value)
+        else:
+            flat[name] = value
+    return {name: REDACTED if 'password' in name else value for name, value in flat.items()}
+
+
+def outcome(result):
+    """Краткий итог вызова: успех для (успех, сообщение), число строк для списков"""
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+        return {'ok': result[0]}
+    if isinstance(result, list):
+        return {'ok': True, 'rows': len(result)}
+    return {'ok': result is not None}
+
+
+def actor_of(obj):
+    """id пользователя, от имени которого идет вызов, или None"""
+    profile = getattr(obj, 'admin_user', None) or getattr(getattr(obj, 'user', obj), 'current_user', None)
+    return profile['id'] if profile else None
+
+
+def created_id(db, call, arguments, actor):
+    kind, query = CREATED_IDS[call]
+    conn = db.get_connection()
+    row = conn.execute(query, {**arguments, 'actor': actor}).fetchone()
+    conn.close()
+    return kind, row[0] if row else None
+
+
+class Recorder:
+    def __init__(self, path, db_name=None):
+        self.path = path
+        # Снимок базы до первого вызова — с него начнется повтор
+        if db_name is not None and not os.path.exists(f"{path}.db"):
+            save_db(db_name, f"{path}.db")
+        self.lock = threading.Lock()
+        # Вложенные вызовы (remove_neet → find_neet) повтор выполнит сам
+        self.local = threading.local()
+        self.file = open(path, 'a', encoding='utf-8')
+        self.started = time.perf_counter()
+        self.sessions = itertools.count(1)
+        self.calls = 0
+        self.write({'trace': 1, 'started_at': now_ms(), 'pid': os.getpid()})
+        atexit.register(self.close)
+    
+    def new_session(self):
+        return f"{os.getpid()}-{next(self.sessions)}"
+    
+    def write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(line)
+    
+    def wrap(self, obj, target, method, session):
+        name = method.__name__
+        call = f"{target}.{name}"
+        signature = inspect.signature(method)
+        
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if getattr(self.local, 'active', False):
+                return method(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs).arguments
+            actor = actor_of(obj)
+            offset = time.perf_counter() - self.started
+            started = time.perf_counter()
+            self.local.active = True
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                self.write({
+                    'session': session, 't': round(offset, 6), 'call': call, 'actor': actor,
+                    'args': redact(arguments), 'ms': round(elapsed * 1000, 3),
+                    'ok': False, 'error': type(e).__name__,
+                })
+                raise
+            finally:
+                self.local.active = False
+            elapsed = time.perf_counter() - started
+            
+            entry = {
+                'session': session, 't': round(offset, 6), 'call': call, 'actor': actor,
+                'args': redact(arguments), 'ms': round(elapsed * 1000, 3), **outcome(result),
+            }
+            if entry['ok'] and call in CREATED_IDS:
+                entry['created'] = created_id(obj.db, call, arguments, actor_of(obj))[1]
+            self.write(entry)
+            with self.lock:
+                self.calls += 1
+            return result
+        
+        return wrapper
+    
+    def instrument(self, obj, target, names, session):
+        """Заменить методы объекта записывающими обертками (только на этом объекте)"""
+        for name in names:
+            method = getattr(obj, name, None)
+            if method is not None:
+                setattr(obj, name, self.wrap(obj, target, method, session))
+    
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def enable_app_recording(app, recorder):
+    """Записывать вызовы User/Neet одной сессии приложения"""
+    session = recorder.new_session()
+    recorder.instrument(app.user, 'User', USER_METHODS, session)
+    recorder.instrument(app.neet, 'Neet', NEET_METHODS, session)
+    return session
+
+
+def enable_dashboard_recording(dashboard, recorder):
+    """Записывать изменяющие вызовы панели одной сессией"""
+    session = recorder.new_session()
+    recorder.instrument(dashboard, 'Admin', ADMIN_METHODS, session)
+    return session
+
+
+def record_path():
+    """Файл трассы из NETTA_RECORD или None (запись выключена)"""
+    return os.environ.get(RECORD_ENV) or None
+
+# ═══════════════════════════════════════════════════════════════
+# ▶️ ПОВТОР
+# ═══════════════════════════════════════════════════════════════
+
+def load_trace(path):
+    """Вызовы трассы, сгруппированные по сессиям в записанном порядке.
+    
+    В один файл могут писать несколько процессов (приложение и панель):
+    смещения каждого процесса переводятся на общую шкалу по его заголовку.
+    """
+    sessions = defaultdict(list)
+    started_at = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if 'trace' in entry:
+                started_at[str(entry['pid'])] = entry['started_at']
+            elif 'call' in entry:
+                entry['t'] += started_at.get(entry['session'].split('-')[0], 0) / 1000
+                sessions[entry['session']].append(entry)
+    
+    base = min((session[0]['t'] for session in sessions.values()), default=0.0)
+    for session in sessions.values():
+        for entry in session:
+            entry['t'] -= base
+    return dict(sessions)
+
+
+def prepare_copy(trace_path, snapshot=None, copy_to=None):
+    """Копия снимка для повтора: (Database, keeper).
+    
+    Без copy_to копия живет в памяти; пароли заменяются паролем повтора.
+    """
+    from Netta import Database
+    
+    snapshot = snapshot or f"{trace_path}.db"
+    if not os.path.exists(snapshot):
+        raise FileNotFoundError(f"нет снимка базы {snapshot}")
+    if copy_to:
+        save_db(snapshot, copy_to)
+        # Фильтр имен прошлого повтора описывает уже другую базу
+        if os.path.exists(f"{copy_to}.names"):
+            os.remove(f"{copy_to}.names")
+        db_name, keeper = copy_to, None
+    else:
+        db_name, keeper = clone_db(snapshot)
+    
+    db = Database(db_name)
+    conn = db.get_connection()
+    conn.execute('UPDATE users SET password_hash = ?',
+                 (hashlib.sha256(REPLAY_PASSWORD.encode()).hexdigest(),))
+    conn.commit()
+    conn.close()
+    return db, keeper
+
+
+class Replayer:
+    def __init__(self, db, sessions, speed=1.0, workers=None):
+        self.db = db
+        self.sessions = sessions
+        # 0 — без пауз, иначе во сколько раз быстрее записи
+        self.speed = speed
+        # Сколько сессий идут одновременно (None — все сразу, как при записи)
+        self.workers = workers
+        self.ids = defaultdict(dict)
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.late = []
+        self.diverged = Counter()
+        self.errors = Counter()
+        self.started = None
+    
+    def session_objects(self, session):
+        """(User, Neet, AdminDashboard или None) новой сессии повтора"""
+        from Netta import User, Neet
+        from netta_dashboard import AdminDashboard
+        
+        user = User(self.db)
+        neet = Neet(self.db, user)
+        dashboard = None
+        if any(entry['call'].startswith('Admin.') for entry in session):
+            dashboard = AdminDashboard(self.db.db_name, feed_cache=self.db.feed_cache)
+        return user, neet, dashboard
+    
+    def map_ids(self, arguments):
+        """Аргументы вызова с id записи, замененными на id копии"""
+        mapped = {}
+        with self.lock:
+            for name, value in arguments.items():
+                kind = ID_ARGUMENTS.get(name)
+                if value == REDACTED:
+                    value = REPLAY_PASSWORD
+                elif kind and isinstance(value, list):
+                    value = [self.ids[kind].get(item, item) for item in value]
+                elif kind:
+                    value = self.ids[kind].get(value, value)
+                mapped[name] = value
+        return mapped
+    
+    def admin_profile(self, actor):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = profile_row_factory
+        cursor.execute(f'SELECT {PROFILE_COLUMNS} FROM users WHERE id = ?', (actor,))
+        profile = cursor.fetchone()
+        conn.close()
+        return profile
+    
+    def run_session(self, session):
+        user, neet, dashboard = self.session_objects(session)
+        targets = {'User': user, 'Neet': neet, 'Admin': dashboard}
+        
+        for entry in session:
+            if self.speed:
+                delay = self.started + entry['t'] / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            target_name, name = entry['call'].split('.')
+            target = targets[target_name]
+            arguments = self.map_ids(entry['args'])
+            if target_name == 'Admin':
+                with self.lock:
+                    actor = self.ids['user'].get(entry['actor'], entry['actor'])
+                if not dashboard.admin_user or dashboard.admin_user['id'] != actor:
+                    dashboard.admin_user = self.admin_profile(actor)
+            
+            scheduled = self.started + entry['t'] / self.speed if self.speed else None
+            started = time.perf_counter()
+            try:
+                result = getattr(target, name)(**arguments)
+                error = None
+            except Exception as e:
+                result, error = None, type(e).__name__
+            elapsed = time.perf_counter() - started
+            
+            ok = outcome(result)['ok'] if error is None else False
+            created = None
+            if ok and entry.get('created') is not None and entry['call'] in CREATED_IDS:
+                kind, created = created_id(self.db, entry['call'], arguments, actor_of(target))
+            
+            with self.lock:
+                self.latency[entry['call']].append(elapsed * 1000)
+                if scheduled is not None:
+                    self.late.append(max(0.0, started - scheduled) * 1000)
+                if error:
+                    self.errors[f"{entry['call']}: {error}"] += 1
+                if ok != entry['ok']:
+                    self.diverged[entry['call']] += 1
+                if created is not None:
+                    self.ids[kind][entry['created']] = created
+        
+        if dashboard is not None:
+            dashboard.audit.close()
+    
+    def run(self):
+        """Повторить все сессии параллельно. Возвращает отчет"""
+        self.started = time.perf_counter()
+        with ThreadPoolExecutor(self.workers or max(1, len(self.sessions))) as pool:
+            list(pool.map(self.run_session, self.sessions.values()))
+        elapsed = time.perf_counter() - self.started
+        
+        calls = sum(len(values) for values in self.latency.values())
+        return {
+            'speed': self.speed,
+            'sessions': len(self.sessions),
+            'calls': calls,
+            'elapsed': round(elapsed, 3),
+            'calls_per_sec': round(calls / elapsed, 1) if elapsed else 0.0,
+            'late_p99_ms': round(percentile(sorted(self.late), 0.99), 3),
+            'diverged': dict(self.diverged),
+            'errors': dict(self.errors),
+            'latency': latency_stats(self.latency),
+        }
+
+# ═══════════════════════════════════════════════════════════════
+# 📊 СРАВНЕНИЕ
+# ═══════════════════════════════════════════════════════════════
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def latency_stats(latencies):
+    """{вызов: {'count', 'p50', 'p90', 'p99', 'max'}} в мс"""
+    stats = {}
+    for call, values in sorted(latencies.items()):
+        values = sorted(values)
+        stats[call] = {
+            'count': len(values),
+            'p50': round(percentile(values, 0.50), 3),
+            'p90': round(percentile(values, 0.90), 3),
+            'p99': round(percentile(values, 0.99), 3),
+            'max': round(values[-1], 3),
+        }
+    return stats
+
+
+def load_latency(path):
+    """Распределения задержек из отчета повтора (.json) или из самой трассы"""
+    if path.endswith('.jsonl'):
+        latencies = defaultdict(list)
+        for session in load_trace(path).values():
+            for entry in session:
+                latencies[entry['call']].append(entry['ms'])
+        return latency_stats(latencies)
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['latency']
+
+
+def print_comparison(before, after):
+    print(f"   {'вызов':<30}{'кол-во':>8}{'p50, мс':>26}{'p90, мс':>26}{'p99, мс':>26}")
+    for call in sorted(set(before) | set(after)):
+        a, b = before.get(call), after.get(call)
+        if not a or not b:
+            print(f"   {call:<30}{'—':>8}  только в {'первом' if a else 'втором'}")
+            continue
+        cells = []
+        for key in ('p50', 'p90', 'p99'):
+            change = (b[key] - a[key]) / a[key] if a[key] else 0.0
+            cells.append(f"{a[key]:.2f} → {b[key]:.2f} ({change:+.0%})")
+        print(f"   {call:<30}{b['count']:>8}" + ''.join(f"{cell:>26}" for cell in cells))
+
+
+def print_report(report):
+    speed = f"{report['speed']:g}x" if report['speed'] else 'без пауз'
+    print(f"🎞️ Повтор ({speed}): {report['sessions']} сессий, {report['calls']} вызовов "
+          f"за {report['elapsed']:.2f} с ({report['calls_per_sec']:.1f} вызовов/с)")
+    if report['speed']:
+        print(f"   опоздание старта p99: {report['late_p99_ms']:.1f} мс")
+    for call, count in sorted(report['diverged'].items()):
+        print(f"   ⚠️ {call}: другой итог в {count} вызовах")
+    for error, count in sorted(report['errors'].items()):
+        print(f"   ❌ {error}: {count}")
+    
+    print(f"\n   {'вызов':<30}{'кол-во':>8}{'p50, мс':>10}{'p90, мс':>10}{'p99, мс':>10}{'max, мс':>10}")
+    for call, stats in report['latency'].items():
+        print(f"   {call:<30}{stats['count']:>8}{stats['p50']:>10.2f}{stats['p90']:>10.2f}"
+              f"{stats['p99']:>10.2f}{stats['max']:>10.2f}")
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Повтор записанной нагрузки Netta")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    replay = commands.add_parser("replay", help="повторить трассу на копии снимка")
+    replay.add_argument("trace", help="файл трассы (NETTA_RECORD)")
+    replay.add_argument("--snapshot", help="снимок базы (по умолчанию <трасса>.db)")
+    replay.add_argument("--speed", type=float, default=1.0, help="1, 10 … или 0 — без пауз")
+    replay.add_argument("--workers", type=int, help="одновременных сессий (по умолчанию все)")
+    replay.add_argument("--copy-to", help="файл копии (по умолчанию копия в памяти)")
+    replay.add_argument("--out", help="сохранить отчет в JSON для compare")
+    
+    compare = commands.add_parser("compare", help="сравнить задержки двух сборок")
+    compare.add_argument("before", help="отчет повтора (.json) или трасса (.jsonl)")
+    compare.add_argument("after", help="отчет повтора (.json) или трасса (.jsonl)")
+    args = parser.parse_args()
+    
+    if args.command == "replay":
+        db, keeper = prepare_copy(args.trace, args.snapshot, args.copy_to)
+        report = Replayer(db, load_trace(args.trace), args.speed, args.workers).run()
+        print_report(report)
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        print_comparison(load_latency(args.before), load_latency(args.after))
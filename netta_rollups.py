@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              📈 NETTA ROLLUPS - Почасовая и дневная статистика ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Регистрации, посты, лайки и решения по заявкам считаются по часам и
+по дням в таблицах rollup_hourly и rollup_daily. Агрегатор читает
+только строки новее своей отметки (watermark) по первичному ключу
+или индексу и прибавляет их к счетчикам в той же транзакции, где
+сдвигает отметку, — каждая строка учитывается ровно один раз.
+
+Строки моложе settle_lag секунд не читаются: id постов и лайков
+выдаются заранее (разными процессами), и строка с меньшим id может
+появиться в базе чуть позже строки с большим.
+
+Счетчики — это события, а не текущее состояние: удаление поста не
+уменьшает график постов за тот час.
+    
+    python netta_rollups.py --db netta.db --interval 60
+"""
+
+import sqlite3
+import threading
+import time
+
+from netta_ids import make_id
+from netta_time import now_ms, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 📈 СЧЕТЧИКИ ПО ВРЕМЕНИ
+# ═══════════════════════════════════════════════════════════════
+
+HOUR_MS = 3600000
+DAY_MS = 86400000
+
+# Почасовые ряды храним 90 дней, дневные — без ограничения (по строке в день)
+HOURLY_RETENTION_DAYS = 90
+
+# (метрика, таблица, ключ отметки, время события, условие, ключ по времени в мс)
+METRICS = (
+    ('signups', 'users', 'id', 'created_at', 'TRUE', None),
+    ('neets', 'neets', 'id', 'created_at', 'TRUE', make_id),
+    ('likes', 'likes', 'id', 'created_at', 'TRUE', make_id),
+    ('verifications_approved', 'verification_requests', 'decided_at', 'decided_at',
+     "status = 'approved'", int),
+    ('verifications_rejected', 'verification_requests', 'decided_at', 'decided_at',
+     "status = 'rejected'", int),
+)
+
+METRIC_TITLES = {
+    'signups': '👥 Регистрации',
+    'neets': '📝 Neets',
+    'likes': '❤️ Лайки',
+    'verifications_approved': '✅ Одобрено заявок',
+    'verifications_rejected': '❌ Отклонено заявок',
+}
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def create_rollup_tables(cursor):
+    """Счетчики по часам и дням и отметки агрегатора"""
+    for table in ('rollup_hourly', 'rollup_daily'):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                metric TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (metric, bucket)
+            ) WITHOUT ROWID
+        ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            metric TEXT PRIMARY KEY,
+            watermark INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+    ''')
+
+
+def sparkline(values):
+    """Строка из блоков ▁…█, высота — доля от максимума ряда"""
+    top = max(values, default=0)
+    if not top:
+        return ' ' * len(values)
+    return ''.join(SPARK_CHARS[min(len(SPARK_CHARS) - 1, value * len(SPARK_CHARS) // top)]
+                   if value else ' ' for value in values)
+
+
+class RollupAggregator:
+    def __init__(self, db, interval=60, settle_lag=30, batch_size=5000):
+        self.db = db
+        self.interval = interval
+        self.settle_lag_ms = settle_lag * 1000
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+        self.thread = None
+    
+    def watermark(self, cursor, metric):
+        cursor.execute('SELECT watermark FROM rollup_watermarks WHERE metric = ?', (metric,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    
+    def aggregate_batch(self, metric, table, key, ts_column, condition, key_at):
+        """Учесть одну пачку новых строк метрики. Возвращает число строк"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        start = self.watermark(cursor, metric)
+        # Строки моложе settle_lag еще могут «дописаться» ниже отметки;
+        # AUTOINCREMENT-ключ пользователей растет в порядке записи — ему ждать незачем
+        settled = now_ms() - self.settle_lag_ms
+        limit = f"AND {key} < {key_at(settled)}" if key_at else ''
+        
+        # Граница пачки — batch_size-я строка; строки с тем же ключом входят целиком
+        cursor.execute(f'''
+            SELECT {key} FROM {table}
+            WHERE {key} > ? {limit} AND {condition}
+            ORDER BY {key} LIMIT 1 OFFSET ?
+        ''', (start, self.batch_size - 1))
+        row = cursor.fetchone()
+        if row:
+            end = row[0]
+        elif key_at:
+            # Пачка неполная: все до границы учтено, дальше строк быть не может
+            end = key_at(settled) - 1
+        else:
+            cursor.execute(f'SELECT MAX({key}) FROM {table} WHERE {key} > ? {limit}', (start,))
+            end = cursor.fetchone()[0] or start
+        
+        if end <= start:
+            conn.close()
+            return 0
+        
+        # Почасовые счетчики старше срока хранения при первом проходе не нужны
+        hourly_since = now_ms() - HOURLY_RETENTION_DAYS * DAY_MS
+        for rollup, size, since in (('rollup_hourly', HOUR_MS, hourly_since), ('rollup_daily', DAY_MS, 0)):
+            cursor.execute(f'''
+                INSERT INTO {rollup} (metric, bucket, count)
+                SELECT ?, {ts_column} / {size} * {size}, COUNT(*) FROM {table}
+                WHERE {key} > ? AND {key} <= ? AND {condition} AND {ts_column} >= ?
+                GROUP BY 2
+                ON CONFLICT (metric, bucket) DO UPDATE SET count = count + excluded.count
+            ''', (metric, start, end, since))
+        cursor.execute(f'''
+            SELECT COUNT(*) FROM {table} WHERE {key} > ? AND {key} <= ? AND {condition}
+        ''', (start, end))
+        counted = cursor.fetchone()[0]
+        
+        cursor.execute('''
+            INSERT INTO rollup_watermarks (metric, watermark, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (metric) DO UPDATE
+            SET watermark = excluded.watermark, updated_at = excluded.updated_at
+        ''', (metric, end, now_ms()))
+        conn.commit()
+        conn.close()
+        return counted
+    
+    def run_once(self, max_batches=None):
+        """Догнать все метрики. Возвращает {метрика: учтено строк}"""
+        counted = {}
+        for metric, *source in METRICS:
+            counted[metric] = 0
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                count = self.aggregate_batch(metric, *source)
+                counted[metric] += count
+                batches += 1
+                if count < self.batch_size:
+                    break
+        self.prune()
+        return counted
+    
+    def prune(self):
+        """Удалить почасовые счетчики старше срока хранения"""
+        conn = self.db.get_connection()
+        conn.execute('DELETE FROM rollup_hourly WHERE bucket < ?',
+                     (now_ms() - HOURLY_RETENTION_DAYS * DAY_MS,))
+        conn.commit()
+        conn.close()
+    
+    # ─── Фоновый поток ─────────────────────────────────────────
+    
+    def loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.run_once()
+            except sqlite3.OperationalError:
+                # База занята — отметки не сдвинулись, догоним на следующем проходе
+                pass
+            self.stopped.wait(self.interval)
+    
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.loop, daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+    
+    # ─── Чтение рядов ──────────────────────────────────────────
+    
+    def series(self, metric, granularity='hour', points=48):
+        """Последние points значений ряда (пропуски — нули), от старых к новым"""
+        rollup, size = ('rollup_hourly', HOUR_MS) if granularity == 'hour' else ('rollup_daily', DAY_MS)
+        last = now_ms() // size * size
+        first = last - (points - 1) * size
+        
+        conn = self.db.get_connection()
+        cursor = conn.execute(f'''
+            SELECT bucket, count FROM {rollup}
+            WHERE metric = ? AND bucket >= ?
+        ''', (metric, first))
+        counts = dict(cursor.fetchall())
+        conn.close()
+        return [counts.get(first + i * size, 0) for i in range(points)]
+    
+    def updated_at(self):
+        """Когда агрегатор последний раз сдвигал отметки"""
+        conn = self.db.get_connection()
+        row = conn.execute('SELECT MIN(updated_at) FROM rollup_watermarks').fetchone()
+        conn.close()
+        return row[0]
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК АГРЕГАТОРА
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Агрегатор почасовой статистики Netta")
+    parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    parser.add_argument("--interval", type=int, default=60, help="пауза между проходами, с")
+    parser.add_argument("--once", action="store_true", help="один проход и выход")
+    args = parser.parse_args()
+    
+    aggregator = RollupAggregator(Database(args.db), args.interval)
+    while True:
+        started = time.perf_counter()
+        counted = aggregator.run_once()
+        print(f"📈 {format_timestamp(now_ms(), '%H:%M:%S')} учтено строк: "
+              f"{sum(counted.values())} за {time.perf_counter() - started:.2f} с")
+        if args.once:
+            break
+        time.sleep(args.interval)
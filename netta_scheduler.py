@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🕒 NETTA SCHEDULER - Отложенные посты             ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Neet.schedule кладет пост в scheduled_neets. Публикатор не опрашивает
+таблицу целиком: раз в load_every секунд он читает по частичному
+индексу (publish_at) только посты ближайших window секунд и
+раскладывает их по иерархическому колесу таймеров. Каждый тик колесо
+отдает наступившие посты, и они публикуются пачками через обычный
+Neet.create — с проверками, спамом, упоминаниями и событиями.
+
+Ровно один раз: отметка status = 'published' ставится условным
+UPDATE в той же транзакции, что и INSERT поста. Упавший процесс не
+оставит поста без отметки, а два публикатора не опубликуют один пост
+дважды. После перезапуска просроченные посты загружаются первым же
+проходом и публикуются сразу.
+
+Пост, запланированный другим процессом меньше чем за load_every
+секунд до публикации, выйдет с опозданием до load_every секунд.
+    
+    python netta_scheduler.py --db netta.db
+"""
+
+import sqlite3
+import threading
+import time
+
+from netta_models import PROFILE_COLUMNS, profile_row_factory
+from netta_time import now_ms, format_timestamp
+
+# ═══════════════════════════════════════════════════════════════
+# 🕒 ОТЛОЖЕННЫЕ ПОСТЫ
+# ═══════════════════════════════════════════════════════════════
+
+# Не дальше чем на год вперед и не больше 1000 ожидающих постов у пользователя
+MAX_SCHEDULE_DAYS = 365
+MAX_SCHEDULED_PER_USER = 1000
+
+
+def create_scheduled_tables(cursor):
+    """Отложенные посты и частичный индекс по времени публикации"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scheduled_neets (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            publish_at INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'scheduled',
+            neet_id INTEGER,
+            error TEXT,
+            created_at INTEGER NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    # Опубликованные строки из индекса выпадают — он растет только с очередью
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_scheduled_due ON scheduled_neets (publish_at, id)
+        WHERE status = 'scheduled'
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_scheduled_user ON scheduled_neets (user_id, publish_at)
+        WHERE status = 'scheduled'
+    ''')
+
+
+class TimerWheel:
+    """Иерархическое колесо таймеров: levels колес по slots ячеек.
+    
+    Ячейка уровня 0 — один тик, уровня k — slots**k тиков. Далекий
+    таймер лежит на верхнем уровне и спускается вниз, когда подходит
+    его ячейка; добавление и выдача — O(1) на таймер.
+    """
+    
+    def __init__(self, start_ms, tick_ms=1000, slots=64, levels=3):
+        self.tick_ms = tick_ms
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.current = start_ms // tick_ms      # следующий необработанный тик
+        self.overdue = []
+        self.keys = set()
+    
+    @property
+    def horizon_ms(self):
+        return self.tick_ms * self.slots ** self.levels
+    
+    def add(self, key, due_ms):
+        """Добавить таймер (повторный ключ не добавляется). Возвращает True, если добавлен"""
+        if key in self.keys:
+            return False
+        # Тик округляется вверх: таймер не срабатывает раньше срока
+        tick = -(-due_ms // self.tick_ms)
+        if tick - self.current >= self.slots ** self.levels:
+            raise ValueError("таймер дальше горизонта колеса")
+        self.keys.add(key)
+        if tick < self.current:
+            self.overdue.append(key)
+        else:
+            self.place(tick, key)
+        return True
+    
+    def place(self, tick, key):
+        delta = tick - self.current
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                slot = tick // self.slots ** level % self.slots
+                self.wheels[level][slot].append((tick, key))
+                return
+    
+    def cascade(self, level):
+        """Спустить таймеры ячейки уровня level, которая начинается с текущего тика"""
+        if level >= self.levels:
+            return
+        span = self.slots ** level
+        if self.current // span % self.slots == 0:
+            self.cascade(level + 1)
+        slot = self.current // span % self.slots
+        timers, self.wheels[level][slot] = self.wheels[level][slot], []
+        for tick, key in timers:
+            self.place(tick, key)
+    
+    def advance(self, now_ms):
+        """Ключи всех таймеров, срок которых наступил к now_ms"""
+        due, self.overdue = self.overdue, []
+        target = now_ms // self.tick_ms
+        while self.current <= target:
+            if self.current % self.slots == 0:
+                self.cascade(1)
+            slot = self.current % self.slots
+            timers, self.wheels[0][slot] = self.wheels[0][slot], []
+            due.extend(key for _, key in timers)
+            self.current += 1
+        self.keys.difference_update(due)
+        return due
+    
+    def __len__(self):
+        return len(self.keys)
+
+
+class ScheduledPublisher:
+    def __init__(self, db, window=600, load_every=10, tick=1.0, batch_size=100):
+        from Netta import User, Neet
+        
+        self.db = db
+        # Сколько секунд вперед держать в колесе и как часто дочитывать
+        self.window_ms = int(window * 1000)
+        self.load_every = load_every
+        self.tick = tick
+        self.batch_size = batch_size
+        self.wheel = TimerWheel(now_ms(), int(tick * 1000))
+        if self.window_ms >= self.wheel.horizon_ms:
+            raise ValueError("окно загрузки больше горизонта колеса")
+        # Публикация от имени автора без ограничения частоты: Neet.schedule
+        # уже списал токен create с автора при планировании
+        self.user = User(db)
+        self.neet = Neet(db, self.user)
+        self.loaded_at = None
+        self.stats = {'published': 0, 'failed': 0, 'skipped': 0, 'loaded': 0}
+        self.stopped = threading.Event()
+        self.thread = None
+    
+    def load(self):
+        """Разложить по колесу посты ближайших window секунд (и просроченные)"""
+        conn = self.db.get_connection()
+        cursor = conn.execute('''
+            SELECT id, publish_at FROM scheduled_neets
+            WHERE status = 'scheduled' AND publish_at < ?
+            ORDER BY publish_at, id
+        ''', (now_ms() + self.window_ms,))
+        for scheduled_id, publish_at in cursor:
+            if self.wheel.add(scheduled_id, publish_at):
+                self.stats['loaded'] += 1
+        conn.close()
+        self.loaded_at = time.monotonic()
+    
+    def publish(self, scheduled_ids):
+        """Опубликовать пачку наступивших постов через Neet.create"""
+        placeholders = ','.join('?' * len(scheduled_ids))
+        conn = self.db.get_connection()
+        rows = conn.execute(f'''
+            SELECT id, user_id, content FROM scheduled_neets
+            WHERE id IN ({placeholders}) AND status = 'scheduled'
+            ORDER BY publish_at, id
+        ''', scheduled_ids).fetchall()
+        cursor = conn.cursor()
+        cursor.row_factory = profile_row_factory
+        cursor.execute(f'''
+            SELECT {PROFILE_COLUMNS} FROM users
+            WHERE id IN (SELECT user_id FROM scheduled_neets WHERE id IN ({placeholders}))
+        ''', scheduled_ids)
+        authors = {profile['id']: profile for profile in cursor.fetchall()}
+        conn.close()
+        
+        self.stats['skipped'] += len(scheduled_ids) - len(rows)
+        failed = []
+        for scheduled_id, user_id, content in rows:
+            self.user.current_user = authors.get(user_id)
+            success, message = self.neet.create(content, scheduled_id=scheduled_id)
+            if success:
+                self.stats['published'] += 1
+            else:
+                failed.append((message, scheduled_id))
+        self.user.current_user = None
+        
+        # Не прошедший проверки пост больше не пробуется; пост, который
+        # успел опубликовать другой публикатор, условие status не тронет
+        if failed:
+            conn = self.db.get_connection()
+            cursor = conn.executemany('''
+                UPDATE scheduled_neets SET status = 'failed', error = ?
+                WHERE id = ? AND status = 'scheduled'
+            ''', failed)
+            self.stats['failed'] += cursor.rowcount
+            self.stats['skipped'] += len(failed) - cursor.rowcount
+            conn.commit()
+            conn.close()
+    
+    def run_once(self):
+        """Дочитать окно (если пора) и опубликовать наступившие посты"""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at >= self.load_every:
+            self.load()
+        due = self.wheel.advance(now_ms())
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            try:
+                self.publish(batch)
+            except sqlite3.OperationalError:
+                # База занята — вернем пачку и все, что после нее, в колесо на следующий тик
+                for scheduled_id in due[start:]:
+                    self.wheel.add(scheduled_id, 0)
+                break
+        return len(due)
+    
+    # ─── Фоновый поток ─────────────────────────────────────────
+    
+    def loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.run_once()
+            except sqlite3.OperationalError:
+                pass
+            self.stopped.wait(self.tick)
+    
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.loop, daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК ПУБЛИКАТОРА
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    from Netta import Database
+    
+    parser = argparse.ArgumentParser(description="Публикатор отложенных постов Netta")
+    parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    parser.add_argument("--window", type=int, default=600, help="на сколько секунд вперед загружать")
+    parser.add_argument("--load-every", type=int, default=10, help="как часто дочитывать окно, с")
+    args = parser.parse_args()
+    
+    publisher = ScheduledPublisher(Database(args.db), args.window, args.load_every)
+    reported = dict(publisher.stats)
+    while True:
+        publisher.run_once()
+        if publisher.stats != reported:
+            reported = dict(publisher.stats)
+            print(f"🕒 {format_timestamp(now_ms(), '%H:%M:%S')} опубликовано: {reported['published']}, "
+                  f"отклонено: {reported['failed']}, в колесе: {len(publisher.wheel)}")
+        time.sleep(publisher.tick)
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🏭 NETTA SERVER - Один писатель, много читателей  ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+SQLite пишет в один поток, а потоки Python делят GIL — поэтому запись
+и чтение разнесены по процессам:
+
+• процесс записи владеет всеми изменениями (методы User, Neet и
+  AdminDashboard). Он берет из очереди все накопившиеся команды,
+  выполняет каждую в своей точке сохранения (SAVEPOINT) и фиксирует
+  пачку одним COMMIT — одна синхронизация диска на пачку. Кеш ленты,
+  фильтр имен, индекс спама и удаление файлов обновляются только
+  после COMMIT и только для неоткаченных команд;
+• читатели (по умолчанию по одному на оставшиеся ядра) отдают ленту,
+  профили, поиск и вход через свои соединения только для чтения
+  (mode=ro) и берут запросы из общей очереди.
+
+База переводится в режим WAL, чтобы читатели не ждали запись. Лента
+читателей кешируется на ttl = 1 с и может отставать от записи на это
+время. Архив постов в этом режиме не подключается (ATTACH нельзя
+выполнить внутри транзакции пачки).
+
+Ограничение частоты: изменения считает процесс записи, регистрации —
+по ключу клиента (client_id в write). Попытки входа считает каждый
+читатель в своих корзинах, поэтому лимит входа делится между
+читателями (но не меньше одной попытки на читателя) — в сумме
+получается заданный лимит.
+
+Каждый процесс раз в секунду присылает свою статистику (операций,
+доля занятого времени, размеры пачек):
+    
+    python netta_server.py bench --db netta.db --readers 3 --clients 32
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+
+from netta_cache import FeedCache
+from netta_models import PROFILE_COLUMNS, profile_row_factory
+from netta_ratelimit import DEFAULT_LIMITS, RateLimiter, UNLIMITED
+
+# ═══════════════════════════════════════════════════════════════
+# ✍️ ПРОЦЕСС ЗАПИСИ
+# ═══════════════════════════════════════════════════════════════
+
+# Операция → (объект процесса записи, метод, от чьего имени)
+WRITE_OPS = {
+    'register': ('user', 'register', None),
+    'update_profile': ('user', 'update_profile', 'user'),
+    'request_verification': ('user', 'request_verification', 'user'),
+    'create': ('neet', 'create', 'user'),
+    'schedule': ('neet', 'schedule', 'user'),
+    'like': ('neet', 'like', 'user'),
+    'unlike': ('neet', 'unlike', 'user'),
+    'decide_verification': ('admin', 'decide_verification', 'admin'),
+    'set_admin': ('admin', 'set_admin', 'admin'),
+    'revoke_user_verification': ('admin', 'revoke_user_verification', 'admin'),
+    'remove_user': ('admin', 'remove_user', 'admin'),
+    'remove_neet': ('admin', 'remove_neet', 'admin'),
+}
+
+READ_OPS = ('login', 'feed', 'user_neets', 'profile', 'search', 'media', 'liked_by')
+
+STATS_INTERVAL = 1.0
+
+
+class AfterCommit:
+    """Побочные действия команд (кеши, фильтры имен, удаление файлов): методы
+    пишут их «после commit», а commit команды в пачке — еще не COMMIT.
+    Действия копятся по командам и выполняются только после COMMIT пачки;
+    действия откаченных команд отбрасываются"""
+    
+    def __init__(self):
+        self.command = []
+        self.batch = []
+    
+    def defer(self, method, args, kwargs):
+        self.command.append((method, args, kwargs))
+    
+    def keep(self):
+        """Команда выполнена — ее действия ждут COMMIT пачки"""
+        self.batch += self.command
+        self.command = []
+    
+    def drop(self):
+        """Команда откачена — ее действия не нужны"""
+        self.command = []
+    
+    def run(self):
+        """Пачка зафиксирована. Возвращает число упавших действий"""
+        actions, self.batch = self.batch, []
+        failed = 0
+        for method, args, kwargs in actions:
+            try:
+                method(*args, **kwargs)
+            except Exception:
+                failed += 1
+        return failed
+    
+    def discard(self):
+        self.command = []
+        self.batch = []
+
+
+class Deferred:
+    """Объект, у которого методы names откладываются до COMMIT, остальные — как есть"""
+    
+    def __init__(self, target, names, after_commit):
+        self.target = target
+        self.names = names
+        self.after_commit = after_commit
+    
+    def __getattr__(self, name):
+        attribute = getattr(self.target, name)
+        if name not in self.names:
+            return attribute
+        return lambda *args, **kwargs: self.after_commit.defer(attribute, args, kwargs)
+
+
+class BatchConnection:
+    """Соединение команды внутри пачки: commit откладывается до конца пачки,
+    rollback откатывает только текущую команду, close ничего не закрывает"""
+    
+    def __init__(self, conn, after_commit):
+        self.conn = conn
+        self.after_commit = after_commit
+    
+    def get_connection(self):
+        return self
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        self.conn.execute('ROLLBACK TO command')
+        self.after_commit.drop()
+    
+    def close(self):
+        pass
+    
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+class ProcessStats:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.ops = 0
+        self.errors = 0
+        self.batches = 0
+        self.busy = 0.0
+    
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'pid': os.getpid(),
+            'ops': self.ops,
+            'errors': self.errors,
+            'batches': self.batches,
+            'ops_per_sec': self.ops / elapsed if elapsed else 0.0,
+            'busy': self.busy / elapsed if elapsed else 0.0,
+            'avg_batch': self.ops / self.batches if self.batches else 0.0,
+        }
+    
+    def report(self, responses, force=False):
+        now = time.perf_counter()
+        if force or now - self.reported >= STATS_INTERVAL:
+            self.reported = now
+            responses.put(('stats', self.name, self.snapshot()))
+
+
+def load_profile(conn, user_id):
+    cursor = conn.cursor()
+    cursor.row_factory = profile_row_factory
+    cursor.execute(f'SELECT {PROFILE_COLUMNS} FROM users WHERE id = ?', (user_id,))
+    return cursor.fetchone()
+
+
+def writer_main(db_name, media_dir, requests, responses, max_batch, rate_limits):
+    from Netta import Database, User, Neet
+    from netta_dashboard import AdminDashboard
+    
+    db = Database(db_name, media_dir=media_dir, rate_limits=rate_limits)
+    admin = AdminDashboard(db_name, feed_cache=db.feed_cache, media_dir=media_dir)
+    # Журнал действий пишется в транзакции пачки, а не своим потоком
+    admin.audit.close()
+    
+    # Кеш ленты, индекс спама, фильтр имен и удаление файлов — только после COMMIT
+    after_commit = AfterCommit()
+    db.feed_cache = Deferred(db.feed_cache, ('on_create', 'on_like', 'invalidate'), after_commit)
+    db.spam = Deferred(db.spam, ('add',), after_commit)
+    db.names = Deferred(db.names, ('add', 'remove', 'save'), after_commit)
+    admin.feed_cache = db.feed_cache
+    admin.names = db.names
+    admin.media = Deferred(admin.media, ('collect',), after_commit)
+    
+    conn = sqlite3.connect(db_name, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    batch_conn = BatchConnection(conn, after_commit)
+    db.get_connection = batch_conn.get_connection
+    admin.get_connection = batch_conn.get_connection
+    
+    targets = {'user': User(db, db.limiter), 'admin': admin}
+    targets['neet'] = Neet(db, targets['user'])
+    stats = ProcessStats('writer')
+    
+    def execute(op, actor_id, client_id, args, kwargs):
+        target, method, actor = WRITE_OPS[op]
+        # Ключ лимита регистраций — клиент, приславший команду
+        targets['user'].client_id = client_id
+        if actor:
+            profile = load_profile(conn, actor_id) if actor_id is not None else None
+            if actor == 'admin' and not (profile and profile['is_admin']):
+                return False, "❌ Недостаточно прав!"
+            if actor == 'admin':
+                admin.admin_user = profile
+            else:
+                targets['user'].current_user = profile
+        return getattr(targets[target], method)(*args, **kwargs)
+    
+    running = True
+    while running:
+        try:
+            command = requests.get(timeout=STATS_INTERVAL)
+        except queue.Empty:
+            stats.report(responses)
+            continue
+        if command is None:
+            break
+        
+        # Все, что накопилось в очереди, — в одну пачку
+        batch = [command]
+        while len(batch) < max_batch:
+            try:
+                command = requests.get_nowait()
+            except queue.Empty:
+                break
+            if command is None:
+                running = False
+                break
+            batch.append(command)
+        
+        started = time.perf_counter()
+        replies = []
+        conn.execute('BEGIN IMMEDIATE')
+        for request_id, op, actor_id, client_id, args, kwargs in batch:
+            conn.execute('SAVEPOINT command')
+            try:
+                result = execute(op, actor_id, client_id, args, kwargs)
+                after_commit.keep()
+            except Exception as e:
+                conn.execute('ROLLBACK TO command')
+                after_commit.drop()
+                result = (False, f"❌ Ошибка: {e}")
+                stats.errors += 1
+            conn.execute('RELEASE command')
+            replies.append((request_id, result))
+        
+        try:
+            admin.audit.flush()
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            conn.execute('ROLLBACK')
+            after_commit.discard()
+            replies = [(request_id, (False, f"❌ Ошибка записи: {e}")) for request_id, _ in replies]
+            stats.errors += len(replies)
+        else:
+            stats.errors += after_commit.run()
+        
+        # Ответы — только после COMMIT: клиент не увидит неустойчивую запись
+        for request_id, result in replies:
+            responses.put(('reply', request_id, result))
+        
+        stats.ops += len(batch)
+        stats.batches += 1
+        stats.busy += time.perf_counter() - started
+        stats.report(responses)
+    
+    stats.report(responses, force=True)
+    conn.close()
+
+# ═══════════════════════════════════════════════════════════════
+# 📖 ПРОЦЕССЫ ЧТЕНИЯ
+# ═══════════════════════════════════════════════════════════════
+
+def reader_limits(rate_limits, readers):
+    """Лимит входа одного читателя: доля общего лимита (запросы идут из общей очереди)"""
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(rate_limits or {})
+    capacity, rate = limits['login']
+    limits['login'] = (max(1, capacity / readers), rate / readers)
+    return limits
+
+
+class ReadOnlyDatabase:
+    """База для читателей: соединения только для чтения, без создания таблиц"""
+    
+    def __init__(self, db_name, rate_limits=None):
+        self.uri = f"file:{pathname2url(os.path.abspath(db_name))}?mode=ro"
+        self.feed_cache = FeedCache(ttl=1.0)
+        self.limiter = RateLimiter(rate_limits)
+        self.archive = None
+    
+    def get_connection(self):
+        return sqlite3.connect(self.uri, uri=True)
+
+
+def search_users(db, prefix, limit=20):
+    """Пользователи, чей username начинается с prefix (диапазон по уникальному индексу)"""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = profile_row_factory
+    cursor.execute(f'''
+        SELECT {PROFILE_COLUMNS} FROM users
+        WHERE username >= ? AND username < ?
+        ORDER BY username
+        LIMIT ?
+    ''', (prefix, prefix + '\U0010ffff', limit))
+    users = cursor.fetchall()
+    conn.close()
+    return users
+
+
+def reader_main(name, db_name, requests, responses, rate_limits):
+    from Netta import User, Neet
+    
+    db = ReadOnlyDatabase(db_name, rate_limits)
+    user = User(db, db.limiter)
+    neet = Neet(db, user)
+    stats = ProcessStats(name)
+    
+    def execute(op, args):
+        if op == 'login':
+            success, message = user.login(*args)
+            profile, user.current_user = user.current_user, None
+            return success, message, profile
+        if op == 'feed':
+            return neet.get_feed(*args)
+        if op == 'user_neets':
+            return neet.get_user_neets(*args)
+        if op == 'profile':
+            return user.get_profile(*args)
+        if op == 'search':
+            return search_users(db, *args)
+        if op == 'media':
+            return neet.get_media(*args)
+        if op == 'liked_by':
+            # Лайки меняет процесс записи — запомненные ответы здесь устаревают
+            neet.liked_user_id = None
+            return neet.liked_by(*args)
+        raise ValueError(f"неизвестная операция {op}")
+    
+    while True:
+        try:
+            command = requests.get(timeout=STATS_INTERVAL)
+        except queue.Empty:
+            stats.report(responses)
+            continue
+        if command is None:
+            break
+        
+        request_id, op, args = command
+        started = time.perf_counter()
+        try:
+            result = execute(op, args)
+        except Exception as e:
+            result = e
+            stats.errors += 1
+        responses.put(('reply', request_id, result))
+        
+        stats.ops += 1
+        stats.busy += time.perf_counter() - started
+        stats.report(responses)
+    
+    stats.report(responses, force=True)
+
+# ═══════════════════════════════════════════════════════════════
+# 🏭 СЕРВЕР
+# ═══════════════════════════════════════════════════════════════
+
+class NettaServer:
+    def __init__(self, db_name="netta.db", readers=None, media_dir=None, max_batch=200,
+                 rate_limits=None):
+        self.db_name = db_name
+        self.rate_limits = rate_limits
+        self.readers = readers or max(1, (os.cpu_count() or 2) - 1)
+        self.media_dir = media_dir
+        self.max_batch = max_batch
+        self.write_queue = multiprocessing.Queue()
+        self.read_queue = multiprocessing.Queue()
+        self.responses = multiprocessing.Queue()
+        self.processes = []
+        self.pending = {}                 # id запроса → [Event, результат]
+        self.process_stats = {}           # имя процесса → последняя статистика
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.dispatcher = None
+    
+    def start(self):
+        # Таблицы создаются один раз до старта процессов
+        from Netta import Database
+        Database(self.db_name)
+        
+        self.processes.append(multiprocessing.Process(
+            target=writer_main, name='writer',
+            args=(self.db_name, self.media_dir, self.write_queue, self.responses, self.max_batch,
+                  self.rate_limits)))
+        for index in range(self.readers):
+            self.processes.append(multiprocessing.Process(
+                target=reader_main, name=f'reader-{index + 1}',
+                args=(f'reader-{index + 1}', self.db_name, self.read_queue, self.responses,
+                      reader_limits(self.rate_limits, self.readers))))
+        for process in self.processes:
+            process.start()
+        
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.dispatcher.start()
+    
+    def stop(self):
+        """Дождаться выполнения принятых команд и остановить процессы"""
+        self.write_queue.put(None)
+        for _ in range(self.readers):
+            self.read_queue.put(None)
+        for process in self.processes:
+            process.join()
+        self.responses.put(None)
+        self.dispatcher.join()
+        self.processes = []
+    
+    def dispatch(self):
+        """Раздать ответы ждущим запросам, запомнить статистику процессов"""
+        while True:
+            message = self.responses.get()
+            if message is None:
+                break
+            kind, key, value = message
+            if kind == 'stats':
+                self.process_stats[key] = value
+                continue
+            with self.lock:
+                waiter = self.pending.pop(key, None)
+            if waiter:
+                waiter[1] = value
+                waiter[0].set()
+    
+    def call(self, requests, make_command):
+        request_id = next(self.ids)
+        waiter = [threading.Event(), None]
+        with self.lock:
+            self.pending[request_id] = waiter
+        requests.put(make_command(request_id))
+        waiter[0].wait()
+        if isinstance(waiter[1], Exception):
+            raise waiter[1]
+        return waiter[1]
+    
+    def write(self, op, actor_id=None, *args, client_id='local', **kwargs):
+        """Изменение от имени actor_id (client_id — ключ лимита регистраций, например адрес
+        клиента). Возвращает (успех, сообщение) после COMMIT"""
+        if op not in WRITE_OPS:
+            raise ValueError(f"неизвестная операция {op}")
+        return self.call(self.write_queue,
+                         lambda request_id: (request_id, op, actor_id, client_id, args, kwargs))
+    
+    def read(self, op, *args):
+        if op not in READ_OPS:
+            raise ValueError(f"неизвестная операция {op}")
+        return self.call(self.read_queue, lambda request_id: (request_id, op, args))
+    
+    def stats(self):
+        return dict(sorted(self.process_stats.items()))
+
+# ═══════════════════════════════════════════════════════════════
+# 📊 ЗАМЕР
+# ═══════════════════════════════════════════════════════════════
+
+def bench(server, clients, seconds, write_share, users=200):
+    """Смешанная нагрузка из потоков-клиентов: чтение ленты, профилей и поиска, посты и лайки"""
+    import random
+    import uuid
+    from concurrent.futures import ThreadPoolExecutor
+    
+    prefix = uuid.uuid4().hex[:6]
+    user_ids = []
+    for i in range(users):
+        server.write('register', None, f'bench_{prefix}_{i}', f'bench_{prefix}_{i}@load.test', 'bench-password',
+                     client_id=f'bench-{i}')
+        user_ids.append(server.read('profile', f'bench_{prefix}_{i}')['id'])
+    
+    deadline = time.perf_counter() + seconds
+    
+    def client(_):
+        done = 0
+        while time.perf_counter() < deadline:
+            actor_id = random.choice(user_ids)
+            if random.random() < write_share:
+                if random.random() < 0.5:
+                    words = ' '.join(uuid.uuid4().hex[:random.randint(3, 8)] for _ in range(8))
+                    server.write('create', actor_id, words)
+                else:
+                    feed = server.read('feed')
+                    if feed:
+                        server.write('like', actor_id, random.choice(feed)['id'])
+            else:
+                choice = random.random()
+                if choice < 0.5:
+                    server.read('feed')
+                elif choice < 0.8:
+                    server.read('profile', f'bench_{prefix}_{random.randrange(users)}')
+                else:
+                    server.read('search', f'bench_{prefix}_{random.randrange(10)}')
+            done += 1
+        return done
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        total = sum(pool.map(client, range(clients)))
+    return total, time.perf_counter() - started
+
+
+def print_stats(stats):
+    print(f"   {'процесс':<12}{'pid':>8}{'операций':>10}{'оп/с':>10}{'занят':>8}{'пачка':>8}")
+    for name, snapshot in stats.items():
+        batch = f"{snapshot['avg_batch']:.1f}" if name == 'writer' else ''
+        print(f"   {name:<12}{snapshot['pid']:>8}{snapshot['ops']:>10}"
+              f"{snapshot['ops_per_sec']:>10.1f}{snapshot['busy']:>8.0%}{batch:>8}")
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ЗАПУСК
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Netta: процесс записи и пул читателей")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    bench_parser = commands.add_parser('bench', help='смешанная нагрузка и статистика процессов')
+    bench_parser.add_argument("--db", default="netta.db", help="файл базы данных")
+    bench_parser.add_argument("--readers", type=int, help="число читателей (по умолчанию ядер - 1)")
+    bench_parser.add_argument("--clients", type=int, default=32, help="потоков-клиентов")
+    bench_parser.add_argument("--seconds", type=float, default=10, help="длительность")
+    bench_parser.add_argument("--write-share", type=float, default=0.1, help="доля изменений")
+    bench_parser.add_argument("--rate-limits", action="store_true", help="оставить ограничение частоты")
+    args = parser.parse_args()
+    
+    server = NettaServer(args.db, args.readers, media_dir=os.environ.get("NETTA_MEDIA_DIR"),
+                         rate_limits=None if args.rate_limits else UNLIMITED)
+    server.start()
+    total, elapsed = bench(server, args.clients, args.seconds, args.write_share)
+    server.stop()
+    
+    print(f"🏭 Читателей: {server.readers}, ядер: {os.cpu_count()}")
+    print(f"   {total} запросов за {elapsed:.1f} с — {total / elapsed:.1f} запросов/с\n")
+    print_stats(server.stats())
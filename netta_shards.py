@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🧩 NETTA SHARDS - Шардирование базы               ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Пользователи вместе с их постами, лайками на эти посты и заявками
+на верификацию распределяются по N файлам SQLite по хешу id.
+Поиск по username/email идет через общий каталог пользователей,
+глобальная лента собирается слиянием отсортированных потоков шардов.
+"""
+
+import hashlib
+import heapq
+import sqlite3
+import threading
+import zlib
+from itertools import islice
+
+from Netta import Database
+from netta_ids import id_node, id_timestamp
+from netta_events import (emit, USER_REGISTERED, NEET_CREATED, NEET_LIKED, NEET_UNLIKED,
+                          VERIFICATION_REQUESTED)
+from netta_models import (NeetView, NEET_COLUMNS, PROFILE_COLUMNS, neet_row_factory,
+                          profile_row_factory)
+
+# ═══════════════════════════════════════════════════════════════
+# 🧩 МАРШРУТИЗАТОР ШАРДОВ
+# ═══════════════════════════════════════════════════════════════
+
+# id постов и лайков выдает генератор шарда (узел = номер шарда), а id заявок
+# на верификацию в каждом шарде начинаются со своего смещения — так все id
+# уникальны во всех шардах
+SHARD_ID_BITS = 40
+SHARDED_TABLES = ('verification_requests',)
+
+class ShardRouter:
+    def __init__(self, shard_count=4, base_name="netta"):
+        self.shard_count = shard_count
+        self.base_name = base_name
+        self.directory_name = f"{base_name}_directory.db"
+        self.shards = [Database(self.shard_path(i), node_id=i) for i in range(shard_count)]
+        self._user_locks = {}
+        self._locks_guard = threading.Lock()
+        self.init_directory()
+        for i, shard in enumerate(self.shards):
+            self.init_shard(i, shard)
+    
+    def shard_path(self, index):
+        return f"{self.base_name}_shard{index}.db"
+    
+    def init_directory(self):
+        """Общий каталог: username/email → id и номер шарда"""
+        conn = self.get_directory_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_directory (
+                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                shard INTEGER NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+    
+    def init_shard(self, index, shard):
+        """Задать начальное смещение id для таблиц шарда"""
+        conn = shard.get_connection()
+        for table in SHARDED_TABLES:
+            conn.execute('''
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT ?, ? WHERE NOT EXISTS (
+                    SELECT 1 FROM sqlite_sequence WHERE name = ?
+                )
+            ''', (table, index << SHARD_ID_BITS, table))
+        conn.commit()
+        conn.close()
+    
+    def get_directory_connection(self):
+        return sqlite3.connect(self.directory_name)
+    
+    def home_shard(self, user_id):
+        """Шард, на котором пользователь должен жить при текущем числе шардов"""
+        return zlib.crc32(str(user_id).encode()) % self.shard_count
+    
+    def user_lock(self, user_id):
+        """Блокировка пользователя на время переноса между шардами"""
+        with self._locks_guard:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+    
+    # ─── Каталог пользователей ─────────────────────────────────
+    
+    def lookup(self, username=None, email=None, user_id=None):
+        """Найти (user_id, shard) через каталог"""
+        conn = self.get_directory_connection()
+        if user_id is not None:
+            row = conn.execute(
+                'SELECT user_id, shard FROM user_directory WHERE user_id = ?', (user_id,)
+            ).fetchone()
+        elif username is not None:
+            row = conn.execute(
+                'SELECT user_id, shard FROM user_directory WHERE username = ?', (username,)
+            ).fetchone()
+        else:
+            row = conn.execute(
+                'SELECT user_id, shard FROM user_directory WHERE email = ?', (email,)
+            ).fetchone()
+        conn.close()
+        return row
+    
+    def shard_for_user(self, user_id):
+        row = self.lookup(user_id=user_id)
+        return self.shards[row[1]] if row else None
+    
+    # ─── Пользователи ──────────────────────────────────────────
+    
+    def hash_password(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+    
+    def register(self, username, email, password, display_name=None):
+        """Регистрация: id выдает каталог, строка пользователя — в шард"""
+        conn = self.get_directory_connection()
+        try:
+            cursor = conn.execute('''
+                INSERT INTO user_directory (username, email, shard) VALUES (?, ?, -1)
+            ''', (username, email))
+            user_id = cursor.lastrowid
+            shard_index = self.home_shard(user_id)
+            conn.execute('UPDATE user_directory SET shard = ? WHERE user_id = ?',
+                         (shard_index, user_id))
+        except sqlite3.IntegrityError as e:
+            conn.close()
+            if 'username' in str(e):
+                return False, "❌ Это имя пользователя уже занято!"
+            elif 'email' in str(e):
+                return False, "❌ Этот email уже зарегистрирован!"
+            return False, f"❌ Ошибка регистрации: {e}"
+        
+        shard_conn = self.shards[shard_index].get_connection()
+        try:
+            shard_conn.execute('''
+                INSERT INTO users (id, username, email, password_hash, display_name)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, username, email, self.hash_password(password),
+                  display_name or username))
+            # Журнал событий у каждого шарда свой
+            emit(shard_conn.cursor(), USER_REGISTERED, user_id, user_id,
+                 username=username, display_name=display_name or username)
+            shard_conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            conn.close()
+            shard_conn.close()
+            return False, f"❌ Ошибка регистрации: {e}"
+        
+        conn.commit()
+        conn.close()
+        shard_conn.close()
+        return True, "✅ Регистрация успешна! Добро пожаловать в Netta!"
+    
+    def login(self, username, password):
+        """Проверка пароля на шарде пользователя. Возвращает профиль или None"""
+        row = self.lookup(username=username)
+        if not row:
+            return None
+        
+        conn = self.shards[row[1]].get_connection()
+        conn.row_factory = profile_row_factory
+        user = conn.execute(f'''
+            SELECT {PROFILE_COLUMNS} FROM users WHERE id = ? AND password_hash = ?
+        ''', (row[0], self.hash_password(password))).fetchone()
+        conn.close()
+        return user
+    
+    def get_profile(self, username):
+        row = self.lookup(username=username)
+        if not row:
+            return None
+        
+        conn = self.shards[row[1]].get_connection()
+        conn.row_factory = profile_row_factory
+        user = conn.execute(f'SELECT {PROFILE_COLUMNS} FROM users WHERE id = ?', (row[0],)).fetchone()
+        conn.close()
+        return user
+    
+    def request_verification(self, user_id, reason):
+        with self.user_lock(user_id):
+            conn = self.shard_for_user(user_id).get_connection()
+            active = conn.execute('''
+                SELECT 1 FROM verification_requests
+                WHERE user_id = ? AND status IN ('pending', 'claimed')
+            ''', (user_id,)).fetchone()
+            if active:
+                conn.close()
+                return False, "❌ У вас уже есть активная заявка на верификацию!"
+            
+            cursor = conn.execute('''
+                INSERT INTO verification_requests (user_id, reason) VALUES (?, ?)
+            ''', (user_id, reason))
+            emit(cursor, VERIFICATION_REQUESTED, cursor.lastrowid, user_id)
+            conn.commit()
+            conn.close()
+        return True, "✅ Заявка на верификацию отправлена!"
+    
+    # ─── Посты ─────────────────────────────────────────────────
+    
+    def create_neet(self, user_id, content):
+        if len(content) > 280:
+            return False, "❌ Пост не может быть длиннее 280 символов!"
+        
+        if not content.strip():
+            return False, "❌ Пост не может быть пустым!"
+        
+        with self.user_lock(user_id):
+            shard = self.shard_for_user(user_id)
+            conn = shard.get_connection()
+            neet_id = shard.ids.next_id()
+            cursor = conn.execute('''
+                INSERT INTO neets (id, user_id, content, created_at) VALUES (?, ?, ?, ?)
+            ''', (neet_id, user_id, content, id_timestamp(neet_id)))
+            emit(cursor, NEET_CREATED, neet_id, user_id, content=content, attachments=[])
+            conn.commit()
+            conn.close()
+        return True, "✅ Neet опубликован!"
+    
+    def find_neet_shard(self, neet_id):
+        """Шард поста: сначала тот, чей генератор выдал id, затем остальные"""
+        origin = id_node(neet_id)
+        order = [origin] if 0 <= origin < self.shard_count else []
+        order += [i for i in range(self.shard_count) if i != origin]
+        
+        for index in order:
+            conn = self.shards[index].get_connection()
+            row = conn.execute('SELECT user_id FROM neets WHERE id = ?', (neet_id,)).fetchone()
+            conn.close()
+            if row:
+                return index, row[0]
+        return None
+    
+    def like(self, user_id, neet_id):
+        """Лайк хранится на шарде поста — рядом со счетчиком likes_count"""
+        found = self.find_neet_shard(neet_id)
+        if not found:
+            return False, "❌ Neet не найден!"
+        
+        index, author_id = found
+        with self.user_lock(author_id):
+            conn = self.shards[index].get_connection()
+            try:
+                like_id = self.shards[index].ids.next_id()
+                conn.execute('''
+                    INSERT INTO likes (id, user_id, neet_id, created_at) VALUES (?, ?, ?, ?)
+                ''', (like_id, user_id, neet_id, id_timestamp(like_id)))
+                cursor = conn.execute('''
+                    UPDATE neets SET likes_count = likes_count + 1 WHERE id = ?
+                ''', (neet_id,))
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    conn.close()
+                    return False, "❌ Neet не найден!"
+                emit(cursor, NEET_LIKED, neet_id, user_id, author_id=author_id)
+                conn.commit()
+            except sqlite3.IntegrityError:
+                conn.close()
+                return False, "❌ Вы уже лайкнули этот Neet!"
+            conn.close()
+        return True, "❤️ Вам понравился этот Neet!"
+    
+    def unlike(self, user_id, neet_id):
+        """Убрать лайк на шарде поста"""
+        found = self.find_neet_shard(neet_id)
+        if not found:
+            return False, "❌ Neet не найден!"
+        
+        index, author_id = found
+        with self.user_lock(author_id):
+            conn = self.shards[index].get_connection()
+            cursor = conn.execute('''
+                DELETE FROM likes WHERE user_id = ? AND neet_id = ?
+            ''', (user_id, neet_id))
+            if cursor.rowcount == 0:
+                conn.close()
+                return False, "❌ Вы не лайкали этот Neet!"
+            conn.execute('''
+                UPDATE neets SET likes_count = MAX(likes_count - 1, 0) WHERE id = ?
+            ''', (neet_id,))
+            emit(cursor, NEET_UNLIKED, neet_id, user_id, author_id=author_id)
+            conn.commit()
+            conn.close()
+        return True, "💔 Лайк убран"
+    
+    def get_user_neets(self, user_id, limit=20):
+        shard = self.shard_for_user(user_id)
+        if not shard:
+            return []
+        
+        conn = shard.get_connection()
+        conn.row_factory = neet_row_factory
+        neets = conn.execute(f'''
+            SELECT {NEET_COLUMNS}
+            FROM neets n
+            JOIN users u ON n.user_id = u.id
+            WHERE n.user_id = ?
+            ORDER BY n.id DESC
+            LIMIT ?
+        ''', (user_id, limit)).fetchall()
+        conn.close()
+        return neets
+    
+    def shard_feed_stream(self, shard, limit):
+        """Поток постов одного шарда, отсортированный от новых к старым"""
+        conn = shard.get_connection()
+        try:
+            cursor = conn.execute(f'''
+                SELECT {NEET_COLUMNS}
+                FROM neets n
+                JOIN users u ON n.user_id = u.id
+                ORDER BY n.id DESC
+                LIMIT ?
+            ''', (limit,))
+            yield from cursor
+        finally:
+            conn.close()
+    
+    def get_feed(self, limit=20):
+        """Глобальная лента: k-путевое слияние потоков всех шардов"""
+        streams = [self.shard_feed_stream(shard, limit) for shard in self.shards]
+        merged = heapq.merge(*streams, key=lambda n: n[0], reverse=True)
+        try:
+            return [NeetView(*n) for n in islice(merged, limit)]
+        finally:
+            for stream in streams:
+                stream.close()
+    
+    # ─── Перебалансировка ──────────────────────────────────────
+    
+    def move_user(self, user_id, target):
+        """Перенести пользователя со всеми данными на другой шард.
+        
+        Копирование, смена шарда в каталоге и удаление из исходного шарда
+        выполняются одной транзакцией; записи этого пользователя в процессе
+        ждут окончания переноса, остальные пользователи не блокируются.
+        """
+        with self.user_lock(user_id):
+            row = self.lookup(user_id=user_id)
+            if not row or row[1] == target:
+                return False
+            
+            source = row[1]
+            conn = self.shards[source].get_connection()
+            conn.execute('ATTACH DATABASE ? AS dst', (self.shard_path(target),))
+            conn.execute('ATTACH DATABASE ? AS dir', (self.directory_name,))
+            try:
+                # Перенос чужих id не должен сдвигать счетчики целевого шарда
+                sequences = conn.execute('SELECT name, seq FROM dst.sqlite_sequence').fetchall()
+                
+                conn.execute('INSERT INTO dst.users SELECT * FROM main.users WHERE id = ?',
+                             (user_id,))
+                conn.execute('INSERT INTO dst.neets SELECT * FROM main.neets WHERE user_id = ?',
+                             (user_id,))
+                conn.execute('''
+                    INSERT INTO dst.likes SELECT * FROM main.likes WHERE neet_id IN (
+                        SELECT id FROM main.neets WHERE user_id = ?
+                    )
+                ''', (user_id,))
+                conn.execute('''
+                    INSERT INTO dst.verification_requests
+                    SELECT * FROM main.verification_requests WHERE user_id = ?
+                ''', (user_id,))
+                conn.execute('UPDATE dir.user_directory SET shard = ? WHERE user_id = ?',
+                             (target, user_id))
+                
+                conn.execute('''
+                    DELETE FROM main.likes WHERE neet_id IN (
+                        SELECT id FROM main.neets WHERE user_id = ?
+                    )
+                ''', (user_id,))
+                conn.execute('DELETE FROM main.neets WHERE user_id = ?', (user_id,))
+                conn.execute('DELETE FROM main.verification_requests WHERE user_id = ?',
+                             (user_id,))
+                conn.execute('DELETE FROM main.users WHERE id = ?', (user_id,))
+                
+                conn.executemany('UPDATE dst.sqlite_sequence SET seq = ? WHERE name = ?',
+                                 [(seq, name) for name, seq in sequences])
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+        return True
+    
+    def rebalance(self, max_moves=None):
+        """Перенести пользователей, живущих не на своем шарде. Возвращает число переносов"""
+        conn = self.get_directory_connection()
+        misplaced = [
+            (user_id, self.home_shard(user_id))
+            for user_id, shard in conn.execute('SELECT user_id, shard FROM user_directory')
+            if shard != self.home_shard(user_id)
+        ]
+        conn.close()
+        
+        moved = 0
+        for user_id, target in misplaced:
+            if max_moves is not None and moved >= max_moves:
+                break
+            if self.move_user(user_id, target):
+                moved += 1
+        return moved
+
+
+# ═══════════════════════════════════════════════════════════════
+# 🚀 ПЕРЕБАЛАНСИРОВКА ШАРДОВ
+# ═══════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Перебалансировка шардов Netta")
+    parser.add_argument("--shards", type=int, default=4, help="число шардов")
+    parser.add_argument("--base", default="netta", help="префикс файлов шардов")
+    parser.add_argument("--max-moves", type=int, default=None, help="ограничение переносов")
+    args = parser.parse_args()
+    
+    router = ShardRouter(args.shards, args.base)
+    moved = router.rebalance(args.max_moves)
+    print(f"🧩 Перенесено пользователей: {moved}")
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🚫 NETTA SPAM - Поиск почти одинаковых постов     ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Для каждого поста считается MinHash-подпись по символьным шинглам.
+Подписи недавних постов лежат в памяти в LSH-индексе (полосы подписи
+→ id постов) и сохраняются в SQLite, чтобы пережить перезапуск.
+Похожий пост того же или связанного аккаунта отклоняется, похожий пост
+другого аккаунта публикуется, но попадает в кластер для модерации.
+"""
+
+import random
+import threading
+from array import array
+from collections import deque
+from zlib import crc32
+
+from netta_ids import make_id
+from netta_media import release_media
+from netta_events import emit, NEET_DELETED
+from netta_notifications import delete_notifications
+from netta_time import NOW_MS_SQL, now_ms
+
+# ═══════════════════════════════════════════════════════════════
+# 🔢 MINHASH
+# ═══════════════════════════════════════════════════════════════
+
+SHINGLE_SIZE = 4          # символов в шингле
+NUM_HASHES = 32           # длина подписи
+BANDS = 8                 # полос LSH (по NUM_HASHES // BANDS значений)
+ROWS = NUM_HASHES // BANDS
+MIN_LENGTH = 20           # короткие посты («ок», «спасибо») не проверяем
+SIMILARITY_THRESHOLD = 0.7
+WINDOW_MS = 24 * 60 * 60 * 1000
+
+# Хеш-функции подписи: crc32 шингла, перемешанный XOR со случайной маской
+MASKS = [random.Random(0x4E455454 + i).getrandbits(32) for i in range(NUM_HASHES)]
+
+VERDICT_OK = 'ok'
+VERDICT_FLAG = 'flag'
+VERDICT_REJECT = 'reject'
+
+
+def normalize(content):
+    """Нижний регистр и одиночные пробелы — мелкие правки не меняют подпись"""
+    return ' '.join(content.lower().split())
+
+
+def shingle_hashes(text):
+    """crc32 всех подстрок длины SHINGLE_SIZE (стабилен между процессами, в отличие от hash)"""
+    if len(text) <= SHINGLE_SIZE:
+        return {crc32(text.encode())}
+    return {crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(content):
+    """MinHash-подпись текста (кортеж из NUM_HASHES чисел)"""
+    hashes = shingle_hashes(normalize(content))
+    return tuple(min(map(mask.__xor__, hashes)) for mask in MASKS)
+
+
+def similarity(a, b):
+    """Оценка коэффициента Жаккара по доле совпавших значений подписи"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+
+def band_keys(sig):
+    return [(band, sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+def pack_signature(sig):
+    return array('I', sig).tobytes()
+
+
+def unpack_signature(blob):
+    return tuple(array('I', blob))
+
+# ═══════════════════════════════════════════════════════════════
+# 🗄️ ТАБЛИЦЫ
+# ═══════════════════════════════════════════════════════════════
+
+def create_spam_tables(cursor):
+    """Подписи недавних постов и кластеры подозрительных постов"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS neet_signatures (
+            neet_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            signature BLOB NOT NULL
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS spam_flags (
+            neet_id INTEGER PRIMARY KEY,
+            cluster_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            similarity REAL,
+            created_at INTEGER DEFAULT {NOW_MS_SQL}
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_spam_flags_cluster
+        ON spam_flags (cluster_id, user_id)
+    ''')
+    # linked: кластеры аккаунта без полного просмотра отметок
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_spam_flags_user
+        ON spam_flags (user_id, cluster_id)
+    ''')
+
+
+def delete_neet_spam(cursor, neet_id):
+    """Убрать подпись и отметку удаленного поста"""
+    cursor.execute('DELETE FROM neet_signatures WHERE neet_id = ?', (neet_id,))
+    cursor.execute('DELETE FROM spam_flags WHERE neet_id = ?', (neet_id,))
+
+
+def delete_user_spam(cursor, user_id):
+    """Убрать подписи и отметки всех постов пользователя"""
+    cursor.execute('DELETE FROM neet_signatures WHERE user_id = ?', (user_id,))
+    cursor.execute('DELETE FROM spam_flags WHERE user_id = ?', (user_id,))
+
+# ═══════════════════════════════════════════════════════════════
+# 🚫 ДЕТЕКТОР
+# ═══════════════════════════════════════════════════════════════
+
+class SpamDetector:
+    def __init__(self, db, window_ms=WINDOW_MS, threshold=SIMILARITY_THRESHOLD):
+        self.db = db
+        self.window_ms = window_ms
+        self.threshold = threshold
+        self.entries = {}             # neet_id → (user_id, подпись)
+        self.buckets = {}             # (полоса, значения) → {neet_id}
+        self.order = deque()          # id постов по возрастанию (= по времени)
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """Загрузить подписи постов за окно и удалить более старые"""
+        cutoff_id = make_id(now_ms() - self.window_ms)
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM neet_signatures WHERE neet_id < ?', (cutoff_id,))
+        conn.commit()
+        cursor.execute('''
+            SELECT neet_id, user_id, signature FROM neet_signatures ORDER BY neet_id
+        ''')
+        for neet_id, user_id, blob in cursor.fetchall():
+            self.add(neet_id, user_id, unpack_signature(blob))
+        conn.close()
+    
+    def add(self, neet_id, user_id, sig):
+        """Добавить подпись опубликованного поста в индекс"""
+        with self.lock:
+            self.entries[neet_id] = (user_id, sig)
+            self.order.append(neet_id)
+            for key in band_keys(sig):
+                self.buckets.setdefault(key, set()).add(neet_id)
+    
+    def forget(self, neet_id):
+        with self.lock:
+            entry = self.entries.pop(neet_id, None)
+            if entry:
+                self.unlink(neet_id, entry[1])
+    
+    def unlink(self, neet_id, sig):
+        """Убрать пост из полос индекса (вызывается под блокировкой)"""
+        for key in band_keys(sig):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(neet_id)
+                if not bucket:
+                    del self.buckets[key]
+    
+    def expire(self):
+        """Выбросить посты старше окна (вызывается под блокировкой)"""
+        cutoff_id = make_id(now_ms() - self.window_ms)
+        while self.order and self.order[0] < cutoff_id:
+            neet_id = self.order.popleft()
+            entry = self.entries.pop(neet_id, None)
+            if entry:
+                self.unlink(neet_id, entry[1])
+    
+    def candidates(self, user_id, sig):
+        """Похожие посты из индекса: [(сходство, тот же автор, id, автор)], лучшие первыми"""
+        with self.lock:
+            self.expire()
+            found = set()
+            for key in band_keys(sig):
+                found |= self.buckets.get(key, set())
+            matches = []
+            for neet_id in found:
+                author, other = self.entries[neet_id]
+                score = similarity(sig, other)
+                if score >= self.threshold:
+                    matches.append((score, author == user_id, neet_id, author))
+        # Совпадение с собственным постом важнее, дальше — по сходству
+        matches.sort(key=lambda m: (m[1], m[0]), reverse=True)
+        return matches
+    
+    def check(self, user_id, content):
+        """Проверить текст перед публикацией.
+        
+        Возвращает (вердикт, подпись, совпадение), где совпадение —
+        (id похожего поста, сходство) или None.
+        """
+        if len(normalize(content)) < MIN_LENGTH:
+            return VERDICT_OK, None, None
+        
+        sig = signature(content)
+        matches = self.candidates(user_id, sig)
+        if not matches:
+            return VERDICT_OK, sig, None
+        
+        # Дальше — только при совпадении: сверяемся с базой
+        # (пост мог быть удален из админ-панели в другом процессе)
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            for score, same_author, neet_id, author in matches:
+                cursor.execute('SELECT 1 FROM neet_signatures WHERE neet_id = ?', (neet_id,))
+                if not cursor.fetchone():
+                    self.forget(neet_id)
+                    continue
+                
+                if same_author or self.linked(cursor, user_id, neet_id, author):
+                    return VERDICT_REJECT, sig, (neet_id, score)
+                return VERDICT_FLAG, sig, (neet_id, score)
+        finally:
+            conn.close()
+        
+        return VERDICT_OK, sig, None
+    
+    def linked(self, cursor, user_id, neet_id, author):
+        """Аккаунты связаны, если уже попадали в один кластер"""
+        cursor.execute('''
+            SELECT 1 FROM spam_flags a
+            JOIN spam_flags b ON a.cluster_id = b.cluster_id
+            WHERE a.user_id = ? AND b.user_id = ?
+            LIMIT 1
+        ''', (user_id, author))
+        return cursor.fetchone() is not None
+    
+    def record(self, cursor, neet_id, user_id, verdict, sig, match):
+        """Сохранить подпись и отметку поста (в транзакции публикации)"""
+        if sig is None:
+            return
+        
+        cursor.execute('''
+            INSERT INTO neet_signatures (neet_id, user_id, signature) VALUES (?, ?, ?)
+        ''', (neet_id, user_id, pack_signature(sig)))
+        
+        if verdict == VERDICT_FLAG:
+            similar_id, score = match
+            # Кластер — первый пост волны; сам он тоже попадает в кластер
+            cursor.execute('''
+                INSERT OR IGNORE INTO spam_flags (neet_id, cluster_id, user_id, similarity)
+                SELECT neet_id, neet_id, user_id, 1.0 FROM neet_signatures WHERE neet_id = ?
+            ''', (similar_id,))
+            cursor.execute('''
+                INSERT INTO spam_flags (neet_id, cluster_id, user_id, similarity)
+                SELECT ?, cluster_id, ?, ? FROM spam_flags WHERE neet_id = ?
+            ''', (neet_id, user_id, score, similar_id))
+    
+    # ═══════════════════════════════════════════════════════════
+    # 🛡️ МОДЕРАЦИЯ
+    # ═══════════════════════════════════════════════════════════
+    
+    def clusters(self, limit=20):
+        """Крупнейшие кластеры: (id кластера, постов, аккаунтов, текст первого поста)"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT f.cluster_id, COUNT(*), COUNT(DISTINCT f.user_id), n.content
+            FROM spam_flags f
+            LEFT JOIN neets n ON n.id = f.cluster_id
+            GROUP BY f.cluster_id
+            ORDER BY COUNT(*) DESC, f.cluster_id DESC
+            LIMIT ?
+        ''', (limit,))
+        clusters = cursor.fetchall()
+        conn.close()
+        return clusters
+    
+    def delete_cluster(self, cluster_id, media=None, actor_id=None):
+        """Удалить все посты кластера вместе с лайками и вложениями. Возвращает число постов"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT neet_id FROM spam_flags WHERE cluster_id = ?', (cluster_id,))
+        neet_ids = [row[0] for row in cursor.fetchall()]
+        
+        cursor.execute('''
+            DELETE FROM likes WHERE neet_id IN (SELECT neet_id FROM spam_flags WHERE cluster_id = ?)
+        ''', (cluster_id,))
+        cursor.execute('''
+            DELETE FROM neets WHERE id IN (SELECT neet_id FROM spam_flags WHERE cluster_id = ?)
+        ''', (cluster_id,))
+        cursor.execute('''
+            DELETE FROM neet_signatures
+            WHERE neet_id IN (SELECT neet_id FROM spam_flags WHERE cluster_id = ?)
+        ''', (cluster_id,))
+        unused_media = release_media(
+            cursor, 'neet_id IN (SELECT neet_id FROM spam_flags WHERE cluster_id = ?)', (cluster_id,)
+        )
+        delete_notifications(
+            cursor, 'neet_id IN (SELECT neet_id FROM spam_flags WHERE cluster_id = ?)', (cluster_id,)
+        )
+        cursor.execute('DELETE FROM spam_flags WHERE cluster_id = ?', (cluster_id,))
+        for neet_id in neet_ids:
+            emit(cursor, NEET_DELETED, neet_id, actor_id, spam_cluster=cluster_id)
+        
+        conn.commit()
+        conn.close()
+        
+        for neet_id in neet_ids:
+            self.forget(neet_id)
+        if media:
+            media.collect(unused_media)
+        return len(neet_ids)
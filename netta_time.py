@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              🕒 NETTA TIME - Время в миллисекундах             ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Все created_at хранятся как целые миллисекунды от начала эпохи Unix (UTC).
+Строки для людей получаются только при выводе на экран.
+"""
+
+import time
+from datetime import datetime
+
+# ═══════════════════════════════════════════════════════════════
+# 🕒 ВРЕМЯ
+# ═══════════════════════════════════════════════════════════════
+
+# Значение по умолчанию для колонок created_at (текущее время в мс)
+NOW_MS_SQL = "(CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))"
+
+# Перевод старых текстовых 'ГГГГ-ММ-ДД ЧЧ:ММ:СС' (UTC) в мс
+TEXT_TO_MS_SQL = "CAST((julianday({column}) - 2440587.5) * 86400000 AS INTEGER)"
+
+
+def now_ms():
+    """Текущее время в миллисекундах"""
+    return int(time.time() * 1000)
+
+
+def parse_timestamp(text, fmt='%Y-%m-%d %H:%M'):
+    """Время, введенное человеком (в местном часовом поясе), в мс или None"""
+    try:
+        return int(datetime.strptime(text.strip(), fmt).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def format_timestamp(value, fmt='%Y-%m-%d %H:%M'):
+    """Время для вывода на экран (в местном часовом поясе)"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        # Старые записи (например, в файлах архива) могут быть текстом
+        return value[:len(datetime(2000, 1, 1).strftime(fmt))]
+    return datetime.fromtimestamp(value / 1000).strftime(fmt)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════╗
+║              📋 NETTA VERIFICATION - Очередь заявок            ║
+║                         Версия 1.0                             ║
+╚═══════════════════════════════════════════════════════════════╝
+
+Заявки на верификацию разбираются как очередь задач. Администратор
+берет пачку заявок в аренду (status = 'claimed' до lease_expires_at);
+пока аренда действует, другие администраторы эти заявки не видят
+в своей пачке и не могут их решить. Просроченная аренда снова
+попадает в выдачу. Взятие пачки и решение по заявке — по одному
+UPDATE … RETURNING на индексах (status, id) и (status, lease_expires_at),
+поэтому скорость не зависит от длины очереди.
+"""
+
+from netta_time import now_ms
+
+# ═══════════════════════════════════════════════════════════════
+# 📋 ОЧЕРЕДЬ ЗАЯВОК
+# ═══════════════════════════════════════════════════════════════
+
+STATUS_PENDING = 'pending'
+STATUS_CLAIMED = 'claimed'
+STATUS_APPROVED = 'approved'
+STATUS_REJECTED = 'rejected'
+
+# Заявка еще не решена (для проверки «уже есть активная заявка»)
+OPEN_STATUSES = (STATUS_PENDING, STATUS_CLAIMED)
+
+# Сигнал живого режима очереди: новые события плюс аренды (взятие и возврат
+# заявок событий не пишут); читается по индексу аренд
+LIVE_SIGNAL = '''
+    SELECT (SELECT seq FROM sqlite_sequence WHERE name = 'events'),
+           COUNT(*), MAX(lease_expires_at)
+    FROM verification_requests WHERE status = 'claimed'
+'''
+
+QUEUE_COLUMNS = {
+    'claimed_by': 'INTEGER',
+    'lease_expires_at': 'INTEGER',
+    'decided_by': 'INTEGER',
+    'decided_at': 'INTEGER',
+}
+
+
+def create_verification_indexes(cursor):
+    """Индексы очереди: выдача по id, просроченные аренды, заявки пользователя, решения"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_verification_queue
+        ON verification_requests (status, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_verification_leases
+        ON verification_requests (status, lease_expires_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_verification_user
+        ON verification_requests (user_id, status)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_verification_decided
+        ON verification_requests (status, decided_at)
+    ''')
+
+
+def migrate_verification_queue(cursor):
+    """Добавить колонки аренды и решения в старые таблицы заявок"""
+    cursor.execute('PRAGMA table_info(verification_requests)')
+    existing = {row[1] for row in cursor.fetchall()}
+    for column, column_type in QUEUE_COLUMNS.items():
+        if column not in existing:
+            cursor.execute(f'ALTER TABLE verification_requests ADD COLUMN {column} {column_type}')
+    create_verification_indexes(cursor)
+
+
+class VerificationQueue:
+    def __init__(self, db, lease_seconds=300):
+        self.db = db
+        self.lease_ms = lease_seconds * 1000
+    
+    def claim(self, admin_id, count=10):
+        """Взять в аренду до count заявок: сначала просроченные, затем самые старые.
+        
+        Возвращает [(id, user_id, username, display_name, reason, created_at, lease_expires_at)].
+        """
+        now = now_ms()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE verification_requests
+            SET status = 'claimed', claimed_by = ?, lease_expires_at = ?
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id FROM verification_requests
+                    WHERE status = 'claimed' AND lease_expires_at < ?
+                    ORDER BY lease_expires_at LIMIT ?
+                )
+                UNION ALL
+                SELECT id FROM (
+                    SELECT id FROM verification_requests
+                    WHERE status = 'pending'
+                    ORDER BY id LIMIT ?
+                )
+                LIMIT ?
+            )
+            RETURNING id
+        ''', (admin_id, now + self.lease_ms, now, count, count, count))
+        claimed = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        conn.close()
+        return self.claims(admin_id, claimed)
+    
+    def claims(self, admin_id, ids=None):
+        """Заявки, арендованные администратором (аренда еще действует)"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        query = '''
+            SELECT vr.id, vr.user_id, u.username, u.display_name, vr.reason,
+                   vr.created_at, vr.lease_expires_at
+            FROM verification_requests vr
+            JOIN users u ON vr.user_id = u.id
+            WHERE vr.status = 'claimed' AND vr.claimed_by = ? AND vr.lease_expires_at >= ?
+        '''
+        params = [admin_id, now_ms()]
+        if ids is not None:
+            if not ids:
+                conn.close()
+                return []
+            query += f" AND vr.id IN ({','.join('?' * len(ids))})"
+            params += ids
+        cursor.execute(query + ' ORDER BY vr.id', params)
+        claims = cursor.fetchall()
+        conn.close()
+        return claims
+    
+    def release(self, admin_id, request_id=None):
+        """Вернуть свои заявки (одну или все) в очередь. Возвращает их число"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        query = '''
+            UPDATE verification_requests
+            SET status = 'pending', claimed_by = NULL, lease_expires_at = NULL
+            WHERE status = 'claimed' AND claimed_by = ?
+        '''
+        params = [admin_id]
+        if request_id is not None:
+            query += ' AND id = ?'
+            params.append(request_id)
+        cursor.execute(query, params)
+        released = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return released
+    
+    def decide(self, cursor, request_id, admin_id, status):
+        """Решение по заявке одним UPDATE (в транзакции вызывающего кода).
+        
+        Решить можно свободную заявку, свою или с просроченной арендой.
+        Возвращает user_id заявки или None, если заявки нет, она уже
+        решена или ее держит другой администратор.
+        """
+        now = now_ms()
+        cursor.execute('''
+            UPDATE verification_requests
+            SET status = ?, decided_by = ?, decided_at = ?,
+                claimed_by = NULL, lease_expires_at = NULL
+            WHERE id = ? AND (
+                status = 'pending'
+                OR (status = 'claimed' AND (claimed_by = ? OR lease_expires_at < ?))
+            )
+            RETURNING user_id
+        ''', (status, admin_id, now, request_id, admin_id, now))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def page(self, after_id=0, limit=10):
+        """Страница открытых заявок по возрастанию id (листание по ключу)"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT vr.id, u.username, u.display_name, vr.reason, vr.status,
+                   vr.created_at, vr.claimed_by, vr.lease_expires_at
+            FROM verification_requests vr
+            JOIN users u ON vr.user_id = u.id
+            WHERE vr.status IN ('pending', 'claimed') AND vr.id > ?
+            ORDER BY vr.id
+            LIMIT ?
+        ''', (after_id, limit))
+        requests = cursor.fetchall()
+        conn.close()
+        return requests
+    
+    def stats(self):
+        """Размер очереди: свободные, в аренде, с просроченной арендой"""
+        now = now_ms()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM verification_requests WHERE status = 'pending'")
+        pending = cursor.fetchone()[0]
+        cursor.execute('''
+            SELECT COUNT(*), COUNT(CASE WHEN lease_expires_at < ? THEN 1 END)
+            FROM verification_requests WHERE status = 'claimed'
+        ''', (now,))
+        claimed, expired = cursor.fetchone()
+        conn.close()
+        return {'pending': pending, 'claimed': claimed, 'expired': expired}